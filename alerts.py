@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from tick_store import grow_rows
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 발생한 알림
+Alert = namedtuple("Alert", ["rule", "code", "name", "value", "message"])
+
+# 지원하는 규칙 종류
+RULE_TYPES = (
+    "change_rate_above",  # 등락률 >= threshold
+    "change_rate_below",  # 등락률 <= threshold
+    "price_cross_above",  # 현재가가 price 를 상향 돌파
+    "price_cross_below",  # 현재가가 price 를 하향 돌파
+    "volume_spike",       # 틱 거래량 >= 평소 거래량 * ratio
+)
+
+
+# -------------------------------------------------
+def load_rules(path=None):
+    """
+    알림 규칙 파일(CONFIG_DIR/alerts.json)을 읽는 함수. 파일이 없으면 빈 리스트를 반환합니다.
+
+    규칙 예시:
+        {"name": "급등", "type": "change_rate_above", "threshold": 5, "cooldown": 30}
+        {"name": "돌파", "type": "price_cross_above", "codes": ["012450"], "price": 800000}
+        {"name": "거래량", "type": "volume_spike", "ratio": 3, "window": 20}
+
+    cooldown 은 같은 종목에 같은 규칙이 다시 울리기까지의 최소 간격(분)이며,
+    codes 가 없으면 전체 종목에 적용합니다.
+    """
+    path = path or os.path.join(os.getenv('CONFIG_DIR', 'config'), 'alerts.json')
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"알림 규칙 파일 로드 실패: {e}")
+        return []
+
+
+# -------------------------------------------------
+class AlertEngine:
+    """
+    알림 규칙을 한 번 컴파일해 두고 틱마다 전체 종목을 배열 연산으로 평가하는 엔진.
+    규칙별 대상 종목 마스크, 돌파 기준가, 쿨다운 시각과 종목별 직전 현재가/누적 거래량,
+    거래량 기준선(EMA)을 NumPy 배열로 보관합니다.
+
+    Args:
+        rules (list): 규칙 딕셔너리 리스트 (load_rules 참고)
+        max_codes (int): 처음 할당할 종목 수 (넘으면 두 배씩 늘림)
+    """
+
+    def __init__(self, rules, max_codes=None):
+        self.max_codes = max_codes or int(os.getenv('TICK_STORE_MAX_CODES', '256'))
+        self.index = {}
+        self.codes = []
+        self.names = []
+        self._lock = threading.Lock()
+
+        n = self.max_codes
+        self._prev_price = np.full(n, np.nan)
+        self._prev_volume = np.full(n, np.nan)
+
+        self.rules = []
+        for rule in rules:
+            if rule.get('type') not in RULE_TYPES:
+                logger.error(f"알 수 없는 알림 규칙: {rule}")
+                continue
+            self.rules.append(self._compile(rule))
+
+    # -------------------------------------------------
+    def _compile(self, rule):
+        # 대상 종목 행을 먼저 할당 (배열이 늘어난 뒤의 크기로 규칙 배열을 만듦)
+        rows = [self.row(code) for code in rule.get('codes') or []]
+        n = self.max_codes
+        compiled = {
+            'name': rule.get('name', rule['type']),
+            'type': rule['type'],
+            'cooldown': float(rule.get('cooldown', 30)) * 60,
+            'last_fired': np.full(n, -np.inf),
+        }
+
+        if rows:
+            mask = np.zeros(n, dtype=bool)
+            mask[rows] = True
+            compiled['mask'] = mask
+        else:
+            compiled['mask'] = None
+
+        if rule['type'] in ('change_rate_above', 'change_rate_below'):
+            compiled['threshold'] = float(rule['threshold'])
+        elif rule['type'] in ('price_cross_above', 'price_cross_below'):
+            compiled['price'] = float(rule['price'])
+        else:
+            window = int(rule.get('window', 20))
+            compiled['ratio'] = float(rule.get('ratio', 3))
+            compiled['alpha'] = 2.0 / (window + 1)
+            compiled['warmup'] = int(rule.get('warmup', min(window, 5)))
+            compiled['baseline'] = np.zeros(n)
+            compiled['samples'] = np.zeros(n, dtype=np.int64)
+        return compiled
+
+    def row(self, code, name=None):
+        """종목코드의 행 번호를 반환합니다. 처음 보는 종목이면 새 행을 할당합니다. (가득 차면 배열을 늘림)"""
+        row = self.index.get(code)
+        if row is None:
+            with self._lock:
+                row = self.index.get(code)
+                if row is None:
+                    if len(self.index) >= self.max_codes:
+                        self._grow()
+                    row = len(self.index)
+                    self.index[code] = row
+                    self.codes.append(code)
+                    self.names.append(name or code)
+        if name and self.names[row] != name:
+            self.names[row] = name
+        return row
+
+    def _grow(self):
+        # 종목별 배열을 두 배로 늘림 (새 행은 직전 값 없음, 쿨다운 없음, 기준선 0)
+        n = self.max_codes * 2
+        self._prev_price = grow_rows(self._prev_price, n, np.nan)
+        self._prev_volume = grow_rows(self._prev_volume, n, np.nan)
+        for rule in self.rules:
+            rule['last_fired'] = grow_rows(rule['last_fired'], n, -np.inf)
+            if rule['mask'] is not None:
+                rule['mask'] = grow_rows(rule['mask'], n, False)
+            if 'baseline' in rule:
+                rule['baseline'] = grow_rows(rule['baseline'], n)
+                rule['samples'] = grow_rows(rule['samples'], n)
+        logger.info(f"알림 엔진을 {n}종목으로 늘렸습니다.")
+        self.max_codes = n
+
+    # -------------------------------------------------
+    def evaluate(self, items, now=None):
+        """
+        한 틱의 시세로 규칙을 평가합니다.
+
+        Args:
+            items (list): (stock, result) 튜플 리스트
+            now (float): 현재 시각 (epoch 초, 기본값 time.time())
+
+        Returns:
+            list: 발생한 Alert 리스트
+        """
+        latest = {}
+        for stock, result in items:
+            latest[self.row(stock['code'], stock.get('name'))] = result
+        if not latest:
+            return []
+
+        rows = np.fromiter(latest.keys(), dtype=np.int64, count=len(latest))
+        values = list(latest.values())
+        price = np.array([result['current_price'] for result in values], dtype=np.float64)
+        change_rate = np.array([result['change_rate'] for result in values], dtype=np.float64)
+        volume = np.array([result.get('volume', 0) for result in values], dtype=np.float64)
+        return self.evaluate_arrays(rows, price, change_rate, volume, now)
+
+    def evaluate_arrays(self, rows, price, change_rate, volume, now=None):
+        """
+        배열 입력으로 규칙을 평가합니다. (rows 는 중복 없는 행 번호 배열)
+        규칙 수만큼만 반복하고 종목 방향은 모두 벡터 연산으로 처리합니다.
+        """
+        now = time.time() if now is None else now
+        prev_price = self._prev_price[rows]
+        prev_volume = self._prev_volume[rows]
+
+        # 틱 거래량 (누적 거래량 차이, 장 시작으로 누적값이 줄면 0)
+        tick_volume = np.nan_to_num(volume - prev_volume, nan=0.0)
+        tick_volume[tick_volume < 0] = 0.0
+
+        alerts = []
+        for rule in self.rules:
+            kind = rule['type']
+            if kind == 'change_rate_above':
+                hit = change_rate >= rule['threshold']
+                value = change_rate
+            elif kind == 'change_rate_below':
+                hit = change_rate <= rule['threshold']
+                value = change_rate
+            elif kind == 'price_cross_above':
+                hit = (prev_price < rule['price']) & (price >= rule['price'])
+                value = price
+            elif kind == 'price_cross_below':
+                hit = (prev_price > rule['price']) & (price <= rule['price'])
+                value = price
+            else:
+                baseline = rule['baseline'][rows]
+                samples = rule['samples'][rows]
+                has_prev = ~np.isnan(prev_volume)
+                hit = has_prev & (samples >= rule['warmup']) & (baseline > 0) & \
+                    (tick_volume >= baseline * rule['ratio'])
+                value = np.divide(tick_volume, baseline, out=np.zeros_like(tick_volume),
+                                  where=baseline > 0)
+                # 기준선 갱신 (직전 값이 있는 종목만)
+                rule['baseline'][rows] = np.where(
+                    has_prev,
+                    np.where(samples > 0, baseline + rule['alpha'] * (tick_volume - baseline),
+                             tick_volume),
+                    baseline)
+                rule['samples'][rows] = samples + has_prev
+
+            if rule['mask'] is not None:
+                hit &= rule['mask'][rows]
+            hit &= now - rule['last_fired'][rows] >= rule['cooldown']
+
+            if hit.any():
+                fired = np.flatnonzero(hit)
+                rule['last_fired'][rows[fired]] = now
+                for i in fired:
+                    alerts.append(self._alert(rule, int(rows[i]), float(value[i]),
+                                              price[i], change_rate[i]))
+
+        self._prev_price[rows] = price
+        self._prev_volume[rows] = volume
+        return alerts
+
+    def _alert(self, rule, row, value, price, change_rate):
+        code, name = self.codes[row], self.names[row]
+        if rule['type'] == 'volume_spike':
+            detail = f"거래량 평소 대비 {value:.1f}배"
+        else:
+            detail = f"현재가 {int(price):,}원, 등락률 {change_rate:+.2f}%"
+        message = f"[{rule['name']}] {name}({code}) {detail}"
+        return Alert(rule['name'], code, name, value, message)
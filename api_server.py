@@ -0,0 +1,257 @@
+import os
+import json
+import zlib
+import time
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+
+from metrics import registry as default_registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+def _dumps(value):
+    # Quote 는 읽기 전용 매핑이므로 dict 로 변환하여 직렬화
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=dict).encode('utf-8')
+
+
+# 최신 시세 스냅샷 (통째로 교체되므로 읽는 쪽은 락이 필요 없음)
+Snapshot = namedtuple("Snapshot", [
+    "version", "updated_at", "quotes", "versions", "quote_bodies", "quotes_body"
+])
+
+
+# -------------------------------------------------
+class QuoteBoard:
+    """
+    조회 API 가 제공하는 최신 시세 보드.
+    틱마다 publish() 로 새 Snapshot 을 만들어 교체하며, 직렬화한 JSON 도
+    publish 시점에 한 번만 만들어 두므로 요청 처리 시에는 복사/직렬화가 없습니다.
+    """
+
+    def __init__(self):
+        self.snapshot = Snapshot(0, None, {}, {}, {}, _dumps({}))
+        self.watchlist = []
+        self.watchlist_body = _dumps([])
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, quotes, watchlist=None):
+        """
+        한 틱의 시세를 반영합니다.
+
+        Args:
+            quotes (list): (stock, result) 튜플 리스트
+            watchlist (list): 관심종목 리스트
+        """
+        with self._lock:
+            if watchlist is not None and watchlist != self.watchlist:
+                self.watchlist = list(watchlist)
+                self.watchlist_body = _dumps(self.watchlist)
+
+            current = self.snapshot
+            version = current.version + 1
+            merged = dict(current.quotes)
+            versions = dict(current.versions)
+            bodies = dict(current.quote_bodies)
+            changed = {}
+            for stock, result in quotes:
+                code = stock['code']
+                if merged.get(code) == result:
+                    continue
+                merged[code] = result
+                versions[code] = version
+                bodies[code] = _dumps(result)
+                changed[code] = result
+
+            if not changed:
+                return
+            self.snapshot = Snapshot(version, time.time(), merged, versions, bodies,
+                                     _dumps(merged))
+            subscribers = list(self._subscribers)
+
+        event = _dumps({'version': version, 'quotes': changed})
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=100)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.add(entry)
+        return entry
+
+    def unsubscribe(self, entry):
+        with self._lock:
+            self._subscribers.discard(entry)
+
+
+# -------------------------------------------------
+def _offer(queue, event):
+    # 느린 구독자는 오래된 이벤트를 버리고 최신 이벤트를 받음
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+# -------------------------------------------------
+def _etag(version):
+    return f'W/"{version}"'
+
+
+def _not_found():
+    from fastapi.responses import Response
+
+    return Response(status_code=404, content=_dumps({'detail': 'not found'}),
+                    media_type='application/json')
+
+
+def _not_modified(request, etag):
+    # 클라이언트가 가진 본문이 최신이면 304 응답, 아니면 None (본문을 만들기 전에 확인)
+    from fastapi.responses import Response
+
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={'ETag': etag})
+    return None
+
+
+def _cached(request, body, etag):
+    from fastapi.responses import Response
+
+    return _not_modified(request, etag) or \
+        Response(content=body, media_type='application/json', headers={'ETag': etag})
+
+
+# -------------------------------------------------
+def create_app(board, tick_store=None, registry=None, shards=None, watchlist=None):
+    """
+    메모리의 시세를 제공하는 조회 API 를 만듭니다. KIS API 를 호출하지 않습니다.
+
+    Endpoints:
+        GET /quotes                 전체 최신 시세 (codes=005930,000660 로 일부만 조회)
+        GET /quotes/{code}          종목 최신 시세
+        GET /quotes/{code}/history  종목 최근 시세 (n 개)
+        GET /watchlist              관심종목
+        GET /stream                 시세 변경 server-sent events
+        GET /metrics                자체 모니터링 지표 (Prometheus 텍스트 형식)
+        GET /shards                 샤드 배정과 직전 틱 커버리지 (샤딩을 사용할 때만)
+
+    Args:
+        board (QuoteBoard): 최신 시세 스냅샷
+        tick_store (TickStore): 최근 시세 저장소 (history 용)
+        registry (Metrics): 자체 모니터링 지표 (기본값 metrics.registry)
+        shards (ShardRouter): 샤드 라우터
+        watchlist (Watchlist): 전체 관심종목 (샤드 커버리지 계산용)
+    """
+    registry = registry or default_registry
+
+    # fastapi 는 조회 API 를 켤 때만 불러옴 (import 비용이 커서 시작 시간에 영향)
+    from fastapi import FastAPI, Query, Request
+    from fastapi.responses import Response, StreamingResponse
+
+    api = FastAPI(title="stock-monitor")
+
+    @api.get("/quotes")
+    def get_quotes(request: Request, codes: str = Query(None)):
+        snapshot = board.snapshot
+        if not codes:
+            return _cached(request, snapshot.quotes_body, _etag(snapshot.version))
+
+        requested = [code for code in codes.split(',') if code]
+        etag = _etag(max((snapshot.versions.get(code, 0) for code in requested), default=0))
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        body = _dumps({code: snapshot.quotes[code] for code in requested
+                       if code in snapshot.quotes})
+        return _cached(request, body, etag)
+
+    @api.get("/quotes/{code}")
+    def get_quote(request: Request, code: str):
+        snapshot = board.snapshot
+        body = snapshot.quote_bodies.get(code)
+        if body is None:
+            return _not_found()
+        return _cached(request, body, _etag(snapshot.versions[code]))
+
+    @api.get("/quotes/{code}/history")
+    def get_history(request: Request, code: str, n: int = Query(60, ge=1)):
+        if tick_store is None or code not in tick_store.index:
+            return _not_found()
+        # 시세가 그대로여도 틱마다 기록이 쌓이므로 tick_store 상태로 ETag 생성 (n 마다 본문이 다름)
+        # 본문보다 먼저 읽으므로 그 사이 기록이 추가되어도 ETag 가 본문보다 오래될 뿐 틀린 304 는 없음
+        etag = _etag(f"{tick_store.version(code)}-{n}")
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        body = _dumps({field: tick_store.window(code, field, n).tolist()
+                       for field in ('timestamp', 'current_price', 'change_rate', 'volume')})
+        return _cached(request, body, etag)
+
+    @api.get("/watchlist")
+    def get_watchlist(request: Request):
+        body = board.watchlist_body
+        return _cached(request, body, _etag(zlib.crc32(body)))
+
+    @api.get("/metrics")
+    def get_metrics():
+        return Response(content=registry.render(),
+                        media_type='text/plain; version=0.0.4; charset=utf-8')
+
+    @api.get("/shards")
+    def get_shards():
+        if shards is None:
+            return _not_found()
+        stocks = watchlist.snapshot().stocks if watchlist is not None else board.watchlist
+        return Response(content=_dumps(shards.coverage(stocks)), media_type='application/json')
+
+    @api.get("/stream")
+    async def stream(request: Request):
+        entry = board.subscribe()
+
+        async def events():
+            try:
+                # 접속 직후 현재 스냅샷 전송
+                yield b"event: snapshot\ndata: " + board.snapshot.quotes_body + b"\n\n"
+                while not await request.is_disconnected():
+                    try:
+                        event = await asyncio.wait_for(entry[1].get(), timeout=15)
+                    except asyncio.TimeoutError:
+                        yield b": keep-alive\n\n"
+                        continue
+                    yield b"event: quotes\ndata: " + event + b"\n\n"
+            finally:
+                board.unsubscribe(entry)
+
+        return StreamingResponse(events(), media_type='text/event-stream',
+                                 headers={'Cache-Control': 'no-cache'})
+
+    return api
+
+
+# -------------------------------------------------
+def start_api_server(board, tick_store=None, host=None, port=None, shards=None,
+                     watchlist=None):
+    """
+    조회 API 를 백그라운드 스레드에서 실행합니다.
+
+    Returns:
+        uvicorn.Server: 실행 중인 서버 (should_exit = True 로 종료)
+    """
+    import uvicorn
+
+    config = uvicorn.Config(create_app(board, tick_store, shards=shards, watchlist=watchlist),
+                            host=host or os.getenv('API_HOST', '0.0.0.0'),
+                            port=port or int(os.getenv('API_PORT', '8000')),
+                            log_level='warning',
+                            access_log=False)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="api-server", daemon=True)
+    thread.start()
+    logger.info(f"조회 API 시작 (port {config.port})")
+    return server
@@ -1,136 +1,420 @@
 import os
+import time
+import asyncio
 import logging
+import datetime
+
+from bootstrap import bootstrap
+
+if __name__ == "__main__":
+    # 설정(.env)과 로깅을 다른 모듈보다 먼저 한 번만 초기화 (모듈 상수가 환경 변수를 읽음)
+    bootstrap()
 
-import pytz
-from dotenv import load_dotenv
 from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
-from influxdb_client import InfluxDBClient, Point
-from time import sleep
-from tinydb import TinyDB
-from kis_api import get_current_price
-from utils import load_stocks, check_krx_market_time
-
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.theme import Theme
-
-
-# 커스터마이징 
-custom_theme = Theme({
-    "info": "cyan",
-    "warning": "yellow",
-    "error": "red",
-    "critical": "red reverse"
-})
-
-console = Console(theme=custom_theme)
-rich_handler = RichHandler(
-    console=console,
-    rich_tracebacks=True,
-    tracebacks_show_locals=True,
-    show_time=True,
-    show_path=False
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from kis_api import (
+    get_current_prices_async,
+    get_current_prices_multi_async,
+    get_kis_client,
+    tick_deadline,
+    KIS_MULTI_PRICE,
+    MULTI_PRICE_CHUNK
 )
+from influx_writer import InfluxWriter, build_point
+from kis_stream import KisStream, tick_to_result, tick_time
+from spool import Spool
+from change_filter import ChangeFilter
+from tick_store import TickStore
+from indicators import IndicatorEngine
+from alerts import AlertEngine, load_rules
+from telegram_notifier import TelegramNotifier
+from api_server import QuoteBoard, start_api_server
+from watchlist import Watchlist
+from sharding import load_router
+from poll_scheduler import PollScheduler, rate_budget, POLL_TICK
+from rollups import Rollups, bar_points
+from utils import check_krx_market_time
+from market_calendar import MarketSessionTrigger, default_calendar, korea_tz
+from metrics import registry
 
-# 기본 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[rich_handler]
-)
 
 # 로거 가져오기
 logger = logging.getLogger(__name__)
 
-# APScheduler 로거 설정
-apscheduler_logger = logging.getLogger('apscheduler')
-apscheduler_logger.setLevel(logging.ERROR)
-apscheduler_logger.handlers = []  # 기존 핸들러 제거
-apscheduler_logger.addHandler(rich_handler)
 
-# .env 파일 로드
-load_dotenv(os.path.join(os.getenv('CONFIG_DIR', 'config'), '.env'))
+# 프로세스 전체에서 공유하는 InfluxDB writer (첫 실행 시 생성)
+writer = None
+
+# 등급별 조회 사용 여부
+POLL_TIERED = os.getenv('POLL_TIERED', 'false').lower() == 'true'
+
+# 조회 주기(초): 등급별 조회를 쓰면 POLL_TICK 초마다 깨어나 조회 시각이 된 종목만 조회
+TICK_INTERVAL = POLL_TICK if POLL_TIERED else 60
+
+# 자체 모니터링 지표(stock_monitor_internal)를 틱마다 저장할지 여부
+INTERNAL_METRICS = os.getenv('INTERNAL_METRICS', 'true').lower() == 'true'
+
+# 틱 처리 상태 (import 시에는 만들지 않고 setup() 에서 한 번만 생성)
+watchlist = None
+tick_store = None
+quote_board = None
+indicator_engine = None
+alert_engine = None
+notifier = None
+shard_router = None
+poll_scheduler = None
+rollups = None
+change_filter = None
+
+
+# -------------------------------------------------
+def setup():
+    """
+    틱 처리 상태를 만드는 함수. 여러 번 호출해도 한 번만 만들며, main() 과 stream_main() 이 처음 실행될 때
+    호출하므로 app 을 import 만 할 때는 설정 파일 읽기, 배열 할당 등이 일어나지 않습니다.
+    """
+    global watchlist, tick_store, quote_board, indicator_engine, alert_engine, notifier, \
+        shard_router, poll_scheduler, rollups, change_filter
+    if watchlist is not None:
+        return
+
+    # 관심종목 레지스트리 (stocks.json 이 바뀌면 다음 틱에 다시 읽음)
+    watchlist = Watchlist()
+
+    # 종목별 최근 시세 (지표, 알림, 조회 API 가 사용)
+    tick_store = TickStore()
+
+    # 조회 API 가 제공하는 최신 시세
+    quote_board = QuoteBoard()
+
+    # 틱 단위 증분 지표 엔진
+    indicator_engine = IndicatorEngine() if os.getenv('INDICATORS', 'true').lower() == 'true' else None
+
+    # 알림 규칙 엔진 및 텔레그램 전송 큐 (CONFIG_DIR/alerts.json 이 있을 때만)
+    alert_rules = load_rules()
+    alert_engine = AlertEngine(alert_rules) if alert_rules else None
+    notifier = TelegramNotifier() if alert_engine is not None and os.getenv('TELEGRAM_TOKEN') else None
+
+    # 관심종목을 워커와 앱키로 나누어 조회하는 라우터 (SHARD_WORKERS 또는 shards.json 이 있을 때만)
+    shard_router = load_router()
+
+    # 등급별 조회 스케줄러 (활발한 종목은 자주, 조용한 종목은 드물게 조회)
+    poll_scheduler = PollScheduler() if POLL_TIERED else None
+
+    # 1분, 5분, 일봉 집계기 (ROLLUP_BUCKET_* 로 봉마다 보관 기간이 다른 bucket 에 저장)
+    rollups = Rollups() if os.getenv('ROLLUPS', 'true').lower() == 'true' else None
+
+    # 변하지 않은 시세 저장 생략 필터
+    change_filter = ChangeFilter() if os.getenv('CHANGE_FILTER', 'true').lower() == 'true' else None
+
+
+# -------------------------------------------------
+def get_writer():
+    global writer
+    if writer is None:
+        writer = InfluxWriter(spool=Spool())
+    return writer
+
+
+# -------------------------------------------------
+def poll_budget():
+    """틱당 조회 예산: 학습한 초당 요청 수 x 틱 간격 (샤딩 시 앱키 수만큼)"""
+    accounts = shard_router.accounts.values() if shard_router is not None else None
+    return rate_budget(accounts, POLL_TICK, MULTI_PRICE_CHUNK if KIS_MULTI_PRICE else 1)
+
+
+# -------------------------------------------------
+async def fetch_quotes(stock_list, interval):
+    """
+    이번 틱 종목의 시세를 조회합니다.
+    초당 거래건수 초과 재시도는 틱에 남은 interval 초 안에서 끝내므로 틱이 다음 틱까지 늘어지지 않습니다.
+    """
+    deadline = tick_deadline(interval)
+    if shard_router is not None:
+        # 이 워커가 맡은 종목을 앱키별로 나누어 조회
+        return await shard_router.fetch(stock_list, deadline=deadline)
+    fetch = get_current_prices_multi_async if KIS_MULTI_PRICE else get_current_prices_async
+    return await fetch(stock_list, deadline=deadline)
+
+
+# -------------------------------------------------
+def write_bars(bars):
+    """끝난 봉을 bucket 별로 배치 버퍼에 넣습니다."""
+    for bucket, points in bar_points(bars).items():
+        get_writer().write(points, bucket)
 
-# TinyDB
-db_path = os.path.join(os.getenv('CONFIG_DIR', 'config'), 'db.json')
-db = TinyDB(db_path)
 
+def session_ending(now):
+    """
+    이번 틱이 폐장 전 마지막 틱이거나 폐장 시각(15:30 종가) 틱인지 확인합니다. (진행 중인 봉을 모두 저장)
+    폐장 틱에는 종가 단일가 분봉이 새로 시작되고 일봉은 같은 시각으로 종가까지 다시 저장됩니다.
+    """
+    session = default_calendar().session(datetime.datetime.fromtimestamp(now, korea_tz))
+    return session is None or session[1].timestamp() - now <= TICK_INTERVAL
+
+
+# -------------------------------------------------
+def _phase(name, since):
+    """틱 단계 소요 시간을 기록하고 현재 시각을 반환합니다."""
+    now = time.perf_counter()
+    registry.observe('tick_phase_seconds', now - since, phase=name)
+    registry.set('tick_phase_last_seconds', now - since, phase=name)
+    return now
+
+
+# -------------------------------------------------
+def on_job_skipped(event):
+    """이전 틱이 끝나지 않아 건너뛰었거나 실행 시각을 놓친 틱을 집계합니다."""
+    reason = 'overlap' if event.code == EVENT_JOB_MAX_INSTANCES else 'missed'
+    registry.inc('ticks_skipped_total', reason=reason)
+    logger.warning("틱 건너뜀 (%s)", reason)
 
 
 # -------------------------------------------------
 def main():
+    setup()
     if not check_krx_market_time():
         logger.info("장 운영 시간이 아닙니다.")
         return
 
-    logger.info("-------------------------------------------------")
+    started = time.perf_counter()
+    # 틱 시각: 이 틱의 모든 포인트에 붙여 스풀에서 나중에 재전송되어도 원래 시각으로 저장
+    now = time.time()
+    stamp = datetime.datetime.fromtimestamp(now, korea_tz)
     try:
-        stock_list = load_stocks()
-        logger.info(
-            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 주식 시세 조회 시작")
+        stock_list = watched = watchlist.snapshot().stocks
+        if shard_router is not None:
+            # 이 워커가 맡은 종목만 앱키별로 나누어 조회
+            stock_list = watched = shard_router.owned(stock_list)
+        if poll_scheduler is not None:
+            # 조회 시각이 된 종목만 예산 이내로 조회
+            poll_scheduler.sync(watched)
+            stock_list = poll_scheduler.due(poll_budget())
+            if not stock_list:
+                return
+        logger.debug("주식 시세 조회 시작 (%d종목)", len(stock_list))
 
-        # InfluxDB 클라이언트 설정
-        client = InfluxDBClient(url=os.getenv('INFLUXDB_URL'),
-                                token=os.getenv('INFLUXDB_TOKEN'),
-                                org=os.getenv('INFLUXDB_ORG'))
-        write_api = client.write_api()
+        # 토큰 버킷으로 초당 거래건수를 지키면서 전체 종목을 동시에 조회
+        # (멀티종목 조회는 30종목당 1건, 실패한 종목만 단건 조회)
+        remaining = TICK_INTERVAL - (time.perf_counter() - started)
+        results = get_kis_client().run(fetch_quotes(stock_list, remaining))
+        mark = _phase('fetch', started)
 
-        for stock in stock_list:
+        points = []
+        written = []
+        suppressed = 0
+        failed = 0
+        quotes = []
+        alerts = []
+        for stock, result in zip(stock_list, results):
+            if poll_scheduler is not None:
+                poll_scheduler.update(stock, result)
             try:
-                result = get_current_price(stock['code'], stock['name'])
-                sleep(0.2)  #초당 거래건수 대응 딜레이
-
-                if result:
-                    logger.info(
-                        f"종목명: {stock['name']}, 종목코드: {stock['code']} 시세 저장 중...")
-                    # InfluxDB에 데이터 저장
-                    point = Point("stock_price") \
-                        .tag("code", stock['code']) \
-                        .tag("name", stock['name'])
-
-                    for key, value in result.items():
-                        if isinstance(value, (int, float)):
-                            point = point.field(key, value)
-
-                    write_api.write(bucket=os.getenv('INFLUXDB_BUCKET'),
-                                    record=point)
-                    change_rate = result.get("change_rate", 0)
-                    logger.info(
-                        f"종목명: {stock['name']}, 현재가:{result['current_price']}원, 등락률: {change_rate}%  데이터 저장 완료"
-                    )
+                if not result:
+                    failed += 1
+                else:
+                    tick_store.append(stock['code'], result, now)
+                    quotes.append((stock, result))
+
+                    # 직전 저장값과 같은 시세는 heartbeat 주기가 될 때까지 저장하지 않음
+                    if change_filter is not None and \
+                            not change_filter.should_write(stock['code'], result):
+                        suppressed += 1
+                        continue
+                    written.append((stock, result))
+                    # 종목별 로그는 debug 로만 남김 (인자는 출력될 때만 포맷됨)
+                    logger.debug("종목명: %s, 현재가:%s원, 등락률: %s%%", stock['name'],
+                                 result['current_price'], result.get("change_rate", 0))
             except Exception as e:
-                logger.error(f"Error checking {stock['name']}: {str(e)}")
+                failed += 1
+                logger.error("Error checking %s: %s", stock['name'], e)
+        mark = _phase('process', mark)
+
+        # 전체 종목 지표를 한 번에 갱신하여 같은 배치에 stock_indicator 로 저장
+        if indicator_engine is not None:
+            for stock, fields in indicator_engine.update(quotes):
+                points.append(build_point(stock, fields, measurement="stock_indicator", time=stamp))
+            mark = _phase('indicators', mark)
 
-        write_api.close()
-        client.close()
+        # 틱마다 1분, 5분, 일봉을 갱신하고 끝난 봉만 저장 (장 마감 틱에는 진행 중인 봉까지)
+        bars = []
+        if rollups is not None:
+            rollups.retain({stock['code'] for stock in watched})
+            bars = rollups.update(quotes, now)
+            if session_ending(now):
+                bars += rollups.flush()
+            mark = _phase('rollups', mark)
+
+        # 조회 API 스냅샷 갱신
+        quote_board.publish(quotes, watched)
+
+        # 알림 규칙을 전체 종목에 대해 한 번에 평가하고 전송은 큐에 맡김
+        if alert_engine is not None:
+            alerts = alert_engine.evaluate(quotes)
+            if alerts:
+                logger.info("알림 %d건 발생", len(alerts))
+                if notifier is not None:
+                    notifier.submit(alerts)
+        mark = _phase('publish', mark)
+
+        # 한 틱의 시세와 포인트를 한 번에 배치 버퍼로 전달 (전송은 백그라운드에서 처리)
+        # 시세는 Point 를 만들지 않고 line protocol 로 바로 변환
+        get_writer().write_quotes(written, stamp)
+        get_writer().write(points)
+        write_bars(bars)
+        _phase('write', mark)
+
+        # 틱당 요약 한 줄 (JSON 로그 모드에서는 fields 가 그대로 키로 출력됨)
+        elapsed = time.perf_counter() - started
+        logger.info("시세 조회 %d종목, 저장 %d포인트 (변화 없음 %d건 제외), 실패 %d건, %.2f초",
+                    len(stock_list), len(written) + len(points), suppressed, failed, elapsed,
+                    extra={'fields': {'fetched': len(stock_list),
+                                      'written': len(written) + len(points),
+                                      'bars': len(bars), 'suppressed': suppressed, 'failed': failed,
+                                      'alerts': len(alerts), 'elapsed': round(elapsed, 4)}})
+
+        if poll_scheduler is not None:
+            poll_scheduler.tiers()
+        registry.observe('tick_seconds', elapsed)
+        registry.set('tick_last_seconds', elapsed)
+        registry.inc('ticks_total')
+        registry.inc('quotes_fetched_total', len(stock_list) - failed)
+        registry.inc('quotes_failed_total', failed)
+        registry.inc('points_suppressed_total', suppressed)
 
     except Exception as e:
-        logger.error(f"Error in main function: {str(e)}")   
-    finally:
-        if write_api:
-            write_api.close()
-        if client:
-            client.close()
+        registry.inc('tick_errors_total')
+        logger.error("Error in main function: %s", e)
+
+    # 자체 모니터링 지표를 같은 writer 로 저장 (카운터는 누적값)
+    if INTERNAL_METRICS:
+        try:
+            get_writer().write(registry.points(time=stamp))
+        except Exception as e:
+            logger.error("자체 모니터링 지표 저장 실패: %s", e)
+
+
+# -------------------------------------------------
+def stream_main():
+    """
+    실시간 체결가 웹소켓으로 시세를 수신하여 저장하는 스트리밍 모드.
+    폴링 모드와 같은 InfluxDB writer, 변경 필터, 지표, 알림을 사용하며, 포인트 시각은 체결 시각입니다.
+    관심종목은 TICK_INTERVAL 초마다 확인하여 바뀐 종목만 다시 등록합니다.
+    """
+    setup()
+    stock_list = watchlist.snapshot().stocks
+
+    def on_ticks(ticks):
+        by_code = watchlist.snapshot().by_code
+        times = {}
+        quotes = []
+        written = []
+        written_times = []
+        bars = []
+        for tick in ticks:
+            stock = by_code.get(tick.code) or {'code': tick.code, 'name': tick.code}
+            result = tick_to_result(tick, stock['name'])
+            timestamp = tick_time(tick)
+            tick_store.append(tick.code, result, timestamp.timestamp())
+            times[tick.code] = timestamp
+            quotes.append((stock, result))
+            if rollups is not None:
+                # 봉 구간은 체결 시각 기준
+                bars.extend(rollups.update([(stock, result)], timestamp.timestamp()))
+
+            # 직전 저장값과 같은 시세는 heartbeat 주기가 될 때까지 저장하지 않음
+            if change_filter is not None and \
+                    not change_filter.should_write(tick.code, result, timestamp.timestamp()):
+                continue
+            written.append((stock, result))
+            written_times.append(timestamp)
+
+        # 지표는 프레임의 종목별 마지막 체결로 갱신하여 그 체결 시각으로 저장
+        points = []
+        if indicator_engine is not None:
+            for stock, fields in indicator_engine.update(quotes):
+                points.append(build_point(stock, fields, measurement="stock_indicator",
+                                          time=times[stock['code']]))
+
+        quote_board.publish(quotes)
+
+        if alert_engine is not None:
+            alerts = alert_engine.evaluate(quotes)
+            if alerts:
+                logger.info("알림 %d건 발생", len(alerts))
+                if notifier is not None:
+                    notifier.submit(alerts)
+
+        get_writer().write_quotes(written, written_times)
+        get_writer().write(points)
+        write_bars(bars)
+
+    async def reload_watchlist(stream):
+        # 관심종목이 바뀌면 조회 API 목록을 갱신하고 추가/제외된 종목만 등록/해제
+        version = watchlist.snapshot().version
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            try:
+                snapshot = await asyncio.to_thread(watchlist.snapshot)
+                if snapshot.version == version:
+                    continue
+                version = snapshot.version
+                quote_board.publish([], snapshot.stocks)
+                if rollups is not None:
+                    rollups.retain({stock['code'] for stock in snapshot.stocks})
+                await stream.update(snapshot.stocks)
+            except Exception as e:
+                logger.error("관심종목 갱신 실패: %s", e)
+
+    async def run(stream):
+        reload_task = asyncio.ensure_future(reload_watchlist(stream))
+        try:
+            await stream.run()
+        finally:
+            reload_task.cancel()
+
+    quote_board.publish([], stock_list)
+    stream = KisStream(stock_list, on_ticks)
+    logger.info(f"실시간 체결가 수신 시작 ({len(stream.codes)}종목)")
+    get_kis_client().run(run(stream))
 
 
 # -------------------------------------------------
 if __name__ == "__main__":
+    # 실행 모드 (poll: 1분 주기 조회, stream: 실시간 체결가 수신)
+    mode = os.getenv('MONITOR_MODE', 'poll')
+    setup()
+
     scheduler = BlockingScheduler()
 
-    # 매시 정각에 실행 (9:00 ~ 15:00)
-    trigger = CronTrigger(
-        day_of_week='mon-fri',  # 월요일부터 금요일까지
-        hour='9-15',  # 9시부터 15시까지
-        minute='*/1',  # 1분마다
-        timezone=pytz.timezone('Asia/Seoul'))
+    # 거래 세션 안에서만 TICK_INTERVAL 초마다 실행 (휴장일, 장 종료 후에는 다음 개장까지 대기)
+    trigger = MarketSessionTrigger(interval=TICK_INTERVAL)
 
     scheduler.add_job(main, trigger=trigger)
+    scheduler.add_listener(on_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+    # 메모리 시세 조회 API
+    api_server = None
+    if os.getenv('API_ENABLED', 'true').lower() == 'true':
+        api_server = start_api_server(quote_board, tick_store, shards=shard_router,
+                                      watchlist=watchlist)
 
     logger.info("주식 시세 모니터링 시작...")
     try:
-        scheduler.start()
+        if mode == 'stream':
+            stream_main()
+        else:
+            scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         logger.info('프로그램을 종료합니다.')
+    finally:
+        get_kis_client().close()
+        # 진행 중인 봉 저장
+        if rollups is not None and writer is not None:
+            write_bars(rollups.flush())
+        if writer is not None:
+            writer.close()
+        if notifier is not None:
+            notifier.close()
+        if api_server is not None:
+            api_server.should_exit = True
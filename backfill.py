@@ -0,0 +1,411 @@
+from bootstrap import bootstrap
+
+if __name__ == '__main__':
+    # 모듈 상수가 환경 변수를 읽으므로 .env 와 로깅을 다른 모듈보다 먼저 초기화
+    bootstrap()
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+from collections import namedtuple
+
+from kis_api import (
+    get_kis_client,
+    get_token_manager,
+    get_rate_limiter,
+    call_limited,
+    get_minute_bars_async,
+    get_daily_bars_async,
+    KIS_CONCURRENCY,
+    MINUTE_CHART_ROWS,
+    DAILY_CHART_ROWS
+)
+from influx_writer import build_point
+from market_calendar import default_calendar, korea_tz
+from state_store import default_store
+from rollups import bar_measurement, bar_bucket
+from poll_scheduler import POLL_INTERVALS
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 분봉, 일봉 측정값 이름 (실시간 봉 집계와 같은 측정값, bucket 에 저장)
+MINUTE_MEASUREMENT = bar_measurement('1m')
+DAILY_MEASUREMENT = bar_measurement('1d')
+
+# 기본 채우기 기간(일): 분봉, 일봉
+BACKFILL_DAYS = int(os.getenv('BACKFILL_DAYS', '5'))
+BACKFILL_DAILY_DAYS = int(os.getenv('BACKFILL_DAILY_DAYS', '365'))
+
+# InfluxDB 에 한 번에 저장할 포인트 수
+BACKFILL_BATCH = int(os.getenv('BACKFILL_BATCH', '20000'))
+
+# 실시간 분봉이 이 간격(초) 이내로 이어져 있으면 사이 분은 저장된 것으로 봄
+# (등급별 조회에서 조용한 종목은 POLL_QUIET_INTERVAL 마다 조회되어 그 사이 분봉이 없음)
+BACKFILL_HEARTBEAT = float(os.getenv('BACKFILL_HEARTBEAT', str(POLL_INTERVALS['quiet'])))
+
+# 조각당 초당 거래건수 초과 재시도 시간(초), 완료 기록 보관 기간(일)
+BACKFILL_RETRY_SECONDS = float(os.getenv('BACKFILL_RETRY_SECONDS', '300'))
+BACKFILL_CHECKPOINT_DAYS = int(os.getenv('BACKFILL_CHECKPOINT_DAYS', '30'))
+
+# 채울 구간 한 조각 (요청 하나)
+#   kind     '1m' (분봉) 또는 '1d' (일봉)
+#   date     조회 일자 (YYYYMMDD, 일봉은 시작 일자)
+#   end      분봉은 조회 시각 (HHMMSS), 일봉은 종료 일자 (YYYYMMDD)
+#   missing  저장할 분(epoch 초) 또는 일자(YYYYMMDD) 집합
+Chunk = namedtuple("Chunk", ["kind", "stock", "date", "end", "missing"])
+
+
+# -------------------------------------------------
+def chunk_key(chunk):
+    """체크포인트 키"""
+    return f"{chunk.kind}:{chunk.stock['code']}:{chunk.date}:{chunk.end}"
+
+
+# -------------------------------------------------
+class InfluxGaps:
+    """
+    InfluxDB 에 이미 저장된 분, 일을 조회하여 빈 구간을 찾는 데 사용합니다.
+    분 단위는 분봉 bucket 의 stock_bar_1m close, 일 단위는 일봉 bucket 의 stock_bar_1d close 를 기준으로 합니다.
+    (stock_price 는 변하지 않은 시세 저장 생략 때문에 비어 있는 분이 많아 기준으로 쓰지 않음)
+
+    Args:
+        writer (InfluxWriter): 접속 정보와 bucket 을 가진 writer
+    """
+
+    def __init__(self, writer):
+        self.query_api = writer.client.query_api()
+        self.minute_bucket = bar_bucket('1m') or writer.bucket
+        self.daily_bucket = bar_bucket('1d') or writer.bucket
+
+    def _times(self, bucket, measurement, field, code, start, stop, every):
+        query = f'''
+            from(bucket: "{bucket}")
+              |> range(start: {start.isoformat()}, stop: {stop.isoformat()})
+              |> filter(fn: (r) => r._measurement == "{measurement}" and r._field == "{field}"
+                                   and r.code == "{code}")
+              |> aggregateWindow(every: {every}, fn: count, createEmpty: false, timeSrc: "_start")
+              |> keep(columns: ["_time"])
+        '''
+        return [record.get_time() for table in self.query_api.query(query) for record in table]
+
+    def minutes(self, code, start, stop):
+        """저장된 분 (분 시작 epoch 초 집합)"""
+        return {int(t.timestamp()) // 60 * 60
+                for t in self._times(self.minute_bucket, MINUTE_MEASUREMENT, 'close', code, start, stop, '1m')}
+
+    def days(self, code, start, stop):
+        """저장된 일봉 일자 (YYYYMMDD 집합)"""
+        return {t.astimezone(korea_tz).strftime('%Y%m%d')
+                for t in self._times(self.daily_bucket, DAILY_MEASUREMENT, 'close', code, start, stop, '1d')}
+
+
+# -------------------------------------------------
+def covered_minutes(stored, heartbeat=None):
+    """
+    저장된 분봉 사이 간격이 heartbeat 초 이내인 분을 채워 저장된 것으로 보는 분 집합을 반환합니다.
+    조용한 종목은 조회 간격마다만 분봉이 있으므로 그 사이 분은 빈 구간이 아닙니다.
+
+    Args:
+        stored (iterable): 저장된 분 (분 시작 epoch 초)
+        heartbeat (float): 최대 조회 간격(초, 기본값 BACKFILL_HEARTBEAT)
+    """
+    heartbeat = BACKFILL_HEARTBEAT if heartbeat is None else heartbeat
+    stored = sorted(stored)
+    covered = set(stored)
+    for previous, current in zip(stored, stored[1:]):
+        if current - previous <= heartbeat:
+            covered.update(range(previous + 60, current, 60))
+    return covered
+
+
+# -------------------------------------------------
+def plan_chunks(stocks, start, end, gaps, minute=True, daily=True, daily_start=None,
+                calendar=None, now=None):
+    """
+    종목별로 저장된 데이터와 비교하여 빈 구간만 요청 조각으로 나눕니다.
+    분봉은 세션을 끝에서부터 MINUTE_CHART_ROWS - 1 분씩 자른 창 중 빈 분이 있는 창만,
+    (응답의 첫 행은 창 바로 앞 분으로, 첫 분봉의 거래대금 계산에만 사용)
+    일봉은 빠진 거래일을 DAILY_CHART_ROWS 일 이내의 연속 구간으로 묶어 요청합니다.
+
+    Args:
+        stocks (list): {'code', 'name'} 딕셔너리 리스트
+        start, end (datetime): 분봉 채우기 기간
+        gaps (InfluxGaps): 저장된 분, 일 조회 객체
+        daily_start (datetime): 일봉 채우기 시작 (기본값 start)
+
+    Returns:
+        list: Chunk 리스트
+    """
+    calendar = calendar or default_calendar()
+    now = now or time.time()
+    # 아직 끝나지 않은 분은 채우지 않음
+    last_minute = int(now) // 60 * 60 - 60
+
+    sessions = calendar.sessions(start, end)
+    daily_sessions = calendar.sessions(daily_start or start, end)
+    chunks = []
+    for stock in stocks:
+        code = stock['code']
+        if minute and sessions:
+            covered = covered_minutes(
+                gaps.minutes(code, sessions[0][0], sessions[-1][1] + datetime.timedelta(minutes=1)))
+            for open_time, close_time in sessions:
+                # 폐장 시각(종가 단일가) 분봉까지 포함
+                minutes = [ts for ts in range(int(open_time.timestamp()),
+                                              int(close_time.timestamp()) + 60, 60)
+                           if ts <= last_minute]
+                date = open_time.strftime('%Y%m%d')
+                size = MINUTE_CHART_ROWS - 1
+                while minutes:
+                    window, minutes = minutes[-size:], minutes[:-size]
+                    missing = frozenset(ts for ts in window if ts not in covered)
+                    if missing:
+                        hour = datetime.datetime.fromtimestamp(window[-1], korea_tz).strftime('%H%M%S')
+                        chunks.append(Chunk('1m', stock, date, hour, missing))
+
+        if daily and daily_sessions:
+            dates = [open_time.strftime('%Y%m%d') for open_time, close_time in daily_sessions
+                     if close_time.timestamp() <= now]
+            covered = gaps.days(code, daily_sessions[0][0], daily_sessions[-1][1]) if dates else set()
+            run = []
+            for date in dates + [None]:
+                if date is not None and date not in covered and len(run) < DAILY_CHART_ROWS:
+                    run.append(date)
+                    continue
+                if run:
+                    chunks.append(Chunk('1d', stock, run[0], run[-1], frozenset(run)))
+                run = [date] if date is not None and date not in covered else []
+    return chunks
+
+
+# -------------------------------------------------
+def _kst(date, hour='000000'):
+    return korea_tz.localize(datetime.datetime.strptime(date + hour, '%Y%m%d%H%M%S'))
+
+
+def minute_points(chunk, rows):
+    """
+    분봉 행을 stock_bar_1m 포인트로 변환합니다. (빈 분만)
+    분봉 거래대금은 실시간 봉 집계와 같이 누적 거래대금의 분 증가분이며, 장 시작 분봉은 누적값 그대로입니다.
+    원본 시세(stock_price)는 만들지 않습니다. (분봉에는 등락률, 누적 거래량 등이 없어 일부 필드만 채운 행이 됨)
+
+    Returns:
+        dict: bucket -> Point 리스트 (None 은 기본 bucket)
+    """
+    rows = sorted((row for row in rows if row['stck_bsop_date'] == chunk.date),
+                  key=lambda row: row['stck_cntg_hour'])
+    # 응답이 다 차지 않았으면 장 시작 분봉부터 받은 것
+    from_open = len(rows) < MINUTE_CHART_ROWS
+
+    bars = []
+    previous_value = None
+    for row in rows:
+        t = _kst(row['stck_bsop_date'], row['stck_cntg_hour'])
+        trading_value = int(row['acml_tr_pbmn'])
+        bar = {
+            'open': int(row['stck_oprc']),
+            'high': int(row['stck_hgpr']),
+            'low': int(row['stck_lwpr']),
+            'close': int(row['stck_prpr']),
+            'volume': int(row['cntg_vol']),
+        }
+        # 창 앞 분을 받지 못한 첫 분봉(드묾)은 거래대금 없이 저장
+        if previous_value is not None:
+            bar['trading_value'] = trading_value - previous_value
+        elif from_open:
+            bar['trading_value'] = trading_value
+        previous_value = trading_value
+
+        if int(t.timestamp()) not in chunk.missing:
+            continue
+        bars.append(build_point(chunk.stock, bar, measurement=MINUTE_MEASUREMENT, time=t))
+    return _by_bucket([(bar_bucket('1m'), bars)])
+
+
+def daily_points(chunk, rows):
+    """일봉 행을 stock_bar_1d 포인트로 변환합니다. (시각은 해당 일 0시 KST, bucket -> Point 리스트)"""
+    points = []
+    for row in rows:
+        date = row.get('stck_bsop_date')
+        if date not in chunk.missing:
+            continue
+        bar = {
+            'open': int(row['stck_oprc']),
+            'high': int(row['stck_hgpr']),
+            'low': int(row['stck_lwpr']),
+            'close': int(row['stck_clpr']),
+            'volume': int(row['acml_vol']),
+            'trading_value': int(row['acml_tr_pbmn']),
+        }
+        points.append(build_point(chunk.stock, bar, measurement=DAILY_MEASUREMENT, time=_kst(date)))
+    return _by_bucket([(bar_bucket('1d'), points)])
+
+
+def _by_bucket(groups):
+    # 같은 bucket 으로 가는 포인트는 합침 (bucket 을 따로 두지 않으면 모두 기본 bucket)
+    by_bucket = {}
+    for bucket, points in groups:
+        if points:
+            by_bucket.setdefault(bucket, []).extend(points)
+    return by_bucket
+
+
+# -------------------------------------------------
+async def fetch_chunks(chunks, write, store, client=None, concurrency=None, batch=None):
+    """
+    조각을 공유 속도 제한기로 동시에 조회하여 batch 포인트씩 모아 저장합니다.
+    저장에 성공한 조각만 완료로 기록하므로 중단 후 다시 실행하면 남은 조각부터 이어갑니다.
+
+    Args:
+        chunks (list): Chunk 리스트
+        write (callable): 포인트 리스트와 bucket 을 받아 즉시 저장하는 함수 (InfluxWriter.write_sync)
+        store (StateStore): 체크포인트 저장소
+        concurrency (int): 동시에 진행할 최대 요청 수 (기본값 KIS_CONCURRENCY)
+        batch (int): 한 번에 저장할 포인트 수 (기본값 BACKFILL_BATCH)
+
+    Returns:
+        dict: chunks, done, failed, points
+    """
+    client = client or get_kis_client()
+    batch = batch or BACKFILL_BATCH
+    concurrency = concurrency or KIS_CONCURRENCY
+    loop = asyncio.get_running_loop()
+    access_token = await get_token_manager().get_async()
+    bucket = get_rate_limiter()
+    semaphore = asyncio.Semaphore(concurrency)
+    flush_lock = asyncio.Lock()
+
+    stats = {'chunks': len(chunks), 'done': 0, 'failed': 0, 'points': 0}
+    pending_points = {}
+    pending_keys = []
+
+    async def flush():
+        async with flush_lock:
+            if not pending_keys:
+                return
+            groups, keys = dict(pending_points), pending_keys[:]
+            pending_points.clear()
+            del pending_keys[:]
+            # 동기 저장은 이벤트 루프 밖에서 실행 (bucket 별로 한 번씩)
+            count = 0
+            for bucket, points in groups.items():
+                await loop.run_in_executor(None, write, points, bucket)
+                count += len(points)
+            store.save_backfill_chunks(keys)
+            stats['done'] += len(keys)
+            stats['points'] += count
+            registry.inc('backfill_points_total', count)
+            logger.info(f"과거 시세 {stats['done']}/{stats['chunks']}조각 저장 "
+                        f"({stats['points']}포인트)")
+
+    async def fetch(chunk):
+        code = chunk.stock['code']
+        deadline = loop.time() + BACKFILL_RETRY_SECONDS
+        if chunk.kind == '1m':
+            rows = await call_limited(
+                lambda: get_minute_bars_async(client, access_token, code, chunk.date, chunk.end),
+                bucket, semaphore, deadline)
+            return minute_points(chunk, rows)
+        rows = await call_limited(
+            lambda: get_daily_bars_async(client, access_token, code, chunk.date, chunk.end),
+            bucket, semaphore, deadline)
+        return daily_points(chunk, rows)
+
+    remaining = iter(chunks)
+
+    async def worker():
+        # 조각이 많아도 코루틴은 concurrency 개만 만듦
+        for chunk in remaining:
+            try:
+                points = await fetch(chunk)
+            except Exception as e:
+                stats['failed'] += 1
+                registry.inc('backfill_chunks_total', result='failed')
+                logger.error(f"과거 시세 조회 실패 {chunk_key(chunk)}: {e}")
+                continue
+            registry.inc('backfill_chunks_total', result='done')
+            for bucket, group in points.items():
+                pending_points.setdefault(bucket, []).extend(group)
+            pending_keys.append(chunk_key(chunk))
+            if sum(len(group) for group in pending_points.values()) >= batch:
+                await flush()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    await flush()
+    return stats
+
+
+# -------------------------------------------------
+def backfill(stocks, start, end, writer, minute=True, daily=True, daily_start=None,
+             gaps=None, store=None, client=None):
+    """
+    빈 구간을 찾아 과거 분봉, 일봉을 채우는 함수.
+
+    Returns:
+        dict: chunks, skipped(이전 실행에서 완료), done, failed, points
+    """
+    store = store or default_store()
+    client = client or get_kis_client()
+    gaps = gaps or InfluxGaps(writer)
+    store.prune_backfill_chunks(time.time() - BACKFILL_CHECKPOINT_DAYS * 86400)
+
+    chunks = plan_chunks(stocks, start, end, gaps, minute, daily, daily_start)
+    done = store.load_backfill_chunks(chunk_key(chunk) for chunk in chunks)
+    todo = [chunk for chunk in chunks if chunk_key(chunk) not in done]
+    logger.info(f"과거 시세 채우기: {len(stocks)}종목, 빈 구간 {len(chunks)}조각 "
+                f"(완료 {len(chunks) - len(todo)}조각 제외)")
+
+    stats = client.run(fetch_chunks(todo, writer.write_sync, store, client))
+    stats['skipped'] = len(chunks) - len(todo)
+    return stats
+
+
+# -------------------------------------------------
+def _date(value):
+    return korea_tz.localize(datetime.datetime.strptime(value, '%Y-%m-%d'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="과거 분봉, 일봉 채우기 (빈 구간만 조회, 중단 후 이어서 실행)")
+    parser.add_argument('--days', type=int, default=BACKFILL_DAYS, help="분봉 채우기 기간(일)")
+    parser.add_argument('--daily-days', type=int, default=BACKFILL_DAILY_DAYS, help="일봉 채우기 기간(일)")
+    parser.add_argument('--start', help="시작 일자 (YYYY-MM-DD, --days 대신)")
+    parser.add_argument('--end', help="종료 일자 (YYYY-MM-DD, 포함, 기본값 오늘)")
+    parser.add_argument('--codes', help="종목코드 목록 (쉼표 구분, 기본값 관심종목 전체)")
+    parser.add_argument('--no-minute', dest='minute', action='store_false', help="분봉 제외")
+    parser.add_argument('--no-daily', dest='daily', action='store_false', help="일봉 제외")
+    args = parser.parse_args()
+
+    from watchlist import Watchlist
+    from influx_writer import InfluxWriter
+
+    stocks = Watchlist().snapshot().stocks
+    if args.codes:
+        codes = set(args.codes.split(','))
+        stocks = [stock for stock in stocks if stock['code'] in codes] + \
+            [{'code': code, 'name': code} for code in codes - {stock['code'] for stock in stocks}]
+
+    today = datetime.datetime.now(korea_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+    end = (_date(args.end) if args.end else today) + datetime.timedelta(days=1)
+    start = _date(args.start) if args.start else end - datetime.timedelta(days=args.days)
+    daily_start = _date(args.start) if args.start else end - datetime.timedelta(days=args.daily_days)
+
+    writer = InfluxWriter()
+    try:
+        stats = backfill(stocks, start, end, writer, args.minute, args.daily, daily_start)
+    finally:
+        get_kis_client().close()
+        writer.close()
+    logger.info(f"과거 시세 채우기 완료: {stats}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
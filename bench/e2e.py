@@ -0,0 +1,227 @@
+"""
+전체 파이프라인(app.main) 벤치마크.
+
+로컬 KIS / InfluxDB 대역 서버(bench/fake_servers.py)를 띄우고, 관심종목 수별로
+새 프로세스에서 실제 app.main 을 여러 틱 실행하여 다음을 측정합니다.
+
+    tick_ms        틱 소요 시간 (p50, max)
+    quote_latency  KIS 요청 지연 (p50, p99)
+    points_per_s   InfluxDB 대역 서버가 받은 초당 포인트 수
+    cpu_s          측정 구간의 CPU 시간 (user + sys)
+    peak_rss_mb    최대 RSS
+
+결과는 JSON 파일(기본값 bench_output.json)에 버전 정보와 함께 저장하므로
+버전 간 결과를 비교할 수 있습니다.
+
+사용법:
+    python bench/e2e.py [--sizes 24,250,2000] [--ticks 3] [--latency 0.05] [--rate-limit 20]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -------------------------------------------------
+def percentile(values, q):
+    """q 분위수 (0~100, 최근접 순위)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _post(url):
+    request = urllib.request.Request(url, data=b'', method='POST')
+    with urllib.request.urlopen(request, timeout=5) as res:
+        return json.loads(res.read())
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as res:
+        return json.loads(res.read())
+
+
+# -------------------------------------------------
+def run_worker(args):
+    """
+    관심종목 args.codes 개로 app.main 을 args.ticks 번 실행하고 결과를 JSON 한 줄로 출력합니다.
+    (환경 변수를 먼저 설정해야 하므로 별도 프로세스에서 실행)
+    """
+    config_dir = tempfile.mkdtemp(prefix='stock-monitor-e2e-')
+    stocks = [{'name': f'종목{i:04d}', 'code': f'{100000 + i:06d}'} for i in range(args.codes)]
+    with open(os.path.join(config_dir, 'stocks.json'), 'w', encoding='utf-8') as f:
+        json.dump(stocks, f, ensure_ascii=False)
+
+    os.environ.update({
+        'CONFIG_DIR': config_dir,
+        'APP_KEY': 'bench', 'APP_SECRET': 'bench',
+        'INFLUXDB_URL': args.influx_url, 'INFLUXDB_TOKEN': 'bench',
+        'INFLUXDB_ORG': 'bench', 'INFLUXDB_BUCKET': 'bench',
+        'LOG_MODE': 'prod', 'LOG_LEVEL': 'WARNING',
+        'TICK_STORE_MAX_CODES': str(max(256, args.codes)),
+        'KIS_MULTI_PRICE': 'true' if args.multi else 'false',
+    })
+    if args.client_rate:
+        os.environ['KIS_RATE_LIMIT'] = str(args.client_rate)
+
+    sys.path.insert(0, ROOT)
+    import kis_api
+    import app
+
+    kis_api.URL_BASE = args.kis_url
+    app.check_krx_market_time = lambda: True
+
+    # KIS 요청별 지연 측정 (재시도 포함)
+    latencies = []
+    client = kis_api.get_kis_client()
+    get_async = client.get_async
+
+    async def timed_get_async(url, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await get_async(url, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    client.get_async = timed_get_async
+
+    # 첫 틱은 토큰 발급, 커넥션 생성 등 준비 단계로 보고 제외
+    app.main()
+    app.get_writer().close()
+    app.writer = None
+    latencies.clear()
+    _post(f"{args.kis_url}/reset")
+    _post(f"{args.influx_url}/reset")
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    ticks = []
+    for _ in range(args.ticks):
+        tick_started = time.perf_counter()
+        app.main()
+        ticks.append(time.perf_counter() - tick_started)
+    # 배치 버퍼에 남은 포인트까지 모두 전송
+    app.get_writer().close()
+    elapsed = time.perf_counter() - started
+    end_usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    sink = _get(f"{args.influx_url}/stats")
+    kis = _get(f"{args.kis_url}/stats")
+    client.close()
+
+    result = {
+        'codes': args.codes,
+        'ticks': args.ticks,
+        'tick_ms_p50': statistics.median(ticks) * 1000,
+        'tick_ms_max': max(ticks) * 1000,
+        'quote_latency_ms_p50': (percentile(latencies, 50) or 0) * 1000,
+        'quote_latency_ms_p99': (percentile(latencies, 99) or 0) * 1000,
+        'kis_requests': kis['requests'],
+        'kis_quotes': kis['quotes'],
+        'kis_rate_limited': kis['rate_limited'],
+        'points_written': sink['points'],
+        'points_per_s': sink['points'] / elapsed if elapsed else 0,
+        'influx_requests': sink['requests'],
+        'influx_bytes': sink['bytes'],
+        'cpu_s': (end_usage.ru_utime - usage.ru_utime) + (end_usage.ru_stime - usage.ru_stime),
+        # Linux 의 ru_maxrss 는 KB 단위
+        'peak_rss_mb': end_usage.ru_maxrss / 1024,
+    }
+    print(json.dumps(result), flush=True)
+
+
+# -------------------------------------------------
+def _version():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.main 전체 파이프라인 벤치마크")
+    parser.add_argument('--sizes', default='24,250,2000', help="관심종목 수 목록")
+    parser.add_argument('--ticks', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.05, help="KIS 평균 응답 지연(초)")
+    parser.add_argument('--jitter', type=float, default=0.02, help="KIS 응답 지연 표준편차(초)")
+    parser.add_argument('--rate-limit', type=int, default=20, help="KIS 대역 서버 초당 허용 요청 수")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--client-rate', type=float, default=None, help="KIS_RATE_LIMIT")
+    parser.add_argument('--single', dest='multi', action='store_false',
+                        help="멀티종목 조회 대신 단건 조회 사용")
+    parser.add_argument('--output', default=os.path.join(ROOT, 'bench_output.json'))
+    # 내부용 (종목 수별 측정 프로세스)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--codes', type=int, default=24, help=argparse.SUPPRESS)
+    parser.add_argument('--kis-url', help=argparse.SUPPRESS)
+    parser.add_argument('--influx-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+
+    servers = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'bench', 'fake_servers.py'),
+         '--latency', str(args.latency), '--jitter', str(args.jitter),
+         '--rate-limit', str(args.rate_limit), '--error-rate', str(args.error_rate)],
+        stdout=subprocess.PIPE)
+    try:
+        ready = servers.stdout.readline().decode().split()
+        if not ready or ready[0] != 'READY':
+            raise RuntimeError("대역 서버 시작 실패")
+        kis_url = f"http://127.0.0.1:{ready[1]}"
+        influx_url = f"http://127.0.0.1:{ready[2]}"
+
+        results = []
+        for size in (int(size) for size in args.sizes.split(',')):
+            command = [sys.executable, os.path.abspath(__file__), '--worker',
+                       '--codes', str(size), '--ticks', str(args.ticks),
+                       '--kis-url', kis_url, '--influx-url', influx_url]
+            if args.client_rate:
+                command += ['--client-rate', str(args.client_rate)]
+            if not args.multi:
+                command.append('--single')
+            output = subprocess.run(command, cwd=ROOT, stdout=subprocess.PIPE, check=True)
+            result = json.loads(output.stdout.decode().strip().splitlines()[-1])
+            results.append(result)
+            print(f"{size:>6}종목  tick p50 {result['tick_ms_p50']:9.1f} ms"
+                  f"  latency p50/p99 {result['quote_latency_ms_p50']:6.1f}/"
+                  f"{result['quote_latency_ms_p99']:6.1f} ms"
+                  f"  {result['points_per_s']:9.1f} points/s"
+                  f"  cpu {result['cpu_s']:6.2f} s"
+                  f"  rss {result['peak_rss_mb']:6.1f} MB"
+                  f"  rate-limited {result['kis_rate_limited']}", flush=True)
+    finally:
+        servers.terminate()
+        servers.wait()
+
+    report = {
+        'version': _version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'params': {key: getattr(args, key) for key in
+                   ('ticks', 'latency', 'jitter', 'rate_limit', 'error_rate', 'client_rate',
+                    'multi')},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
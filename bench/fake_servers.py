@@ -0,0 +1,236 @@
+"""
+벤치마크용 로컬 KIS / InfluxDB 대역 서버.
+
+KIS 서버는 토큰 발급, 단건 시세(inquire-price), 멀티종목 시세(intstock-multprice)를
+지연(latency, jitter)과 초당 거래건수 제한(EGW00201)을 흉내 내어 응답하고,
+InfluxDB 서버는 /api/v2/write 로 받은 line protocol 포인트 수만 세어 둡니다.
+GET /stats 로 카운터를 조회하고 POST /reset 으로 초기화합니다.
+
+사용법:
+    python bench/fake_servers.py [--latency 0.05] [--jitter 0.02] [--rate-limit 20]
+    (준비되면 "READY <kis_port> <influx_port>" 를 출력)
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+from aiohttp import web
+
+
+# -------------------------------------------------
+class FakeKis:
+    """
+    KIS Open API 대역 서버.
+
+    Args:
+        latency (float): 평균 응답 지연(초)
+        jitter (float): 응답 지연 표준편차(초)
+        rate_limit (int): 초당 허용 요청 수 (넘으면 EGW00201 오류, 0 이면 제한 없음)
+        error_rate (float): 임의로 500 오류를 낼 확률
+    """
+
+    def __init__(self, latency=0.05, jitter=0.02, rate_limit=20, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.prices = {}
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.quotes = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self._second = 0
+        self._count = 0
+
+    def stats(self):
+        return {'requests': self.requests, 'quotes': self.quotes,
+                'rate_limited': self.rate_limited, 'errors': self.errors}
+
+    def routes(self):
+        return [
+            web.post('/oauth2/tokenP', self.token),
+            web.get('/uapi/domestic-stock/v1/quotations/inquire-price', self.price),
+            web.get('/uapi/domestic-stock/v1/quotations/intstock-multprice', self.multi_price),
+        ]
+
+    # -------------------------------------------------
+    async def token(self, request):
+        return web.json_response({'access_token': 'bench-token', 'token_type': 'Bearer',
+                                  'expires_in': 86400})
+
+    async def _admit(self):
+        """지연을 주고 초당 거래건수를 확인합니다. 오류 응답이 필요하면 반환합니다."""
+        self.requests += 1
+        second = int(time.time())
+        if second != self._second:
+            self._second, self._count = second, 0
+        self._count += 1
+
+        await asyncio.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+
+        if self.rate_limit and self._count > self.rate_limit:
+            self.rate_limited += 1
+            return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00201',
+                                      'msg1': '초당 거래건수를 초과하였습니다.'}, status=500)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00500',
+                                      'msg1': 'internal error'}, status=500)
+        return None
+
+    def _tick(self, code):
+        # 종목별 임의 보행 가격
+        base = self.prices.get(code) or self.random.randint(1000, 500000)
+        price = max(100, int(base * (1 + self.random.gauss(0, 0.002))))
+        self.prices[code] = price
+        diff = price - base
+        rate = round(diff / base * 100, 2)
+        volume = self.random.randint(1000, 10000000)
+        return price, diff, rate, volume
+
+    async def price(self, request):
+        error = await self._admit()
+        if error is not None:
+            return error
+        code = request.query.get('FID_INPUT_ISCD', '')
+        price, diff, rate, volume = self._tick(code)
+        self.quotes += 1
+        return web.json_response({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리',
+                                  'output': {
+                                      'stck_shrn_iscd': code,
+                                      'stck_prpr': str(price),
+                                      'prdy_vrss': str(diff),
+                                      'prdy_ctrt': str(rate),
+                                      'acml_vol': str(volume),
+                                      'acml_tr_pbmn': str(volume * price),
+                                      'stck_oprc': str(price),
+                                      'stck_hgpr': str(price),
+                                      'stck_lwpr': str(price)}})
+
+    async def multi_price(self, request):
+        error = await self._admit()
+        if error is not None:
+            return error
+        output = []
+        for i in range(1, 31):
+            code = request.query.get(f'FID_INPUT_ISCD_{i}')
+            if not code:
+                break
+            price, diff, rate, volume = self._tick(code)
+            output.append({
+                'inter_shrn_iscd': code,
+                'inter2_prpr': str(price),
+                'inter2_prdy_vrss': str(abs(diff)),
+                'prdy_vrss_sign': '2' if diff >= 0 else '5',
+                'prdy_ctrt': str(abs(rate)),
+                'acml_vol': str(volume),
+                'acml_tr_pbmn': str(volume * price),
+                'inter2_oprc': str(price),
+                'inter2_hgpr': str(price),
+                'inter2_lwpr': str(price)})
+        self.quotes += len(output)
+        return web.json_response({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리',
+                                  'output': output})
+
+
+# -------------------------------------------------
+class FakeInflux:
+    """InfluxDB /api/v2/write 대역 서버. 받은 포인트 수와 마지막 수신 시각을 기록합니다."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.points = 0
+        self.bytes = 0
+        self.first_write = None
+        self.last_write = None
+
+    def stats(self):
+        return {'requests': self.requests, 'points': self.points, 'bytes': self.bytes,
+                'first_write': self.first_write, 'last_write': self.last_write}
+
+    def routes(self):
+        return [web.post('/api/v2/write', self.write)]
+
+    async def write(self, request):
+        # aiohttp 가 gzip 본문을 풀어서 주므로 전송 크기는 Content-Length 로 셈
+        body = await request.read()
+        self.bytes += request.content_length or len(body)
+        now = time.time()
+        self.first_write = self.first_write or now
+        self.last_write = now
+        self.requests += 1
+        self.points += sum(1 for line in body.split(b'\n') if line.strip())
+        return web.Response(status=204)
+
+
+# -------------------------------------------------
+def build_app(server):
+    app = web.Application()
+    app.add_routes(server.routes())
+
+    async def stats(request):
+        return web.json_response(server.stats())
+
+    async def reset(request):
+        server.reset()
+        return web.json_response(server.stats())
+
+    app.add_routes([web.get('/stats', stats), web.post('/reset', reset)])
+    return app
+
+
+# -------------------------------------------------
+async def serve(kis, influx, host='127.0.0.1', kis_port=0, influx_port=0):
+    """
+    두 서버를 시작합니다.
+
+    Returns:
+        tuple: (runners, kis_port, influx_port)
+    """
+    ports = []
+    runners = []
+    for server, port in ((kis, kis_port), (influx, influx_port)):
+        runner = web.AppRunner(build_app(server), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        runners.append(runner)
+        ports.append(site._server.sockets[0].getsockname()[1])
+    return runners, ports[0], ports[1]
+
+
+# -------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 KIS / InfluxDB 대역 서버")
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--rate-limit', type=int, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--kis-port', type=int, default=0)
+    parser.add_argument('--influx-port', type=int, default=0)
+    args = parser.parse_args()
+
+    kis = FakeKis(args.latency, args.jitter, args.rate_limit, args.error_rate)
+    influx = FakeInflux()
+
+    loop = asyncio.new_event_loop()
+    _, kis_port, influx_port = loop.run_until_complete(
+        serve(kis, influx, kis_port=args.kis_port, influx_port=args.influx_port))
+    print(f"READY {kis_port} {influx_port}", flush=True)
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+시세 파싱/직렬화 마이크로벤치마크.
+
+KIS 응답 output 을 종목 수만큼 파싱하여 stock_price line protocol 로 만드는 한 틱을
+이전 방식(dict + build_point + Point.to_line_protocol)과 Quote + LineEncoder 로 각각 실행하여
+종목당 CPU 시간과 메모리 할당(tracemalloc 최대 사용량, 시세 한 건 크기)을 비교합니다.
+전체 속도 향상이 목표치보다 작으면 종료 코드 1 을 반환합니다.
+
+사용법:
+    python bench/quote_encode.py [--codes 2000] [--repeat 7] [--min-speedup 2]
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from kis_api import _parse_price
+from influx_writer import build_point
+from quote import LineEncoder
+
+
+# -------------------------------------------------
+def make_outputs(n):
+    """inquire-price 응답 output 과 종목 리스트를 만듭니다."""
+    stocks, outputs = [], []
+    for i in range(n):
+        code = f"{i:06d}"
+        stocks.append({'code': code, 'name': f"종목 {i}"})
+        outputs.append({
+            'stck_shrn_iscd': code, 'stck_prpr': str(70000 + i), 'prdy_vrss': str(i % 900 - 450),
+            'prdy_ctrt': f"{(i % 600 - 300) / 100:.2f}", 'acml_vol': str(1000000 + i * 7),
+            'acml_tr_pbmn': str(70000000000 + i * 13), 'stck_oprc': '69000',
+            'stck_hgpr': '70500', 'stck_lwpr': '68800',
+        })
+    return stocks, outputs
+
+
+def parse_dict(output, stock_name):
+    # 이전 방식: 종목마다 dict 생성
+    return {
+        'stock_code': output['stck_shrn_iscd'],
+        'stock_name': stock_name,
+        'current_price': int(output['stck_prpr']),
+        'price_diff': int(output['prdy_vrss']),
+        'change_rate': float(output['prdy_ctrt']),
+        'volume': int(output['acml_vol']),
+        'trading_value': int(output['acml_tr_pbmn']),
+        'open_price': int(output['stck_oprc']),
+        'high_price': int(output['stck_hgpr']),
+        'low_price': int(output['stck_lwpr'])
+    }
+
+
+# -------------------------------------------------
+def tick_points(stocks, outputs):
+    """이전 방식: dict -> Point -> line protocol (배치 스레드가 하는 직렬화 포함)"""
+    lines = []
+    for stock, output in zip(stocks, outputs):
+        result = parse_dict(output, stock['name'])
+        lines.append(build_point(stock, result).to_line_protocol())
+    return '\n'.join(lines).encode('utf-8')
+
+
+def tick_encoder(stocks, outputs, encoder):
+    """Quote -> LineEncoder (재사용 버퍼)"""
+    quotes = [(stock, _parse_price(output, stock['name'])) for stock, output in zip(stocks, outputs)]
+    return encoder.encode(quotes)
+
+
+# -------------------------------------------------
+def best_seconds(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_bytes(fn):
+    """fn 실행 중 tracemalloc 최대 할당량"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def record_bytes(make, n):
+    """시세 n 건을 보관하는 데 드는 평균 크기"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records = [make(i) for i in range(n)]
+        return (tracemalloc.get_traced_memory()[0] - before) / len(records)
+    finally:
+        tracemalloc.stop()
+
+
+# -------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--codes', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-speedup', type=float, default=float(os.getenv('QUOTE_TARGET_SPEEDUP', '2')))
+    args = parser.parse_args()
+
+    stocks, outputs = make_outputs(args.codes)
+    encoder = LineEncoder()
+    # 결과가 같은지 먼저 확인 (종목별 태그 캐시도 이때 채워짐)
+    assert tick_points(stocks, outputs) == tick_encoder(stocks, outputs, encoder)
+
+    old_s = best_seconds(lambda: tick_points(stocks, outputs), args.repeat)
+    new_s = best_seconds(lambda: tick_encoder(stocks, outputs, encoder), args.repeat)
+    old_peak = peak_bytes(lambda: tick_points(stocks, outputs))
+    new_peak = peak_bytes(lambda: tick_encoder(stocks, outputs, encoder))
+    old_record = record_bytes(lambda i: parse_dict(outputs[i], stocks[i]['name']), args.codes)
+    new_record = record_bytes(lambda i: _parse_price(outputs[i], stocks[i]['name']), args.codes)
+
+    n = args.codes
+    speedup = old_s / new_s
+    print(f"한 틱 {n}종목 (최솟값, {args.repeat}회)")
+    print(f"  {'':24s} {'us/종목':>10s} {'최대 할당 B/종목':>18s} {'시세 한 건 B':>14s}")
+    print(f"  {'dict + Point':24s} {old_s / n * 1e6:10.2f} {old_peak / n:18.0f} {old_record:14.0f}")
+    print(f"  {'Quote + LineEncoder':24s} {new_s / n * 1e6:10.2f} {new_peak / n:18.0f} {new_record:14.0f}")
+    print(f"  속도 {speedup:.1f}배, 최대 할당 {old_peak / max(new_peak, 1):.1f}배 감소  목표 {args.min_speedup:.1f}배")
+
+    ok = speedup >= args.min_speedup
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+시작 시간/메모리 벤치마크.
+
+app 모듈을 새 프로세스에서 반복 import 하여 콜드 스타트 시간과 최대 RSS 를 측정하고,
+python -X importtime 결과에서 누적 import 시간이 큰 모듈을 출력합니다.
+목표치를 넘으면 종료 코드 1 을 반환합니다.
+
+사용법:
+    python bench/startup.py [--runs 5] [--module app] [--max-ms 1500] [--max-rss-mb 120]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -------------------------------------------------
+def run_once(module, env, importtime=False):
+    """
+    새 프로세스에서 모듈을 import 합니다.
+
+    Returns:
+        tuple: (경과 시간 ms, 최대 RSS MB, stderr)
+    """
+    args = [sys.executable]
+    if importtime:
+        args += ['-X', 'importtime']
+    args += ['-c', f'import {module}']
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(args, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = proc.stderr.read().decode('utf-8', 'replace')
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = (time.perf_counter() - start) * 1000
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f"{module} import 실패:\n{stderr}")
+    # Linux 의 ru_maxrss 는 KB 단위
+    return elapsed, usage.ru_maxrss / 1024, stderr
+
+
+# -------------------------------------------------
+def top_imports(stderr, n):
+    """importtime 출력에서 누적 시간이 큰 모듈 n 개를 반환합니다. [(모듈, ms)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        rows.append((name.strip(), int(cumulative) / 1000))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:n]
+
+
+# -------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--max-ms', type=float, default=float(os.getenv('STARTUP_TARGET_MS', '1500')))
+    parser.add_argument('--max-rss-mb', type=float, default=float(os.getenv('STARTUP_TARGET_RSS_MB', '120')))
+    args = parser.parse_args()
+
+    # 실제 설정/상태 파일을 건드리지 않도록 빈 설정 디렉토리 사용
+    config_dir = tempfile.mkdtemp(prefix='stock-monitor-bench-')
+    env = dict(os.environ, CONFIG_DIR=config_dir, PYTHONDONTWRITEBYTECODE='1')
+
+    # 첫 실행은 .pyc 생성 등 준비 단계로 보고 제외
+    run_once(args.module, dict(env, PYTHONDONTWRITEBYTECODE=''))
+    elapsed, rss = [], []
+    for _ in range(args.runs):
+        ms, mb, _ = run_once(args.module, env)
+        elapsed.append(ms)
+        rss.append(mb)
+    _, _, stderr = run_once(args.module, env, importtime=True)
+
+    median_ms = statistics.median(elapsed)
+    max_rss = max(rss)
+    print(f"import {args.module}: {args.runs}회")
+    print(f"  콜드 스타트  median {median_ms:8.1f} ms  (min {min(elapsed):.1f}, max {max(elapsed):.1f})  목표 {args.max_ms:.0f} ms")
+    print(f"  최대 RSS            {max_rss:8.1f} MB  목표 {args.max_rss_mb:.0f} MB")
+    print(f"  누적 import 시간 상위 {args.top}개:")
+    for name, ms in top_imports(stderr, args.top):
+        print(f"    {ms:8.1f} ms  {name}")
+
+    ok = median_ms <= args.max_ms and max_rss <= args.max_rss_mb
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_config_loaded = False
+_logging_ready = False
+
+# 운영 모드 로그를 출력하는 백그라운드 리스너
+_listener = None
+
+
+# -------------------------------------------------
+def load_config():
+    """
+    CONFIG_DIR/.env 를 환경 변수로 로드하는 함수. 여러 번 호출해도 한 번만 로드합니다.
+    """
+    global _config_loaded
+    if _config_loaded:
+        return
+    with _lock:
+        if not _config_loaded:
+            from dotenv import load_dotenv
+            load_dotenv(os.path.join(os.getenv('CONFIG_DIR', 'config'), '.env'))
+            _config_loaded = True
+
+
+# -------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    """
+    로그 레코드를 한 줄짜리 JSON 으로 만드는 포매터.
+    extra={'fields': {...}} 로 넘긴 값은 최상위 키로 함께 출력합니다.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+# -------------------------------------------------
+def setup_logging(mode=None, level=None):
+    """
+    로깅을 설정하는 함수. 여러 번 호출해도 한 번만 설정합니다.
+
+    Args:
+        mode (str): dev (Rich 콘솔) 또는 prod (JSON lines, 기본값 LOG_MODE)
+        level (str): 로그 레벨 (기본값 LOG_LEVEL, INFO)
+    """
+    global _logging_ready, _listener
+    if _logging_ready:
+        return
+    with _lock:
+        if _logging_ready:
+            return
+
+        mode = (mode or os.getenv('LOG_MODE', 'dev')).lower()
+        level = getattr(logging, (level or os.getenv('LOG_LEVEL', 'INFO')).upper(), logging.INFO)
+
+        if mode == 'prod':
+            # 호출 스레드는 큐에 넣기만 하고 JSON 변환과 출력은 리스너 스레드에서 처리
+            log_queue = queue.SimpleQueue()
+            stream_handler = logging.StreamHandler()
+            stream_handler.setFormatter(JsonFormatter())
+            _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+            _listener.start()
+            atexit.register(stop_logging)
+            handler = logging.handlers.QueueHandler(log_queue)
+        else:
+            # rich 는 dev 모드에서만 불러옴
+            from rich.logging import RichHandler
+            from rich.console import Console
+            from rich.theme import Theme
+
+            # 커스터마이징
+            custom_theme = Theme({
+                "info": "cyan",
+                "warning": "yellow",
+                "error": "red",
+                "critical": "red reverse"
+            })
+
+            console = Console(theme=custom_theme)
+            handler = RichHandler(
+                console=console,
+                rich_tracebacks=True,
+                tracebacks_show_locals=True,
+                show_time=True,
+                show_path=False
+            )
+
+        # 기본 로깅 설정
+        logging.basicConfig(
+            level=level,
+            format="%(message)s",
+            datefmt="[%X]",
+            handlers=[handler]
+        )
+
+        # APScheduler 로그는 오류만 출력 (루트 핸들러로 전달)
+        logging.getLogger('apscheduler').setLevel(logging.ERROR)
+
+        _logging_ready = True
+
+
+# -------------------------------------------------
+def stop_logging():
+    """prod 모드 리스너를 멈추고 큐에 남은 로그를 모두 출력합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# -------------------------------------------------
+def bootstrap():
+    """
+    실행 진입점에서 한 번 호출하는 초기화 함수. (설정 로드 후 로깅 설정)
+    상태 저장소(state_store.default_store)는 처음 사용할 때 열립니다.
+    """
+    load_config()
+    setup_logging()
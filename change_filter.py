@@ -0,0 +1,84 @@
+import os
+import time
+
+
+# -------------------------------------------------
+def parse_deadbands(value):
+    """
+    "필드:허용폭,필드:허용폭" 형식의 문자열을 딕셔너리로 변환합니다.
+    예: "change_rate:0.05,current_price:10"
+    """
+    deadbands = {}
+    for item in (value or "").split(','):
+        if not item.strip():
+            continue
+        field, width = item.split(':')
+        deadbands[field.strip()] = float(width)
+    return deadbands
+
+
+# -------------------------------------------------
+class ChangeFilter:
+    """
+    직전에 저장한 값과 비교하여 변하지 않은 시세는 저장하지 않는 필터.
+    종목코드별로 마지막으로 저장한 숫자 필드를 메모리에 보관합니다.
+
+    Args:
+        heartbeat (float): 변화가 없어도 저장하는 주기(분), 0 이면 사용하지 않음
+        deadbands (dict): 필드별 허용폭. 마지막 저장값과의 차이가 허용폭 이하이면 변화 없음으로 봄
+    """
+
+    def __init__(self, heartbeat=None, deadbands=None):
+        if heartbeat is None:
+            heartbeat = float(os.getenv('CHANGE_FILTER_HEARTBEAT', '10'))
+        if deadbands is None:
+            deadbands = parse_deadbands(os.getenv('CHANGE_FILTER_DEADBANDS'))
+        self.heartbeat = heartbeat * 60
+        self.deadbands = deadbands
+
+        self._last = {}
+        self.passed = 0
+        self.suppressed = 0
+
+    def should_write(self, code, result, now=None):
+        """
+        시세를 저장해야 하는지 확인합니다. 저장 대상이면 마지막 저장값을 갱신합니다.
+
+        Args:
+            code (str): 종목코드
+            result (dict): get_current_price 결과
+            now (float): 현재 시각 (epoch 초, 기본값 time.time())
+
+        Returns:
+            bool: 저장 여부
+        """
+        now = time.time() if now is None else now
+        fields = {key: value for key, value in result.items()
+                  if isinstance(value, (int, float))}
+
+        last = self._last.get(code)
+        if last is not None:
+            last_time, last_fields = last
+            heartbeat_due = self.heartbeat and now - last_time >= self.heartbeat
+            if not heartbeat_due and not self._changed(last_fields, fields):
+                self.suppressed += 1
+                return False
+
+        self._last[code] = (now, fields)
+        self.passed += 1
+        return True
+
+    def reset(self):
+        self._last.clear()
+
+    def _changed(self, last_fields, fields):
+        if last_fields.keys() != fields.keys():
+            return True
+        for key, value in fields.items():
+            width = self.deadbands.get(key)
+            if width is None:
+                if value != last_fields[key]:
+                    return True
+            elif abs(value - last_fields[key]) > width:
+                return True
+        return False
@@ -0,0 +1,169 @@
+import os
+import logging
+import threading
+
+import numpy as np
+
+from tick_store import grow_rows
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+class IndicatorEngine:
+    """
+    틱마다 전체 종목의 지표를 한 번에 갱신하는 증분 지표 엔진.
+    종목별 상태(이동평균 링, 누적합, EMA 값)를 NumPy 배열로 보관하므로
+    종목당 O(1), 전체 종목은 벡터 연산 한 번으로 계산합니다.
+
+    계산 지표:
+        sma_{n}: 최근 n 틱 현재가 단순이동평균
+        ema_{n}: 현재가 지수이동평균 (span n)
+        vwap: 당일 누적 거래대금 / 누적 거래량
+        volatility_{n}: 최근 n 틱 등락률 표준편차
+
+    Args:
+        max_codes (int): 처음 할당할 종목 수 (넘으면 두 배씩 늘림)
+        sma_window (int): 단순이동평균 구간
+        ema_spans (tuple): 지수이동평균 span 목록
+        vol_window (int): 변동성 계산 구간
+    """
+
+    def __init__(self, max_codes=None, sma_window=None, ema_spans=None, vol_window=None):
+        self.max_codes = max_codes or int(os.getenv('TICK_STORE_MAX_CODES', '256'))
+        self.sma_window = sma_window or int(os.getenv('INDICATOR_SMA_WINDOW', '20'))
+        self.ema_spans = tuple(ema_spans or (
+            int(span) for span in os.getenv('INDICATOR_EMA_SPANS', '12,26').split(',')))
+        self.vol_window = vol_window or int(os.getenv('INDICATOR_VOL_WINDOW', '20'))
+
+        n = self.max_codes
+        self.index = {}
+        self._lock = threading.Lock()
+
+        # 단순이동평균: 현재가 링과 누적합
+        self._sma_ring = np.zeros((n, self.sma_window))
+        self._sma_sum = np.zeros(n)
+        self._sma_pos = np.zeros(n, dtype=np.int64)
+        self._sma_count = np.zeros(n, dtype=np.int64)
+
+        # 지수이동평균
+        self._alphas = np.array([2.0 / (span + 1) for span in self.ema_spans])
+        self._ema = np.zeros((n, len(self.ema_spans)))
+        self._ema_ready = np.zeros(n, dtype=bool)
+
+        # 변동성: 등락률 링과 합, 제곱합
+        self._vol_ring = np.zeros((n, self.vol_window))
+        self._vol_sum = np.zeros(n)
+        self._vol_sumsq = np.zeros(n)
+        self._vol_pos = np.zeros(n, dtype=np.int64)
+        self._vol_count = np.zeros(n, dtype=np.int64)
+
+    def _rows(self, codes):
+        rows = []
+        with self._lock:
+            for code in codes:
+                row = self.index.get(code)
+                if row is None:
+                    if len(self.index) >= self.max_codes:
+                        self._grow()
+                    row = len(self.index)
+                    self.index[code] = row
+                rows.append(row)
+        return np.array(rows, dtype=np.int64)
+
+    def _grow(self):
+        # 종목별 상태 배열을 두 배로 늘림 (새 행은 빈 상태)
+        n = self.max_codes * 2
+        for name in ('_sma_ring', '_sma_sum', '_sma_pos', '_sma_count', '_ema', '_ema_ready',
+                     '_vol_ring', '_vol_sum', '_vol_sumsq', '_vol_pos', '_vol_count'):
+            setattr(self, name, grow_rows(getattr(self, name), n))
+        logger.info(f"지표 엔진을 {n}종목으로 늘렸습니다.")
+        self.max_codes = n
+
+    def update(self, items):
+        """
+        한 틱의 시세로 지표를 갱신합니다.
+
+        Args:
+            items (list): (stock, result) 튜플 리스트. result 는 get_current_price 결과
+
+        Returns:
+            list: (stock, 지표 딕셔너리) 튜플 리스트 (같은 종목은 한 번만)
+        """
+        # 같은 종목이 여러 번 있으면 마지막 값만 사용 (벡터 대입 시 중복 행 방지)
+        latest = {}
+        for stock, result in items:
+            latest[stock['code']] = (stock, result)
+        if not latest:
+            return []
+
+        rows = self._rows(latest)
+        entries = list(latest.values())
+
+        price = np.array([result['current_price'] for _, result in entries], dtype=np.float64)
+        change_rate = np.array([result['change_rate'] for _, result in entries], dtype=np.float64)
+        volume = np.array([result.get('volume', 0) for _, result in entries], dtype=np.float64)
+        trading_value = np.array([result.get('trading_value', 0) for _, result in entries],
+                                 dtype=np.float64)
+
+        sma = self._update_sma(rows, price)
+        ema = self._update_ema(rows, price)
+        volatility = self._update_volatility(rows, change_rate)
+        vwap = np.divide(trading_value, volume, out=np.full_like(price, np.nan),
+                         where=volume > 0)
+
+        results = []
+        for i, (stock, _) in enumerate(entries):
+            fields = {f"sma_{self.sma_window}": float(sma[i])}
+            for j, span in enumerate(self.ema_spans):
+                fields[f"ema_{span}"] = float(ema[i, j])
+            if not np.isnan(vwap[i]):
+                fields['vwap'] = float(vwap[i])
+            fields[f"volatility_{self.vol_window}"] = float(volatility[i])
+            results.append((stock, fields))
+        return results
+
+    def _update_sma(self, rows, price):
+        pos = self._sma_pos[rows]
+        # 링이 가득 차기 전에는 빠지는 값이 0 이므로 누적합이 그대로 유지됨
+        self._sma_sum[rows] += price - self._sma_ring[rows, pos]
+        self._sma_ring[rows, pos] = price
+        self._sma_pos[rows] = (pos + 1) % self.sma_window
+        self._sma_count[rows] = np.minimum(self._sma_count[rows] + 1, self.sma_window)
+
+        # 링이 한 바퀴 돌 때마다 누적합을 다시 계산하여 부동소수점 오차 누적 방지
+        wrapped = rows[self._sma_pos[rows] == 0]
+        if wrapped.size:
+            self._sma_sum[wrapped] = self._sma_ring[wrapped].sum(axis=1)
+        return self._sma_sum[rows] / self._sma_count[rows]
+
+    def _update_ema(self, rows, price):
+        ema = self._ema[rows]
+        ready = self._ema_ready[rows][:, None]
+        price = price[:, None]
+        ema = np.where(ready, ema + self._alphas * (price - ema), price)
+        self._ema[rows] = ema
+        self._ema_ready[rows] = True
+        return ema
+
+    def _update_volatility(self, rows, value):
+        pos = self._vol_pos[rows]
+        old = self._vol_ring[rows, pos]
+        self._vol_sum[rows] += value - old
+        self._vol_sumsq[rows] += value * value - old * old
+        self._vol_ring[rows, pos] = value
+        self._vol_pos[rows] = (pos + 1) % self.vol_window
+        count = np.minimum(self._vol_count[rows] + 1, self.vol_window)
+        self._vol_count[rows] = count
+
+        wrapped = rows[self._vol_pos[rows] == 0]
+        if wrapped.size:
+            ring = self._vol_ring[wrapped]
+            self._vol_sum[wrapped] = ring.sum(axis=1)
+            self._vol_sumsq[wrapped] = (ring * ring).sum(axis=1)
+
+        mean = self._vol_sum[rows] / count
+        variance = np.maximum(self._vol_sumsq[rows] / count - mean * mean, 0.0)
+        return np.sqrt(variance)
@@ -0,0 +1,167 @@
+import os
+import logging
+import functools
+
+from influxdb_client import InfluxDBClient, Point, WriteOptions
+from influxdb_client.client.write_api import SYNCHRONOUS
+
+from spool import Spool, SpoolReplayer, is_bad_request
+from quote import LineEncoder
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+def build_point(stock, result, measurement="stock_price", time=None):
+    """
+    시세 딕셔너리를 InfluxDB Point 로 변환하는 함수.
+    숫자 값만 필드로 저장합니다.
+
+    Args:
+        stock (dict): {'code', 'name'} 종목 정보
+        result (dict): get_current_price 결과
+        measurement (str): 측정값 이름
+        time (datetime): 포인트 시각 (없으면 InfluxDB 수신 시각)
+
+    Returns:
+        Point: InfluxDB Point
+    """
+    point = Point(measurement) \
+        .tag("code", stock['code']) \
+        .tag("name", stock['name'])
+
+    for key, value in result.items():
+        if isinstance(value, (int, float)):
+            point = point.field(key, value)
+    if time is not None:
+        point = point.time(time)
+    return point
+
+
+# -------------------------------------------------
+class InfluxWriter:
+    """
+    프로세스 전체에서 하나만 사용하는 InfluxDB 배치 writer.
+    write() 는 포인트를 내부 버퍼에 넣고 바로 반환하며, 실제 전송은
+    influxdb_client 의 배치 스레드가 batch_size 또는 flush_interval 기준으로
+    모아서 한 번의 line protocol 요청으로 처리합니다.
+
+    Args:
+        url, token, org, bucket (str): InfluxDB 접속 정보 (기본값 환경변수)
+        batch_size (int): 요청 하나에 담을 최대 포인트 수
+        flush_interval (int): 버퍼를 비우는 주기(ms)
+        gzip (bool): 요청 본문 gzip 압축 여부
+        spool (Spool): 저장 실패한 포인트를 보관할 스풀 (없으면 실패 시 버림)
+            다른 bucket (봉 집계 bucket 등) 의 실패 포인트는 스풀 아래 bucket 이름 디렉토리에 따로 보관합니다.
+    """
+
+    def __init__(self, url=None, token=None, org=None, bucket=None,
+                 batch_size=None, flush_interval=None, gzip=None, spool=None):
+        self.bucket = bucket or os.getenv('INFLUXDB_BUCKET')
+        self.batch_size = batch_size or int(os.getenv('INFLUXDB_BATCH_SIZE', '5000'))
+        self.flush_interval = flush_interval or int(os.getenv('INFLUXDB_FLUSH_INTERVAL', '1000'))
+        if gzip is None:
+            gzip = os.getenv('INFLUXDB_GZIP', 'true').lower() == 'true'
+
+        self.client = InfluxDBClient(url=url or os.getenv('INFLUXDB_URL'),
+                                     token=token or os.getenv('INFLUXDB_TOKEN'),
+                                     org=org or os.getenv('INFLUXDB_ORG'),
+                                     enable_gzip=gzip)
+        self.write_api = self.client.write_api(
+            write_options=WriteOptions(batch_size=self.batch_size,
+                                       flush_interval=self.flush_interval,
+                                       jitter_interval=0,
+                                       retry_interval=5000,
+                                       max_retries=3),
+            success_callback=self._on_success,
+            error_callback=self._on_error,
+            retry_callback=self._on_retry)
+
+        # 시세(stock_price) 전용 line protocol 인코더 (종목별 태그 캐시, 버퍼 재사용)
+        self.encoder = LineEncoder()
+
+        # 즉시 저장용 (스풀 재전송, 과거 시세 채우기)
+        self._sync_write_api = self.client.write_api(write_options=SYNCHRONOUS)
+
+        # 스풀이 있으면 InfluxDB 복구 후 재전송하는 스레드 시작
+        self.spool = spool
+        self.replayer = None
+        self._bucket_spools = {}
+        if spool is not None:
+            self.replayer = SpoolReplayer(spool, self.write_sync)
+            self.replayer.start()
+            # 이전 실행에서 남은 다른 bucket 스풀도 재전송
+            for name in sorted(os.listdir(spool.directory)):
+                if os.path.isdir(os.path.join(spool.directory, name)):
+                    self._spool_for(name)
+
+    def write(self, points, bucket=None):
+        """포인트 리스트를 배치 버퍼에 넣습니다. (전송을 기다리지 않음, bucket 기본값 self.bucket)"""
+        if points:
+            with registry.timer('influx_write_seconds'):
+                self.write_api.write(bucket=bucket or self.bucket, record=points)
+            registry.inc('influx_points_total', len(points))
+
+    def write_quotes(self, quotes, times=None, bucket=None):
+        """
+        시세를 Point 없이 line protocol 로 바로 변환하여 배치 버퍼에 넣습니다.
+        batch_size 종목씩 하나의 bytes 로 넘기므로 배치 스레드는 이를 한 항목으로 묶어 보냅니다.
+
+        Args:
+            quotes (list): (stock, Quote) 튜플 리스트
+            times (list or datetime): 시세별 시각 datetime 리스트, 또는 모든 시세에 붙일 시각 하나
+                (없으면 InfluxDB 수신 시각, 스풀 재전송 시 재전송 시각이 되므로 폴링은 틱 시각을 넘김)
+        """
+        for i in range(0, len(quotes), self.batch_size):
+            chunk = quotes[i:i + self.batch_size]
+            chunk_times = times[i:i + self.batch_size] if isinstance(times, list) else times
+            with registry.timer('influx_write_seconds'):
+                data = self.encoder.encode(chunk, chunk_times)
+                self.write_api.write(bucket=bucket or self.bucket, record=data)
+            registry.inc('influx_points_total', len(chunk))
+
+    def write_sync(self, data, bucket=None):
+        """line protocol 또는 포인트 리스트를 즉시 저장합니다. 실패하면 예외를 던집니다. (스풀 재전송, 과거 시세 채우기용)"""
+        self._sync_write_api.write(bucket=bucket or self.bucket, record=data)
+
+    def flush(self):
+        self.write_api.flush()
+
+    def close(self):
+        self.write_api.close()
+        if self.replayer is not None:
+            self.replayer.stop()
+            self.spool.close()
+        for spool, replayer in self._bucket_spools.values():
+            replayer.stop()
+            spool.close()
+        self.client.close()
+
+    def _spool_for(self, bucket):
+        # 기본 bucket 이 아닌 포인트는 bucket 별 스풀에 보관하고 그 bucket 으로 재전송
+        if not bucket or bucket == self.bucket:
+            return self.spool
+        if bucket not in self._bucket_spools:
+            spool = Spool(os.path.join(self.spool.directory, bucket), self.spool.segment_bytes,
+                          self.spool.max_bytes, self.spool.fsync_interval)
+            replayer = SpoolReplayer(spool, functools.partial(self.write_sync, bucket=bucket))
+            replayer.start()
+            self._bucket_spools[bucket] = (spool, replayer)
+        return self._bucket_spools[bucket][0]
+
+    def _on_success(self, conf, data):
+        registry.inc('influx_batches_total', result='success')
+
+    def _on_retry(self, conf, data, exception):
+        registry.inc('influx_retries_total')
+
+    def _on_error(self, conf, data, exception):
+        registry.inc('influx_batches_total', result='error')
+        if self.spool is None or is_bad_request(exception):
+            logger.error(f"InfluxDB 저장 실패: {exception}")
+            return
+        self._spool_for(conf[0]).append(data)
+        logger.warning(f"InfluxDB 저장 실패, 스풀에 보관: {exception}")
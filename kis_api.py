@@ -1,137 +1,428 @@
+from bootstrap import bootstrap
+
+if __name__ == "__main__":
+    # 아래 모듈 상수가 환경 변수를 읽으므로 직접 실행할 때는 .env 와 로깅을 먼저 초기화
+    bootstrap()
+
 import os
 import json
+import time
+import random
+import asyncio
 import logging
+import aiohttp
 import requests
-from dotenv import load_dotenv
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 
-from tinydb import TinyDB
-
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.theme import Theme
-
-
-# 커스터마이징 
-custom_theme = Theme({
-    "info": "cyan",
-    "warning": "yellow",
-    "error": "red",
-    "critical": "red reverse"
-})
-
-console = Console(theme=custom_theme)
-rich_handler = RichHandler(
-    console=console,
-    rich_tracebacks=True,
-    tracebacks_show_locals=True,
-    show_time=True,
-    show_path=False
-)
-
-# 기본 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",  
-    datefmt="[%X]",
-    handlers=[rich_handler]
-)
+from rate_limiter import TokenBucket, AdaptiveRateLimiter
+from token_manager import TokenManager
+from quote import Quote
+from state_store import default_store
+from metrics import registry
 
 # 로거 가져오기
 logger = logging.getLogger(__name__)
 
-# config 디렉토리의 .env 파일 로드
-load_dotenv(os.path.join(os.getenv('CONFIG_DIR', 'config'), '.env'))
-
-# TinyDB
-db_path = os.path.join(os.getenv('CONFIG_DIR', 'config'), 'db.json')
-db = TinyDB(db_path)
-
 APP_KEY = os.getenv('APP_KEY')
 APP_SECRET = os.getenv('APP_SECRET')
 ACCESS_TOKEN = None
 URL_BASE = "https://openapi.koreainvestment.com:9443"
 
+# 초당 거래건수 제한 및 동시 요청 수
+KIS_RATE_LIMIT = float(os.getenv('KIS_RATE_LIMIT', '15'))
+KIS_CONCURRENCY = int(os.getenv('KIS_CONCURRENCY', '10'))
+
+# 초당 거래건수 초과 응답에 따라 속도를 조절하는 범위와 증가량, 감소 배율
+KIS_RATE_MIN = float(os.getenv('KIS_RATE_MIN', '1'))
+KIS_RATE_MAX = float(os.getenv('KIS_RATE_MAX', '20'))
+KIS_RATE_INCREASE = float(os.getenv('KIS_RATE_INCREASE', '1'))
+KIS_RATE_DECREASE = float(os.getenv('KIS_RATE_DECREASE', '0.5'))
+
+# 초당 거래건수 초과로 거부된 요청을 다시 시도할 수 있는 틱 시작 후 시간(초), 재시도 기본 간격(초)
+KIS_TICK_DEADLINE = float(os.getenv('KIS_TICK_DEADLINE', '50'))
+KIS_BACKOFF = float(os.getenv('KIS_BACKOFF', '0.25'))
+
+# 틱 주기 안에서 조회를 끝낼 때 저장, 지표, 알림 처리에 남겨 둘 시간(초)
+KIS_TICK_MARGIN = float(os.getenv('KIS_TICK_MARGIN', '1'))
+
+# 멀티종목 시세조회 사용 여부 및 요청당 최대 종목 수
+KIS_MULTI_PRICE = os.getenv('KIS_MULTI_PRICE', 'true').lower() == 'true'
+MULTI_PRICE_CHUNK = 30
+
+# 커넥션 풀 크기, 연결/읽기 타임아웃(초), 재시도 횟수
+KIS_POOL_SIZE = int(os.getenv('KIS_POOL_SIZE', str(KIS_CONCURRENCY)))
+KIS_CONNECT_TIMEOUT = float(os.getenv('KIS_CONNECT_TIMEOUT', '3.05'))
+KIS_READ_TIMEOUT = float(os.getenv('KIS_READ_TIMEOUT', '5'))
+KIS_MAX_RETRIES = int(os.getenv('KIS_MAX_RETRIES', '2'))
+
+# 재시도 대상 HTTP 상태 코드
+RETRY_STATUS = (500, 502, 503, 504)
+
+# 초당 거래건수 초과 오류 코드
+RATE_LIMIT_MSG_CD = "EGW00201"
+
 
 # -------------------------------------------------
-def load_token():
+class RateLimitError(Exception):
+    """초당 거래건수 초과(EGW00201) 응답"""
+
+
+# -------------------------------------------------
+class DeadlineSkipped(RateLimitError):
+    """틱 마감 시각 전에 차례가 오지 않아 보내지 않은 요청"""
+
+
+# -------------------------------------------------
+def _response_json(data):
+    # 5xx 응답도 본문은 보통 JSON (예: 초당 거래건수 초과)
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            data = None
+    return data if isinstance(data, dict) else {}
+
+
+def is_rate_limited(data):
+    """응답(JSON 또는 본문)이 초당 거래건수 초과인지 확인합니다."""
+    return _response_json(data).get('msg_cd') == RATE_LIMIT_MSG_CD
+
+
+# -------------------------------------------------
+def record_kis_response(tr_id, status, data):
+    """
+    KIS 응답 오류를 HTTP 상태, rt_cd, msg_cd 별로 집계하는 함수. (정상 응답은 집계하지 않음)
+
+    Args:
+        tr_id (str): 거래 ID
+        status (int): HTTP 상태 코드
+        data (dict | str): 응답 JSON 또는 본문
+    """
+    data = _response_json(data)
+    rt_cd = data.get('rt_cd', '')
+    if status == 200 and rt_cd == '0':
+        return
+    msg_cd = data.get('msg_cd', '')
+    registry.inc('kis_errors_total', tr_id=tr_id, status=status, rt_cd=rt_cd, msg_cd=msg_cd)
+    if msg_cd == RATE_LIMIT_MSG_CD:
+        registry.inc('kis_rate_limited_total', tr_id=tr_id)
+
+
+# -------------------------------------------------
+class KisClient:
+    """
+    KIS API 호출에 공통으로 사용하는 장기 HTTP 클라이언트.
+    동기 호출용 requests.Session 과 비동기 호출용 aiohttp.ClientSession 을
+    같은 풀 크기, 타임아웃, 재시도 정책으로 구성하고 keep-alive 로 재사용하여
+    매 요청마다 TLS 핸드셰이크가 일어나지 않도록 합니다.
+
+    Args:
+        pool_size (int): 호스트당 최대 커넥션 수
+        connect_timeout (float): 연결 타임아웃(초)
+        read_timeout (float): 읽기 타임아웃(초)
+        max_retries (int): 연결 오류 및 5xx 응답 재시도 횟수
+    """
+
+    def __init__(self, pool_size=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None):
+        self.pool_size = pool_size or KIS_POOL_SIZE
+        self.connect_timeout = connect_timeout or KIS_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or KIS_READ_TIMEOUT
+        self.max_retries = KIS_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = (self.connect_timeout, self.read_timeout)
+
+        retry = Retry(total=self.max_retries,
+                      backoff_factor=0.2,
+                      status_forcelist=RETRY_STATUS,
+                      allowed_methods=frozenset(['GET']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=self.pool_size,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._async_session = None
+        self._async_session_loop = None
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        tr_id = (kwargs.get('headers') or {}).get('tr_id', '')
+        with registry.timer('kis_request_seconds', tr_id=tr_id):
+            res = self.session.get(url, **kwargs)
+        if res.status_code != 200:
+            record_kis_response(tr_id, res.status_code, res.text)
+        return res
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def async_session(self):
+        """현재 이벤트 루프에 묶인 aiohttp 세션을 반환합니다. (없으면 생성)"""
+        loop = asyncio.get_running_loop()
+        if (self._async_session is None or self._async_session.closed
+                or self._async_session_loop is not loop):
+            connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                             limit_per_host=self.pool_size,
+                                             keepalive_timeout=60)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout,
+                                            sock_read=self.read_timeout)
+            self._async_session = aiohttp.ClientSession(connector=connector,
+                                                        timeout=timeout)
+            self._async_session_loop = loop
+        return self._async_session
+
+    async def get_async(self, url, **kwargs):
+        """
+        비동기 GET 요청. 연결 오류, 타임아웃, 5xx 응답은 max_retries 만큼 재시도합니다.
+
+        Returns:
+            tuple: (HTTP 상태 코드, 200 이면 JSON 딕셔너리 / 아니면 응답 본문)
+        """
+        session = self.async_session()
+        tr_id = (kwargs.get('headers') or {}).get('tr_id', '')
+        attempt = 0
+        while True:
+            # 시도마다 지연과 오류를 기록 (재시도된 초당 거래건수 초과도 집계됨)
+            started = time.perf_counter()
+            try:
+                async with session.get(url, **kwargs) as res:
+                    if res.status == 200:
+                        data = await res.json(content_type=None)
+                        registry.observe('kis_request_seconds', time.perf_counter() - started,
+                                         tr_id=tr_id)
+                        record_kis_response(tr_id, res.status, data)
+                        return res.status, data
+                    text = await res.text()
+                    registry.observe('kis_request_seconds', time.perf_counter() - started,
+                                     tr_id=tr_id)
+                    record_kis_response(tr_id, res.status, text)
+                    # 초당 거래건수 초과는 호출한 쪽에서 속도를 줄인 뒤 다시 시도
+                    if res.status not in RETRY_STATUS or attempt >= self.max_retries \
+                            or is_rate_limited(text):
+                        return res.status, text
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                registry.inc('kis_errors_total', tr_id=tr_id, status=type(e).__name__,
+                             rt_cd='', msg_cd='')
+                if attempt >= self.max_retries:
+                    raise
+            registry.inc('kis_retries_total', tr_id=tr_id)
+            await asyncio.sleep(0.2 * (2 ** attempt))
+            attempt += 1
+
+    def run(self, coro):
+        """
+        전용 이벤트 루프에서 코루틴을 실행합니다.
+        틱마다 같은 루프를 사용하므로 aiohttp 커넥션이 틱 사이에도 유지됩니다.
+        """
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(coro)
+
+    def close(self):
+        with self._loop_lock:
+            if self._loop is not None and not self._loop.is_closed():
+                if self._async_session is not None and not self._async_session.closed:
+                    self._loop.run_until_complete(self._async_session.close())
+                self._loop.close()
+            self._async_session = None
+            self._loop = None
+        self.session.close()
+
+
+# 모든 KIS 호출 경로가 공유하는 클라이언트 (처음 사용할 때 생성)
+kis_client = None
+
+
+def get_kis_client():
+    global kis_client
+    if kis_client is None:
+        kis_client = KisClient()
+    return kis_client
+
+
+# -------------------------------------------------
+def load_token_record():
+    """
+    저장된 토큰과 발급 시각을 반환하는 함수.
+
+    Returns:
+        tuple: (access_token, issued_time) 또는 None
+    """
     # 테스트 환경에서는 항상 None 반환
     if os.getenv('CONFIG_DIR') == 'test_config':
         return None
-        
-    try:
-        token_table = db.table('token')
-        token_data = token_table.all()[-1] if token_table.all() else None
 
-        if not token_data or token_data['issued_time'] == "" or token_data['access_token'] == "":
-            return None
+    return default_store().load_token()
 
-        issued_time = datetime.fromisoformat(token_data['issued_time'])
-        current_time = datetime.now()
 
-        if current_time - issued_time < timedelta(hours=23):
-            return token_data['access_token']
-        return None
-    except (KeyError, json.JSONDecodeError):
+# -------------------------------------------------
+def load_token():
+    record = load_token_record()
+    if not record:
         return None
 
+    access_token, issued_time = record
+    current_time = datetime.now()
+
+    if current_time - issued_time < timedelta(hours=23):
+        return access_token
+    return None
+
 
 # -------------------------------------------------
 def save_token(access_token):
-    token_data = {
-        'access_token': access_token,
-        'issued_time': datetime.now().isoformat()
-    }
-    
-    # 테스트 환경에서는 직접 TinyDB 인스턴스를 생성
-    if os.getenv('CONFIG_DIR') == 'test_config':
-        test_db = TinyDB(os.path.join('test_config', 'db.json'))
-        token_table = test_db.table('token')
-        token_table.insert(token_data)
-        test_db.close()
-    else:
-        token_table = db.table('token')
-        token_table.insert(token_data)
-    
+    # 토큰은 키 하나에 덮어쓰므로 저장소 크기가 늘지 않음
+    default_store().save_token(access_token, datetime.now())
+
     logger.info("새로운 토큰이 저장되었습니다.")
 
 
 # -------------------------------------------------
-def auth():
+def issue_token(account=None):
+    """
+    접근 토큰을 새로 발급받아 반환하는 함수 (저장하지 않음)
+
+    Args:
+        account (KisAccount): 사용할 앱키 (기본값 APP_KEY)
+    """
+    url_base, app_key, app_secret = _credentials(account)
     PATH = "oauth2/tokenP"
-    URL = f"{URL_BASE}/{PATH}"
+    URL = f"{url_base}/{PATH}"
 
     data = {
         "grant_type": "client_credentials",
-        "appkey": APP_KEY,
-        "appsecret": APP_SECRET
+        "appkey": app_key,
+        "appsecret": app_secret
     }
 
-    res = requests.post(URL, json=data)
+    with registry.timer('kis_token_issue_seconds'):
+        res = get_kis_client().post(URL, json=data)
 
     if res.status_code == 200:
-        ACCESS_TOKEN = res.json()["access_token"]
-        save_token(ACCESS_TOKEN)
+        registry.inc('kis_token_issued_total')
+        return res.json()["access_token"]
     else:
+        registry.inc('kis_token_errors_total', status=res.status_code)
         logger.error("Error Code : " + str(res.status_code) + " | " + res.text)
         raise Exception("인증 실패")
 
 
 # -------------------------------------------------
-def get_current_price(stock_no, stock_name):
-    ACCESS_TOKEN = load_token()
-    if ACCESS_TOKEN == None:
-        auth()
-        ACCESS_TOKEN = load_token()
+def auth():
+    ACCESS_TOKEN = issue_token()
+    save_token(ACCESS_TOKEN)
+    return ACCESS_TOKEN
+
+
+# 메모리 토큰 관리자 (파일 저장소는 재시작 시 복원용, 처음 사용할 때 생성)
+token_manager = None
+
+
+def get_token_manager():
+    global token_manager
+    if token_manager is None:
+        token_manager = TokenManager(issue_token, load_token_record, save_token)
+    return token_manager
+
+
+# -------------------------------------------------
+class KisAccount:
+    """
+    기본 앱키(APP_KEY) 외에 추가로 사용하는 앱키 한 벌.
+    KIS 초당 거래건수 제한과 접근 토큰은 앱키마다 따로 적용되므로
+    앱키마다 토큰 관리자와 AIMD 속도 제한기를 따로 가지며,
+    토큰과 학습한 속도는 상태 저장소에 이름별 키(token:<name>, kis_rate:<name>)로 저장합니다.
+
+    Args:
+        name (str): 앱키 이름 (샤드 이름)
+        app_key (str): 앱키
+        app_secret (str): 앱 시크릿
+        url_base (str): KIS 서버 주소 (기본값 URL_BASE)
+    """
+
+    def __init__(self, name, app_key, app_secret, url_base=None):
+        self.name = name
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.url_base = url_base
+        self.token_key = f"token:{name}"
+        self.rate_key = f"kis_rate:{name}"
+        self.token_manager = TokenManager(self._issue, self._load, self._save)
+        self._rate_limiter = None
+
+    def __repr__(self):
+        return f"KisAccount({self.name!r})"
+
+    def get_rate_limiter(self):
+        if self._rate_limiter is None:
+            self._rate_limiter = _new_rate_limiter(self.rate_key)
+        return self._rate_limiter
+
+    def _issue(self):
+        return issue_token(self)
+
+    def _load(self):
+        if os.getenv('CONFIG_DIR') == 'test_config':
+            return None
+        return default_store().load_token(self.token_key)
+
+    def _save(self, access_token):
+        default_store().save_token(access_token, datetime.now(), self.token_key)
+        logger.info(f"새로운 토큰이 저장되었습니다. ({self.name})")
+
+
+# -------------------------------------------------
+def _credentials(account):
+    # 기본 앱키는 모듈 상수를 호출 시점에 읽음
+    if account is None:
+        return URL_BASE, APP_KEY, APP_SECRET
+    return account.url_base or URL_BASE, account.app_key, account.app_secret
+
+
+def _token_manager(account):
+    return get_token_manager() if account is None else account.token_manager
 
+# 토큰 만료 응답 코드
+TOKEN_EXPIRED_MSG_CD = "EGW00123"
+
+
+# -------------------------------------------------
+def _parse_price(output, stock_name):
+    # KIS 응답에서 바로 Quote 생성 (중간 dict 없음)
+    return Quote(
+        output['stck_shrn_iscd'],
+        stock_name,
+        int(output['stck_prpr']),
+        int(output['prdy_vrss']),
+        float(output['prdy_ctrt']),
+        int(output['acml_vol']),
+        int(output['acml_tr_pbmn']),
+        int(output['stck_oprc']),
+        int(output['stck_hgpr']),
+        int(output['stck_lwpr'])
+    )
+
+
+# -------------------------------------------------
+def _price_request(access_token, stock_no, account=None):
+    url_base, app_key, app_secret = _credentials(account)
     PATH = "uapi/domestic-stock/v1/quotations/inquire-price"
-    URL = f"{URL_BASE}/{PATH}"
+    URL = f"{url_base}/{PATH}"
 
     headers = {
         "Content-Type": "application/json",
-        "authorization": f"Bearer {ACCESS_TOKEN}",
-        "appKey": APP_KEY,
-        "appSecret": APP_SECRET,
+        "authorization": f"Bearer {access_token}",
+        "appKey": app_key,
+        "appSecret": app_secret,
         "tr_id": "FHKST01010100"
     }
 
@@ -139,26 +430,25 @@ def get_current_price(stock_no, stock_name):
         "FID_COND_MRKT_DIV_CODE": "J",
         "FID_INPUT_ISCD": stock_no
     }
+    return URL, headers, params
+
+
+# -------------------------------------------------
+def get_current_price(stock_no, stock_name):
+    ACCESS_TOKEN = get_token_manager().get()
 
-    res = requests.get(URL, headers=headers, params=params)
+    URL, headers, params = _price_request(ACCESS_TOKEN, stock_no)
+
+    res = get_kis_client().get(URL, headers=headers, params=params)
 
     if res.status_code == 200:
         data = res.json()
         if data['rt_cd'] == '0':
-            output = data['output']
-            return {
-                'stock_code': output['stck_shrn_iscd'],
-                'stock_name': stock_name,
-                'current_price': int(output['stck_prpr']),
-                'price_diff': int(output['prdy_vrss']),
-                'change_rate': float(output['prdy_ctrt']),
-                'volume': int(output['acml_vol']),
-                'trading_value': int(output['acml_tr_pbmn']),
-                'open_price': int(output['stck_oprc']),
-                'high_price': int(output['stck_hgpr']),
-                'low_price': int(output['stck_lwpr'])
-            }
+            return _parse_price(data['output'], stock_name)
         else:
+            record_kis_response(headers['tr_id'], res.status_code, data)
+            if data.get('msg_cd') == TOKEN_EXPIRED_MSG_CD:
+                get_token_manager().invalidate()
             logger.error(f"Error Code : {data['rt_cd']} | {data['msg_cd']} | {data['msg1']}")
             return None
     else:
@@ -166,6 +456,448 @@ def get_current_price(stock_no, stock_name):
         return None
 
 
+# -------------------------------------------------
+async def get_current_price_async(client, access_token, stock_no, stock_name, account=None):
+    """
+    get_current_price 의 비동기 버전. 공유 KisClient 의 aiohttp 세션을 사용합니다.
+    초당 거래건수 초과 응답이면 RateLimitError 를 던집니다.
+    """
+    URL, headers, params = _price_request(access_token, stock_no, account)
+
+    status, data = await client.get_async(URL, headers=headers, params=params)
+    if is_rate_limited(data):
+        raise RateLimitError(stock_no)
+    if status == 200:
+        if data['rt_cd'] == '0':
+            return _parse_price(data['output'], stock_name)
+        if data.get('msg_cd') == TOKEN_EXPIRED_MSG_CD:
+            _token_manager(account).invalidate()
+        logger.error(f"Error Code : {data['rt_cd']} | {data['msg_cd']} | {data['msg1']}")
+        return None
+    logger.error("Error Code : " + str(status) + " | " + data)
+    return None
+
+
+# 틱 사이에 학습한 속도를 유지하는 공유 속도 제한기 (처음 사용할 때 생성)
+rate_limiter = None
+
+
+# -------------------------------------------------
+def get_rate_limiter():
+    """
+    공유 AIMD 속도 제한기를 반환하는 함수.
+    처음 호출할 때 상태 저장소에 저장된 속도(kis_rate)로 시작하므로 재시작 후에도 학습한 속도를 이어갑니다.
+    """
+    global rate_limiter
+    if rate_limiter is None:
+        rate_limiter = _new_rate_limiter('kis_rate')
+    return rate_limiter
+
+
+def _new_rate_limiter(key):
+    rate = KIS_RATE_LIMIT
+    try:
+        rate = float(default_store().get(key, rate))
+    except Exception as e:
+        logger.error(f"저장된 요청 속도 로드 실패: {e}")
+    limiter = AdaptiveRateLimiter(rate, min_rate=KIS_RATE_MIN, max_rate=KIS_RATE_MAX,
+                                  increase=KIS_RATE_INCREASE, decrease=KIS_RATE_DECREASE)
+    limiter.saved_rate = limiter.rate
+    logger.info(f"KIS 요청 속도 초당 {limiter.rate:.1f}건으로 시작 ({key})")
+    return limiter
+
+
+# -------------------------------------------------
+def save_rate(limiter, account=None):
+    """학습한 요청 속도가 바뀌었으면 상태 저장소에 저장합니다. (틱마다 한 번)"""
+    if account is None:
+        key = 'kis_rate'
+        registry.set('kis_rate_limit', limiter.rate)
+    else:
+        key = account.rate_key
+        registry.set('kis_rate_limit', limiter.rate, shard=account.name)
+    if abs(limiter.rate - limiter.saved_rate) < 0.1:
+        return
+    try:
+        default_store().set(key, round(limiter.rate, 2))
+        limiter.saved_rate = limiter.rate
+    except Exception as e:
+        logger.error(f"요청 속도 저장 실패: {e}")
+
+
+def _rate_limiter(account):
+    return get_rate_limiter() if account is None else account.get_rate_limiter()
+
+
+# -------------------------------------------------
+async def call_limited(call, bucket, semaphore, deadline):
+    """
+    토큰 버킷을 거쳐 KIS 를 호출하는 함수.
+    초당 거래건수 초과로 거부되면 버킷에 알려 속도를 줄이고, deadline 전까지
+    지수 증가 + 무작위 간격(jitter)으로 다시 시도합니다.
+
+    Args:
+        call (callable): 코루틴을 반환하는 호출 함수
+        bucket (TokenBucket): 속도 제한기
+        semaphore (asyncio.Semaphore): 동시 요청 수 제한
+        deadline (float): 재시도 마감 시각 (이벤트 루프 시간)
+    """
+    loop = asyncio.get_running_loop()
+    attempt = 0
+    while True:
+        async with semaphore:
+            if not await bucket.acquire(deadline):
+                # 마감 시각 전에 차례가 오지 않는 요청은 보내지 않음 (다음 틱에서 조회)
+                registry.inc('kis_deadline_skipped_total')
+                raise DeadlineSkipped("조회 시간 초과")
+            try:
+                result = await call()
+            except RateLimitError:
+                if bucket.on_rate_limited():
+                    logger.warning(f"초당 거래건수 초과, 요청 속도를 초당 {bucket.rate:.1f}건으로 낮춤")
+            else:
+                bucket.on_success()
+                return result
+
+        delay = KIS_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+        if loop.time() + delay >= deadline:
+            registry.inc('kis_rate_limit_gave_up_total')
+            raise RateLimitError("재시도 시간 초과")
+        registry.inc('kis_rate_limit_retries_total')
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+# 직전 틱에 마감 시각까지 차례가 오지 않은 종목코드 (다음 틱에 먼저 조회)
+_deadline_skipped = set()
+
+
+def _skipped_first(items, code):
+    # 정렬은 안정적이므로 나머지 종목은 관심종목 순서를 유지
+    if not _deadline_skipped:
+        return list(items)
+    return sorted(items, key=lambda item: code(item) not in _deadline_skipped)
+
+
+def _remember_skipped(codes, skipped):
+    _deadline_skipped.difference_update(codes)
+    _deadline_skipped.update(skipped)
+    if skipped:
+        logger.warning(f"틱 마감 시각까지 조회하지 못한 종목 {len(skipped)}개 (다음 틱에 먼저 조회)")
+
+
+# -------------------------------------------------
+def tick_deadline(interval):
+    """
+    interval 초 주기 틱의 조회 마감 시각(이벤트 루프 시간)을 반환합니다. 이벤트 루프 안에서 호출합니다.
+    KIS_TICK_DEADLINE 과 interval - KIS_TICK_MARGIN (최소 interval 의 절반) 중 짧은 쪽이므로
+    등급별 조회처럼 주기가 짧아도 재시도가 다음 틱까지 늘어지지 않습니다.
+
+    Args:
+        interval (float): 이번 틱에 남은 시간(초)
+    """
+    budget = min(KIS_TICK_DEADLINE, max(interval - KIS_TICK_MARGIN, interval / 2))
+    return asyncio.get_running_loop().time() + budget
+
+
+# -------------------------------------------------
+async def get_current_prices_async(stock_list, rate=None, concurrency=None, client=None,
+                                   bucket=None, deadline=None, account=None):
+    """
+    관심종목 전체 시세를 동시에 조회하는 함수.
+    고정 딜레이 대신 토큰 버킷으로 초당 요청 수를 제한하므로
+    N 종목 조회에 약 N / rate 초가 걸립니다.
+
+    Args:
+        stock_list (list): {'code', 'name'} 딕셔너리 리스트
+        rate (float): 고정 초당 요청 수 (없으면 공유 AIMD 속도 제한기 사용)
+        concurrency (int): 동시에 진행할 최대 요청 수 (기본값 KIS_CONCURRENCY)
+        client (KisClient): 사용할 클라이언트 (기본값 get_kis_client())
+        bucket (TokenBucket): 다른 호출과 공유할 토큰 버킷
+        deadline (float): 초당 거래건수 초과 재시도 마감 시각 (기본값 지금 + KIS_TICK_DEADLINE)
+        account (KisAccount): 사용할 앱키 (기본값 APP_KEY, 앱키마다 토큰과 속도 제한기가 따로 있음)
+
+    Returns:
+        list: stock_list 와 같은 순서의 시세 딕셔너리 리스트 (실패한 종목은 None)
+    """
+    client = client or get_kis_client()
+    access_token = await _token_manager(account).get_async()
+
+    shared = bucket is None and rate is None
+    bucket = bucket or (TokenBucket(rate) if rate else _rate_limiter(account))
+    semaphore = asyncio.Semaphore(concurrency or KIS_CONCURRENCY)
+    deadline = deadline or asyncio.get_running_loop().time() + KIS_TICK_DEADLINE
+
+    skipped = set()
+
+    async def fetch(stock):
+        try:
+            return await call_limited(
+                lambda: get_current_price_async(client, access_token, stock['code'],
+                                                stock['name'], account),
+                bucket, semaphore, deadline)
+        except DeadlineSkipped:
+            skipped.add(stock['code'])
+            return None
+        except Exception as e:
+            logger.error(f"Error checking {stock['name']}: {str(e)}")
+            return None
+
+    # 요청 예산을 넘는 틱에도 같은 종목만 빠지지 않도록 직전 틱에 건너뛴 종목부터 조회
+    order = _skipped_first(range(len(stock_list)), lambda i: stock_list[i]['code'])
+    results = [None] * len(stock_list)
+    fetched = await asyncio.gather(*(fetch(stock_list[i]) for i in order))
+    for i, result in zip(order, fetched):
+        results[i] = result
+    _remember_skipped([stock['code'] for stock in stock_list], skipped)
+    if shared:
+        save_rate(bucket, account)
+    return results
+
+
+# -------------------------------------------------
+def _signed(value, sign):
+    # 전일 대비 부호 (4: 하한, 5: 하락)
+    value = abs(value)
+    return -value if sign in ('4', '5') else value
+
+
+# -------------------------------------------------
+def _parse_multi_price(row, stock_name):
+    sign = row.get('prdy_vrss_sign')
+    return Quote(
+        row['inter_shrn_iscd'],
+        stock_name,
+        int(row['inter2_prpr']),
+        _signed(int(row['inter2_prdy_vrss']), sign),
+        _signed(float(row['prdy_ctrt']), sign),
+        int(row['acml_vol']),
+        int(row['acml_tr_pbmn']),
+        int(row['inter2_oprc']),
+        int(row['inter2_hgpr']),
+        int(row['inter2_lwpr'])
+    )
+
+
+# -------------------------------------------------
+def _multi_price_request(access_token, codes, account=None):
+    url_base, app_key, app_secret = _credentials(account)
+    PATH = "uapi/domestic-stock/v1/quotations/intstock-multprice"
+    URL = f"{url_base}/{PATH}"
+
+    headers = {
+        "Content-Type": "application/json",
+        "authorization": f"Bearer {access_token}",
+        "appKey": app_key,
+        "appSecret": app_secret,
+        "tr_id": "FHKST11300006",
+        "custtype": "P"
+    }
+
+    params = {}
+    for i, code in enumerate(codes, start=1):
+        params[f"FID_COND_MRKT_DIV_CODE_{i}"] = "J"
+        params[f"FID_INPUT_ISCD_{i}"] = code
+    return URL, headers, params
+
+
+# -------------------------------------------------
+async def get_multi_price_async(client, access_token, stock_list, account=None):
+    """
+    멀티종목 시세조회(최대 30종목)를 한 번 호출하는 함수.
+    초당 거래건수 초과 응답이면 RateLimitError 를 던집니다.
+
+    Returns:
+        dict: 종목코드 -> 시세 딕셔너리 (응답에 없는 종목은 제외)
+    """
+    names = {stock['code']: stock['name'] for stock in stock_list}
+    URL, headers, params = _multi_price_request(access_token, list(names), account)
+
+    status, data = await client.get_async(URL, headers=headers, params=params)
+    if is_rate_limited(data):
+        raise RateLimitError(",".join(names))
+    if status != 200:
+        logger.error("Error Code : " + str(status) + " | " + data)
+        return {}
+    if data['rt_cd'] != '0':
+        if data.get('msg_cd') == TOKEN_EXPIRED_MSG_CD:
+            _token_manager(account).invalidate()
+        logger.error(f"Error Code : {data['rt_cd']} | {data['msg_cd']} | {data['msg1']}")
+        return {}
+
+    results = {}
+    for row in data.get('output') or []:
+        code = row.get('inter_shrn_iscd')
+        if code not in names:
+            continue
+        try:
+            results[code] = _parse_multi_price(row, names[code])
+        except (KeyError, ValueError) as e:
+            logger.error(f"멀티종목 시세 변환 실패 {code}: {e}")
+    return results
+
+
+# -------------------------------------------------
+async def get_current_prices_multi_async(stock_list, rate=None, concurrency=None,
+                                         client=None, deadline=None, account=None):
+    """
+    관심종목을 MULTI_PRICE_CHUNK 개씩 나누어 멀티종목 시세조회로 가져오는 함수.
+    멀티 조회에서 빠진 종목은 같은 토큰 버킷을 사용하는 단건 조회로 다시 시도합니다.
+    rate 를 주지 않으면 공유 AIMD 속도 제한기를 사용합니다. (get_current_prices_async 참고)
+
+    Returns:
+        list: stock_list 와 같은 순서의 시세 딕셔너리 리스트 (실패한 종목은 None)
+    """
+    client = client or get_kis_client()
+    access_token = await _token_manager(account).get_async()
+
+    bucket = TokenBucket(rate) if rate else _rate_limiter(account)
+    semaphore = asyncio.Semaphore(concurrency or KIS_CONCURRENCY)
+    deadline = deadline or asyncio.get_running_loop().time() + KIS_TICK_DEADLINE
+
+    # 중복 종목은 한 번만 조회 (직전 틱에 건너뛴 종목이 든 묶음부터)
+    unique = _skipped_first({stock['code']: stock for stock in stock_list}.values(),
+                            lambda stock: stock['code'])
+    chunks = [unique[i:i + MULTI_PRICE_CHUNK]
+              for i in range(0, len(unique), MULTI_PRICE_CHUNK)]
+
+    async def fetch(chunk):
+        try:
+            return await call_limited(
+                lambda: get_multi_price_async(client, access_token, chunk, account),
+                bucket, semaphore, deadline)
+        except DeadlineSkipped:
+            # 빠진 종목은 단건 조회에서 건너뛴 종목으로 기록됨
+            return {}
+        except Exception as e:
+            logger.error(f"멀티종목 시세 조회 실패: {str(e)}")
+            return {}
+
+    found = {}
+    for result in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+        found.update(result)
+
+    missing = [stock for stock in unique if stock['code'] not in found]
+    _deadline_skipped.difference_update(found)
+    if missing:
+        registry.inc('kis_multi_fallback_total', len(missing))
+        logger.warning(f"멀티종목 조회 누락 {len(missing)}건 단건 조회")
+        retried = await get_current_prices_async(missing, concurrency=concurrency,
+                                                 client=client, bucket=bucket,
+                                                 deadline=deadline, account=account)
+        for stock, result in zip(missing, retried):
+            if result:
+                found[stock['code']] = result
+
+    if not rate:
+        save_rate(bucket, account)
+    return [found.get(stock['code']) for stock in stock_list]
+
+
+# 분봉, 일봉 조회 요청당 최대 행 수
+MINUTE_CHART_ROWS = 120
+DAILY_CHART_ROWS = 100
+
+
+# -------------------------------------------------
+def _chart_request(access_token, path, tr_id, params, account=None):
+    url_base, app_key, app_secret = _credentials(account)
+    URL = f"{url_base}/{path}"
+
+    headers = {
+        "Content-Type": "application/json",
+        "authorization": f"Bearer {access_token}",
+        "appKey": app_key,
+        "appSecret": app_secret,
+        "tr_id": tr_id,
+        "custtype": "P"
+    }
+    return URL, headers, params
+
+
+# -------------------------------------------------
+async def _get_chart_rows(client, access_token, path, tr_id, params, account=None):
+    URL, headers, params = _chart_request(access_token, path, tr_id, params, account)
+
+    status, data = await client.get_async(URL, headers=headers, params=params)
+    if is_rate_limited(data):
+        raise RateLimitError(params.get('FID_INPUT_ISCD'))
+    if status != 200:
+        raise Exception("Error Code : " + str(status) + " | " + str(data))
+    if data['rt_cd'] != '0':
+        if data.get('msg_cd') == TOKEN_EXPIRED_MSG_CD:
+            _token_manager(account).invalidate()
+        raise Exception(f"Error Code : {data['rt_cd']} | {data['msg_cd']} | {data['msg1']}")
+    return data.get('output2') or []
+
+
+# -------------------------------------------------
+async def get_minute_bars_async(client, access_token, stock_no, date, hour, account=None):
+    """
+    주식일별분봉조회(FHKST03010230). date 의 hour 시각부터 과거로 최대 MINUTE_CHART_ROWS 개 분봉을 가져옵니다.
+    초당 거래건수 초과 응답이면 RateLimitError, 그 밖의 오류는 Exception 을 던집니다.
+
+    Args:
+        date (str): 조회 일자 (YYYYMMDD)
+        hour (str): 조회 시각 (HHMMSS, 이 시각 이전 분봉)
+
+    Returns:
+        list: 분봉 행 리스트 (stck_bsop_date, stck_cntg_hour, stck_prpr, stck_oprc, stck_hgpr,
+              stck_lwpr, cntg_vol, acml_tr_pbmn)
+    """
+    params = {
+        "FID_COND_MRKT_DIV_CODE": "J",
+        "FID_INPUT_ISCD": stock_no,
+        "FID_INPUT_DATE_1": date,
+        "FID_INPUT_HOUR_1": hour,
+        "FID_PW_DATA_INCU_YN": "Y",
+        "FID_FAKE_TICK_INCU_YN": ""
+    }
+    return await _get_chart_rows(client, access_token,
+                                 "uapi/domestic-stock/v1/quotations/inquire-time-dailychartprice",
+                                 "FHKST03010230", params, account)
+
+
+# -------------------------------------------------
+async def get_daily_bars_async(client, access_token, stock_no, start, end, account=None):
+    """
+    국내주식기간별시세(FHKST03010100). start ~ end 일봉을 최대 DAILY_CHART_ROWS 개 가져옵니다. (수정주가 기준)
+
+    Args:
+        start (str): 시작 일자 (YYYYMMDD)
+        end (str): 종료 일자 (YYYYMMDD)
+
+    Returns:
+        list: 일봉 행 리스트 (stck_bsop_date, stck_clpr, stck_oprc, stck_hgpr, stck_lwpr,
+              acml_vol, acml_tr_pbmn)
+    """
+    params = {
+        "FID_COND_MRKT_DIV_CODE": "J",
+        "FID_INPUT_ISCD": stock_no,
+        "FID_INPUT_DATE_1": start,
+        "FID_INPUT_DATE_2": end,
+        "FID_PERIOD_DIV_CODE": "D",
+        "FID_ORG_ADJ_PRC": "0"
+    }
+    return await _get_chart_rows(client, access_token,
+                                 "uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice",
+                                 "FHKST03010100", params, account)
+
+
+# -------------------------------------------------
+def get_current_prices(stock_list):
+    """
+    관심종목 시세를 멀티종목 조회로 한 번에 가져오는 동기 함수.
+
+    Args:
+        stock_list (list): {'code', 'name'} 딕셔너리 리스트
+
+    Returns:
+        list: stock_list 와 같은 순서의 시세 딕셔너리 리스트 (실패한 종목은 None)
+    """
+    return get_kis_client().run(get_current_prices_multi_async(stock_list))
+
+
 # -------------------------------------------------
 if __name__ == "__main__":
     result = get_current_price("012450", "한화에어로스페이스")
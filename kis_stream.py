@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import namedtuple
+from datetime import datetime
+
+import aiohttp
+import pytz
+
+import kis_api
+from quote import Quote
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+WS_URL = os.getenv('KIS_WS_URL', "ws://ops.koreainvestment.com:21000")
+
+# 실시간 체결가 TR 및 세션당 최대 등록 수
+TR_ID = "H0STCNT0"
+MAX_SUBSCRIPTIONS = 41
+
+# 웹소켓 접속키 재발급 주기(초) (접속키 유효기간 24시간보다 짧게)
+APPROVAL_KEY_TTL = 23 * 3600
+
+# H0STCNT0 응답 필드 순서
+FIELDS = (
+    "MKSC_SHRN_ISCD", "STCK_CNTG_HOUR", "STCK_PRPR", "PRDY_VRSS_SIGN", "PRDY_VRSS",
+    "PRDY_CTRT", "WGHN_AVRG_STCK_PRC", "STCK_OPRC", "STCK_HGPR", "STCK_LWPR",
+    "ASKP1", "BIDP1", "CNTG_VOL", "ACML_VOL", "ACML_TR_PBMN",
+    "SELN_CNTG_CSNU", "SHNU_CNTG_CSNU", "NTBY_CNTG_CSNU", "CTTR", "SELN_CNTG_SMTN",
+    "SHNU_CNTG_SMTN", "CCLD_DVSN", "SHNU_RATE", "PRDY_VOL_VRSS_ACML_VOL_RATE", "OPRC_HOUR",
+    "OPRC_VRSS_PRPR_SIGN", "OPRC_VRSS_PRPR", "HGPR_HOUR", "HGPR_VRSS_PRPR_SIGN", "HGPR_VRSS_PRPR",
+    "LWPR_HOUR", "LWPR_VRSS_PRPR_SIGN", "LWPR_VRSS_PRPR", "BSOP_DATE", "NEW_MKOP_CLS_CODE",
+    "TRHT_YN", "ASKP_RSQN1", "BIDP_RSQN1", "TOTAL_ASKP_RSQN", "TOTAL_BIDP_RSQN",
+    "VOL_TNRT", "PRDY_SMNS_HOUR_ACML_VOL", "PRDY_SMNS_HOUR_ACML_VOL_RATE", "HOUR_CLS_CODE",
+    "MRKT_TRTM_CLS_CODE", "VI_STND_PRC"
+)
+FIELD_COUNT = len(FIELDS)
+_IDX = {name: i for i, name in enumerate(FIELDS)}
+
+# 체결 틱
+Tick = namedtuple("Tick", [
+    "code", "date", "time", "current_price", "price_diff", "change_rate",
+    "open_price", "high_price", "low_price", "trade_volume", "volume", "trading_value"
+])
+
+korea_tz = pytz.timezone('Asia/Seoul')
+
+
+# -------------------------------------------------
+def get_approval_key():
+    """웹소켓 접속키를 발급받는 함수"""
+    URL = f"{kis_api.URL_BASE}/oauth2/Approval"
+
+    data = {
+        "grant_type": "client_credentials",
+        "appkey": kis_api.APP_KEY,
+        "secretkey": kis_api.APP_SECRET
+    }
+
+    res = kis_api.get_kis_client().post(URL, json=data)
+
+    if res.status_code == 200:
+        return res.json()["approval_key"]
+    else:
+        logger.error("Error Code : " + str(res.status_code) + " | " + res.text)
+        raise Exception("웹소켓 접속키 발급 실패")
+
+
+# -------------------------------------------------
+def subscribe_message(approval_key, code, subscribe=True):
+    return json.dumps({
+        "header": {
+            "approval_key": approval_key,
+            "custtype": "P",
+            "tr_type": "1" if subscribe else "2",
+            "content-type": "utf-8"
+        },
+        "body": {
+            "input": {
+                "tr_id": TR_ID,
+                "tr_key": code
+            }
+        }
+    })
+
+
+# -------------------------------------------------
+def parse_frame(frame):
+    """
+    실시간 데이터 프레임을 Tick 리스트로 변환하는 함수.
+    형식: 암호화여부|TR_ID|데이터건수|필드1^필드2^...  (건수만큼 필드가 이어짐)
+
+    Args:
+        frame (str): 웹소켓 텍스트 프레임
+
+    Returns:
+        list: Tick 리스트 (체결 데이터가 아니면 빈 리스트)
+    """
+    parts = frame.split('|', 3)
+    if len(parts) != 4 or parts[1] != TR_ID:
+        return []
+    if parts[0] != '0':
+        logger.warning(f"암호화된 프레임은 지원하지 않습니다: {parts[1]}")
+        return []
+
+    values = parts[3].split('^')
+    count = int(parts[2])
+    ticks = []
+    for n in range(count):
+        record = values[n * FIELD_COUNT:(n + 1) * FIELD_COUNT]
+        if len(record) < FIELD_COUNT:
+            break
+        ticks.append(_to_tick(record))
+    return ticks
+
+
+# -------------------------------------------------
+def _to_tick(record):
+    return Tick(
+        code=record[_IDX["MKSC_SHRN_ISCD"]],
+        date=record[_IDX["BSOP_DATE"]],
+        time=record[_IDX["STCK_CNTG_HOUR"]],
+        current_price=int(record[_IDX["STCK_PRPR"]]),
+        price_diff=int(record[_IDX["PRDY_VRSS"]]),
+        change_rate=float(record[_IDX["PRDY_CTRT"]]),
+        open_price=int(record[_IDX["STCK_OPRC"]]),
+        high_price=int(record[_IDX["STCK_HGPR"]]),
+        low_price=int(record[_IDX["STCK_LWPR"]]),
+        trade_volume=int(record[_IDX["CNTG_VOL"]]),
+        volume=int(record[_IDX["ACML_VOL"]]),
+        trading_value=int(record[_IDX["ACML_TR_PBMN"]])
+    )
+
+
+# -------------------------------------------------
+def tick_to_result(tick, stock_name):
+    """Tick 을 get_current_price 와 같은 Quote 로 변환합니다."""
+    return Quote(tick.code, stock_name, tick.current_price, tick.price_diff, tick.change_rate,
+                 tick.volume, tick.trading_value, tick.open_price, tick.high_price, tick.low_price)
+
+
+# -------------------------------------------------
+def tick_time(tick):
+    """체결 일자/시각(KST)을 timezone 이 있는 datetime 으로 변환합니다."""
+    return korea_tz.localize(datetime.strptime(tick.date + tick.time, "%Y%m%d%H%M%S"))
+
+
+# -------------------------------------------------
+class KisStream:
+    """
+    KIS 실시간 체결가(H0STCNT0) 웹소켓 수신기.
+    접속이 끊기면 재접속 후 모든 종목을 다시 등록합니다.
+    접속키는 APPROVAL_KEY_TTL 마다 다시 발급하며, 연결 중에 만료되면 새 접속키로 다시 접속합니다.
+
+    Args:
+        stock_list (list): {'code', 'name'} 딕셔너리 리스트
+        on_ticks (callable): 프레임마다 Tick 리스트를 받는 콜백
+        url (str): 웹소켓 주소 (기본값 KIS_WS_URL)
+        approval_key (str): 웹소켓 접속키 (없으면 발급)
+        reconnect_delay (float): 최초 재접속 대기 시간(초), 실패할 때마다 두 배 (최대 60초)
+    """
+
+    def __init__(self, stock_list, on_ticks, url=None, approval_key=None,
+                 reconnect_delay=1.0):
+        self.codes = _limit_codes(stock_list)
+        self.on_ticks = on_ticks
+        self.url = url or WS_URL
+        self.approval_key = approval_key
+        self._key_issued = time.monotonic() if approval_key else None
+        self.reconnect_delay = reconnect_delay
+        self.connections = 0
+        self._ws = None
+        self._loop = None
+        self._stopped = None
+        self._stop_requested = False
+
+    def _key_remaining(self):
+        # 접속키 만료까지 남은 시간(초)
+        return APPROVAL_KEY_TTL - (time.monotonic() - self._key_issued)
+
+    async def _refresh_key(self):
+        if self.approval_key is None or self._key_remaining() <= 0:
+            self.approval_key = await asyncio.to_thread(get_approval_key)
+            self._key_issued = time.monotonic()
+            logger.info("웹소켓 접속키 발급")
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._stop_requested:
+            return
+
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while not self._stopped.is_set():
+                try:
+                    await self._refresh_key()
+                    async with session.ws_connect(self.url) as ws:
+                        self.connections += 1
+                        delay = self.reconnect_delay
+                        self._ws = ws
+                        await self._subscribe(ws)
+                        if await self._receive(ws):
+                            # 접속키가 만료되어 끊은 연결은 기다리지 않고 새 접속키로 다시 접속
+                            continue
+                except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                    logger.warning(f"웹소켓 연결 오류: {e}")
+                except Exception as e:
+                    logger.error(f"웹소켓 처리 오류: {e}")
+                finally:
+                    self._ws = None
+
+                if self._stopped.is_set():
+                    break
+                logger.info(f"{delay:.1f}초 후 웹소켓 재접속")
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, 60)
+
+    def stop(self):
+        """수신을 중단합니다. 다른 스레드에서 호출해도 됩니다."""
+        self._stop_requested = True
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def update(self, stock_list):
+        """
+        등록 종목을 바꿉니다. 연결 중이면 빠진 종목은 해제하고 추가된 종목만 등록합니다.
+        (이벤트 루프 안에서 호출, 끊겨 있으면 재접속할 때 새 종목으로 등록)
+
+        Args:
+            stock_list (list): {'code', 'name'} 딕셔너리 리스트
+        """
+        codes = _limit_codes(stock_list)
+        removed = [code for code in self.codes if code not in codes]
+        added = [code for code in codes if code not in self.codes]
+        self.codes = codes
+        ws = self._ws
+        if ws is None or ws.closed or not (removed or added):
+            return
+
+        for code in removed:
+            await ws.send_str(subscribe_message(self.approval_key, code, subscribe=False))
+        for code in added:
+            await ws.send_str(subscribe_message(self.approval_key, code))
+        logger.info(f"실시간 등록 종목 변경 (추가 {len(added)}, 해제 {len(removed)}, 전체 {len(codes)}종목)")
+
+    async def _subscribe(self, ws):
+        for code in self.codes:
+            await ws.send_str(subscribe_message(self.approval_key, code))
+
+    async def _receive(self, ws):
+        """프레임을 받아 처리합니다. 접속키가 만료되어 연결을 끊었으면 True 를 반환합니다."""
+        stop_task = asyncio.ensure_future(self._stopped.wait())
+        try:
+            while True:
+                receive_task = asyncio.ensure_future(ws.receive())
+                done, _ = await asyncio.wait({receive_task, stop_task},
+                                             timeout=max(self._key_remaining(), 0),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if stop_task in done:
+                    receive_task.cancel()
+                    await ws.close()
+                    return False
+                if not done:
+                    receive_task.cancel()
+                    logger.info("웹소켓 접속키 만료, 새 접속키로 다시 접속")
+                    await ws.close()
+                    return True
+
+                msg = receive_task.result()
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                    aiohttp.WSMsgType.ERROR):
+                        raise ConnectionError("웹소켓 연결이 종료되었습니다.")
+                    continue
+
+                data = msg.data
+                if data[0] in '01':
+                    ticks = parse_frame(data)
+                    if ticks:
+                        self.on_ticks(ticks)
+                else:
+                    await self._handle_control(ws, data)
+        finally:
+            stop_task.cancel()
+
+    async def _handle_control(self, ws, data):
+        message = json.loads(data)
+        tr_id = message.get('header', {}).get('tr_id')
+        if tr_id == 'PINGPONG':
+            await ws.send_str(data)
+            return
+
+        body = message.get('body', {})
+        if body.get('rt_cd') not in (None, '0'):
+            logger.error(f"실시간 등록 오류: {body.get('msg_cd')} | {body.get('msg1')}")
+
+
+# -------------------------------------------------
+def _limit_codes(stock_list):
+    # 중복을 뺀 종목코드 (세션당 최대 등록 수까지)
+    codes = list(dict.fromkeys(stock['code'] for stock in stock_list))
+    if len(codes) > MAX_SUBSCRIPTIONS:
+        logger.warning(f"실시간 등록은 세션당 {MAX_SUBSCRIPTIONS}종목까지 가능합니다. "
+                       f"{len(codes) - MAX_SUBSCRIPTIONS}종목은 제외됩니다.")
+    return codes[:MAX_SUBSCRIPTIONS]
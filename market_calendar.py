@@ -0,0 +1,202 @@
+import os
+import json
+import logging
+import datetime
+from bisect import bisect_left, bisect_right
+
+import pytz
+from apscheduler.triggers.base import BaseTrigger
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+korea_tz = pytz.timezone('Asia/Seoul')
+
+# 정규장 시간 (15:20 ~ 15:30 종가 단일가 매매 포함)
+REGULAR_OPEN = datetime.time(9, 0)
+REGULAR_CLOSE = datetime.time(15, 30)
+
+# 폐장 시각의 1분(종가 단일가 체결)까지 세션에 포함 (15:30 종가 저장)
+CLOSE_MINUTE = 60
+
+# KRX 휴장일
+KRX_HOLIDAYS = (
+    # 2025
+    "2025-01-01", "2025-01-27", "2025-01-28", "2025-01-29", "2025-01-30",
+    "2025-03-03", "2025-05-01", "2025-05-05", "2025-05-06", "2025-06-03",
+    "2025-06-06", "2025-08-15", "2025-10-03", "2025-10-06", "2025-10-07",
+    "2025-10-08", "2025-10-09", "2025-12-25", "2025-12-31",
+    # 2026
+    "2026-01-01", "2026-02-16", "2026-02-17", "2026-02-18", "2026-03-02",
+    "2026-05-01", "2026-05-05", "2026-05-25", "2026-06-03", "2026-08-17",
+    "2026-09-24", "2026-09-25", "2026-10-05", "2026-10-09", "2026-12-25",
+    "2026-12-31",
+)
+
+# 수능일: 개장/폐장 1시간 지연 (10:00 ~ 16:30)
+EXAM_DAYS = ("2025-11-13", "2026-11-19")
+
+
+# -------------------------------------------------
+def _dates(values):
+    return {datetime.date.fromisoformat(value) for value in values}
+
+
+# -------------------------------------------------
+class MarketCalendar:
+    """
+    KRX 거래 세션 테이블.
+    휴장일, 수능일 지연 개장, 연초 첫 거래일 10시 개장을 반영한 세션을 미리 계산하여
+    정렬된 개장/폐장 시각 배열에 보관하고, 이진 탐색으로 O(log n) 조회합니다.
+
+    Args:
+        holidays (iterable): 휴장일 (YYYY-MM-DD)
+        exam_days (iterable): 1시간 지연 개장일 (YYYY-MM-DD)
+        start (date): 테이블 시작일 (기본값 휴장일 중 가장 이른 해의 1월 1일)
+        end (date): 테이블 종료일 (기본값 내년 12월 31일, 휴장일 정보가 없는 해는 평일만 반영)
+    """
+
+    def __init__(self, holidays=KRX_HOLIDAYS, exam_days=EXAM_DAYS, start=None, end=None):
+        holidays = _dates(holidays)
+        exam_days = _dates(exam_days)
+        this_year = datetime.date.today().year
+        years = sorted(day.year for day in holidays) or [this_year]
+        self.last_holiday_year = years[-1]
+        self.start = start or datetime.date(years[0], 1, 1)
+        self.end = end or datetime.date(max(years[-1], this_year + 1), 12, 31)
+
+        self.opens = []
+        self.closes = []
+        first_of_year = None
+        day = self.start
+        while day <= self.end:
+            if day.weekday() < 5 and day not in holidays:
+                open_time, close_time = REGULAR_OPEN, REGULAR_CLOSE
+                if day in exam_days:
+                    open_time, close_time = datetime.time(10, 0), datetime.time(16, 30)
+                elif first_of_year != day.year:
+                    # 연초 첫 거래일은 10시 개장
+                    open_time = datetime.time(10, 0)
+                first_of_year = day.year
+                self.opens.append(self._timestamp(day, open_time))
+                self.closes.append(self._timestamp(day, close_time))
+            day += datetime.timedelta(days=1)
+
+    @staticmethod
+    def _timestamp(day, time):
+        return korea_tz.localize(datetime.datetime.combine(day, time)).timestamp()
+
+    @staticmethod
+    def _to_ts(t):
+        if t.tzinfo is None:
+            t = korea_tz.localize(t)
+        return t.timestamp()
+
+    @staticmethod
+    def _to_datetime(ts):
+        return datetime.datetime.fromtimestamp(ts, korea_tz)
+
+    def is_open(self, t):
+        """t 가 거래 세션(개장 <= t < 폐장 + 1분, 종가 단일가 포함) 안에 있는지 확인합니다."""
+        ts = self._to_ts(t)
+        i = bisect_right(self.opens, ts) - 1
+        return i >= 0 and ts < self.closes[i] + CLOSE_MINUTE
+
+    def session(self, t):
+        """t 가 속한 세션의 (개장, 폐장) 시각을 반환합니다. 세션(폐장 분 포함) 밖이면 None."""
+        ts = self._to_ts(t)
+        i = bisect_right(self.opens, ts) - 1
+        if i >= 0 and ts < self.closes[i] + CLOSE_MINUTE:
+            return self._to_datetime(self.opens[i]), self._to_datetime(self.closes[i])
+        return None
+
+    def sessions(self, start, end):
+        """
+        개장 시각이 start 이상 end 미만인 세션 리스트를 반환합니다.
+
+        Returns:
+            list: (개장, 폐장) datetime 튜플 리스트
+        """
+        lo = bisect_left(self.opens, self._to_ts(start))
+        hi = bisect_left(self.opens, self._to_ts(end))
+        return [(self._to_datetime(self.opens[i]), self._to_datetime(self.closes[i]))
+                for i in range(lo, hi)]
+
+    def next_open(self, t):
+        """t 이후(t 포함) 가장 가까운 개장 시각을 반환합니다. 테이블 범위를 벗어나면 None."""
+        i = bisect_left(self.opens, self._to_ts(t))
+        if i >= len(self.opens):
+            return None
+        return self._to_datetime(self.opens[i])
+
+
+# -------------------------------------------------
+_calendar = None
+
+
+def default_calendar():
+    """
+    기본 캘린더를 반환합니다. CONFIG_DIR/holidays.json 이 있으면
+    {"holidays": [...], "exam_days": [...]} 항목을 기본 테이블에 추가합니다.
+    """
+    global _calendar
+    if _calendar is None:
+        holidays, exam_days = list(KRX_HOLIDAYS), list(EXAM_DAYS)
+        path = os.path.join(os.getenv('CONFIG_DIR', 'config'), 'holidays.json')
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    extra = json.load(f)
+                holidays += extra.get('holidays', [])
+                exam_days += extra.get('exam_days', [])
+            except Exception as e:
+                logger.error(f"휴장일 파일 로드 실패: {e}")
+        _calendar = MarketCalendar(holidays, exam_days)
+        if datetime.date.today().year > _calendar.last_holiday_year:
+            logger.warning(f"{datetime.date.today().year}년 휴장일 정보가 없습니다. "
+                           f"holidays.json 에 추가해 주세요.")
+    return _calendar
+
+
+# -------------------------------------------------
+class MarketSessionTrigger(BaseTrigger):
+    """
+    거래 세션 안에서만 interval 초 간격(정각 기준)으로 실행하는 APScheduler 트리거.
+    폐장 시각(15:30, 종가 단일가 체결)에 마지막으로 한 번 실행하고,
+    세션이 끝나면 다음 개장 시각으로 바로 건너뛰므로 장 밖에서는 깨어나지 않습니다.
+
+    Args:
+        calendar (MarketCalendar): 거래 세션 테이블
+        interval (int): 실행 간격(초)
+    """
+
+    def __init__(self, calendar=None, interval=60):
+        self.calendar = calendar or default_calendar()
+        self.interval = interval
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        if previous_fire_time is not None:
+            candidate = previous_fire_time + datetime.timedelta(seconds=self.interval)
+            if candidate < now:
+                candidate = now
+        else:
+            candidate = now
+        candidate = self._align(candidate)
+
+        session = self.calendar.session(candidate)
+        if session is not None and candidate <= session[1]:
+            return candidate
+        # 세션 밖이면 다음 개장 시각까지 바로 대기 (테이블 범위를 벗어나면 None)
+        return self.calendar.next_open(candidate)
+
+    def _align(self, t):
+        # 실행 간격 단위로 올림 (예: 60초면 매 분 정각)
+        ts = t.timestamp()
+        remainder = ts % self.interval
+        if remainder:
+            ts += self.interval - remainder
+        return datetime.datetime.fromtimestamp(ts, korea_tz)
+
+    def __str__(self):
+        return f"market_session[interval={self.interval}s]"
@@ -0,0 +1,210 @@
+import time
+import logging
+import threading
+from bisect import bisect_left
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 자체 모니터링 측정값 이름
+MEASUREMENT = "stock_monitor_internal"
+
+# 지연 히스토그램 구간 상한(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+# -------------------------------------------------
+class Histogram:
+    """
+    고정 구간 히스토그램. observe 는 구간 탐색(bisect)과 덧셈만 하므로 핫 패스에서 사용할 수 있습니다.
+
+    Args:
+        buckets (tuple): 구간 상한 (오름차순, 마지막 구간 뒤에 +Inf 가 붙음)
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """구간 안에서 선형 보간한 분위수 추정값 (0 < q < 1, 관측값이 없으면 None)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for upper, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+
+# -------------------------------------------------
+class _Timer:
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+# -------------------------------------------------
+class Metrics:
+    """
+    카운터, 게이지, 지연 히스토그램을 모아 두는 자체 모니터링 레지스트리.
+    같은 이름이라도 label 조합마다 별도 시계열로 보관하며,
+    points() 로 InfluxDB 포인트(stock_monitor_internal)를, render() 로 /metrics 텍스트를 만듭니다.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """카운터를 증가시킵니다."""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """게이지 값을 설정합니다."""
+        key = _key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        """히스토그램에 관측값(초)을 추가합니다."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+        """with 블록의 소요 시간을 히스토그램에 기록하는 타이머"""
+        return _Timer(self, name, labels)
+
+    def get(self, name, **labels):
+        """카운터 또는 게이지 값을 반환합니다. (없으면 0)"""
+        key = _key(name, labels)
+        return self.counters.get(key, self.gauges.get(key, 0))
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    # -------------------------------------------------
+    def points(self, measurement=MEASUREMENT, time=None):
+        """
+        현재 값을 InfluxDB Point 리스트로 만듭니다. (시계열마다 하나, 카운터는 누적값)
+        히스토그램은 count, sum, p50, p90, p99 필드로 저장합니다.
+        time 을 주면 모든 포인트에 그 시각을 붙입니다. (스풀 재전송 시에도 원래 시각 유지)
+        """
+        from influxdb_client import Point
+
+        with self._lock:
+            counters = list(self.counters.items())
+            gauges = list(self.gauges.items())
+            histograms = [(key, histogram.count, histogram.sum,
+                           histogram.quantile(0.5), histogram.quantile(0.9),
+                           histogram.quantile(0.99))
+                          for key, histogram in self.histograms.items()]
+
+        points = []
+        for (name, labels), value in counters + gauges:
+            point = Point(measurement).tag('metric', name)
+            for label, label_value in labels:
+                point = point.tag(label, label_value)
+            point = point.field('value', float(value))
+            points.append(point.time(time) if time is not None else point)
+        for (name, labels), count, total, p50, p90, p99 in histograms:
+            point = Point(measurement).tag('metric', name)
+            for label, label_value in labels:
+                point = point.tag(label, label_value)
+            point = point.field('count', count).field('sum', total)
+            for field, value in (('p50', p50), ('p90', p90), ('p99', p99)):
+                if value is not None:
+                    point = point.field(field, value)
+            points.append(point.time(time) if time is not None else point)
+        return points
+
+    def render(self, prefix="stock_monitor_"):
+        """Prometheus 텍스트 형식(/metrics)으로 현재 값을 출력합니다."""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, list(histogram.counts), histogram.buckets,
+                                 histogram.sum, histogram.count)
+                                for key, histogram in self.histograms.items())
+
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}{name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{prefix}{name}{_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            header(name, 'gauge')
+            lines.append(f"{prefix}{name}{_labels(labels)} {value}")
+        for (name, labels), counts, buckets, total, count in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for upper, bucket_count in zip(buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if upper == float('inf') else repr(float(upper))
+                lines.append(f"{prefix}{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{prefix}{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{prefix}{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# -------------------------------------------------
+def _labels(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _key(name, labels):
+    # label 값은 문자열로 통일 (정렬, 태그 변환용)
+    return (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+
+
+# 프로세스 전체에서 공유하는 레지스트리
+registry = Metrics()
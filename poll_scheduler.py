@@ -0,0 +1,223 @@
+import os
+import time
+import heapq
+import logging
+
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 스케줄러가 깨어나는 간격(초)과 등급별 조회 간격(초)
+POLL_TICK = int(os.getenv('POLL_TICK', '5'))
+POLL_INTERVALS = {
+    'hot': float(os.getenv('POLL_HOT_INTERVAL', '5')),
+    'normal': float(os.getenv('POLL_NORMAL_INTERVAL', '60')),
+    'quiet': float(os.getenv('POLL_QUIET_INTERVAL', '300')),
+}
+
+# 활발한 종목 기준: 등락률 절댓값(%), 직전 조회 대비 등락률 변화(%p), 거래량 증가 속도 배율
+POLL_HOT_CHANGE = float(os.getenv('POLL_HOT_CHANGE', '5'))
+POLL_HOT_MOVE = float(os.getenv('POLL_HOT_MOVE', '0.5'))
+POLL_HOT_VOLUME = float(os.getenv('POLL_HOT_VOLUME', '3'))
+
+# 활발한 종목으로 유지하는 시간(초), 조용한 종목이 되는 연속 무변화 조회 횟수
+POLL_HOT_HOLD = float(os.getenv('POLL_HOT_HOLD', '60'))
+POLL_QUIET_AFTER = int(os.getenv('POLL_QUIET_AFTER', '3'))
+
+# 초당 요청 수 중 조회 예산으로 쓰는 비율 (나머지는 멀티 조회 누락 단건 조회, 재시도용)
+POLL_BUDGET_RATIO = float(os.getenv('POLL_BUDGET_RATIO', '0.8'))
+
+
+# -------------------------------------------------
+class _CodeState:
+    __slots__ = ('stock', 'tier', 'pinned', 'due', 'polled_at', 'price', 'change_rate',
+                 'volume', 'flow', 'hot_until', 'calm')
+
+    def __init__(self, stock):
+        self.stock = stock
+        self.pinned = stock.get('tier') in POLL_INTERVALS
+        self.tier = stock['tier'] if self.pinned else 'normal'
+        self.due = 0.0
+        self.polled_at = None
+        self.price = None
+        self.change_rate = None
+        self.volume = None
+        self.flow = None
+        self.hot_until = 0.0
+        self.calm = 0
+
+
+# -------------------------------------------------
+class PollScheduler:
+    """
+    종목별 다음 조회 시각을 힙에 보관하는 등급별 조회 스케줄러.
+    활발한 종목(hot)은 몇 초마다, 보통 종목은 1분마다, 조용한 종목(quiet)은 몇 분마다 조회하며,
+    한 번에 꺼내는 종목 수는 예산(budget) 이내로 제한합니다. 예산을 넘어 밀린 종목은
+    다음 조회 시각이 가장 이르므로 다음 틱에 먼저 나갑니다.
+
+    등급은 stocks.json 의 tier(hot, normal, quiet)로 고정하거나, 조회 결과로 판단합니다.
+        hot    등락률 절댓값 >= POLL_HOT_CHANGE, 직전 대비 등락률 변화 >= POLL_HOT_MOVE,
+               또는 초당 거래량 증가분이 평균의 POLL_HOT_VOLUME 배 이상 (POLL_HOT_HOLD 초 유지)
+        quiet  가격과 거래량이 POLL_QUIET_AFTER 번 연속 그대로
+        normal 그 밖의 종목
+
+    Args:
+        intervals (dict): 등급별 조회 간격(초)
+        budget (int or callable): 한 번에 꺼낼 최대 종목 수 (없으면 제한 없음)
+        clock (callable): 현재 시각 함수 (테스트용)
+    """
+
+    def __init__(self, intervals=None, budget=None, clock=time.monotonic):
+        self.intervals = dict(POLL_INTERVALS, **(intervals or {}))
+        self.budget = budget
+        self.clock = clock
+        self.states = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self.states)
+
+    def sync(self, stocks):
+        """
+        관심종목 목록을 반영합니다. 새 종목은 바로 조회 대상이 되고 빠진 종목은 제거됩니다.
+        (힙에 남은 빠진 종목 항목은 꺼낼 때 버림)
+        """
+        codes = set()
+        for stock in stocks:
+            code = stock['code']
+            codes.add(code)
+            state = self.states.get(code)
+            if state is None:
+                state = self.states[code] = _CodeState(stock)
+                heapq.heappush(self._heap, (state.due, code))
+            elif state.stock is not stock:
+                state.stock = stock
+                pinned = stock.get('tier') in POLL_INTERVALS
+                if pinned:
+                    state.tier = stock['tier']
+                elif state.pinned:
+                    state.tier = 'normal'
+                state.pinned = pinned
+        for code in [code for code in self.states if code not in codes]:
+            del self.states[code]
+
+    def due(self, budget=None, now=None):
+        """
+        조회 시각이 된 종목을 예산 이내에서 이른 순서로 꺼냅니다.
+        꺼낸 종목은 현재 등급 간격으로 다시 예약되며 update() 가 결과에 맞게 고칩니다.
+
+        Returns:
+            list: 조회할 종목 딕셔너리 리스트
+        """
+        now = self.clock() if now is None else now
+        budget = budget if budget is not None else self.budget
+        if callable(budget):
+            budget = budget()
+        limit = int(budget) if budget is not None else None
+
+        stocks = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and (limit is None or len(stocks) < limit):
+            due, code = heapq.heappop(heap)
+            state = self.states.get(code)
+            # 제거되었거나 다시 예약되어 시각이 바뀐 항목은 버림
+            if state is None or state.due != due:
+                continue
+            stocks.append(state.stock)
+            self._schedule(state, now)
+
+        deferred = sum(1 for due, code in heap if due <= now and code in self.states
+                       and self.states[code].due == due)
+        if deferred:
+            registry.inc('poll_deferred_total', deferred)
+        registry.set('poll_due_codes', len(stocks) + deferred)
+        return stocks
+
+    def update(self, stock, result, now=None):
+        """
+        조회 결과로 등급을 다시 판단하고 다음 조회 시각을 예약합니다.
+
+        Args:
+            stock (dict): 종목 딕셔너리
+            result (dict): 시세 딕셔너리 (실패하면 None, 등급은 그대로)
+
+        Returns:
+            str: 등급
+        """
+        state = self.states.get(stock['code'])
+        if state is None:
+            return None
+        now = self.clock() if now is None else now
+        if result:
+            if not state.pinned:
+                state.tier = self._classify(state, result, now)
+            state.polled_at = now
+            state.price = result.get('current_price')
+            state.change_rate = result.get('change_rate')
+            state.volume = result.get('volume')
+        self._schedule(state, now)
+        return state.tier
+
+    def tiers(self):
+        """등급별 종목 수"""
+        counts = dict.fromkeys(self.intervals, 0)
+        for state in self.states.values():
+            counts[state.tier] = counts.get(state.tier, 0) + 1
+        for tier, count in counts.items():
+            registry.set('poll_tier_codes', count, tier=tier)
+        return counts
+
+    # -------------------------------------------------
+    def _schedule(self, state, now):
+        state.due = now + self.intervals[state.tier]
+        heapq.heappush(self._heap, (state.due, state.stock['code']))
+        # 다시 예약된 종목의 옛 항목이 쌓이지 않도록 가끔 힙을 새로 만듦
+        if len(self._heap) > 4 * len(self.states) + 64:
+            self._heap = [(state.due, code) for code, state in self.states.items()]
+            heapq.heapify(self._heap)
+
+    def _classify(self, state, result, now):
+        change_rate = result.get('change_rate') or 0.0
+        volume = result.get('volume')
+
+        hot = abs(change_rate) >= POLL_HOT_CHANGE
+        if state.change_rate is not None and abs(change_rate - state.change_rate) >= POLL_HOT_MOVE:
+            hot = True
+        if volume is not None and state.volume is not None and now > state.polled_at:
+            # 초당 거래량 증가분을 지수 이동 평균과 비교 (거래량 가속)
+            flow = max(0, volume - state.volume) / (now - state.polled_at)
+            if state.flow and flow >= POLL_HOT_VOLUME * state.flow:
+                hot = True
+            state.flow = flow if state.flow is None else 0.8 * state.flow + 0.2 * flow
+
+        if hot:
+            state.hot_until = now + POLL_HOT_HOLD
+            state.calm = 0
+            return 'hot'
+        if now < state.hot_until:
+            return 'hot'
+
+        unchanged = state.polled_at is not None and \
+            result.get('current_price') == state.price and volume == state.volume
+        state.calm = state.calm + 1 if unchanged else 0
+        return 'quiet' if state.calm >= POLL_QUIET_AFTER else 'normal'
+
+
+# -------------------------------------------------
+def rate_budget(accounts=None, tick=None, chunk=1):
+    """
+    학습한 KIS 초당 요청 수로 틱당 조회 예산(종목 수)을 계산하는 함수.
+
+    Args:
+        accounts (iterable): 사용하는 앱키 (KisAccount, None 은 기본 앱키)
+        tick (float): 스케줄러 간격(초, 기본값 POLL_TICK)
+        chunk (int): 요청당 종목 수 (멀티종목 조회는 MULTI_PRICE_CHUNK)
+    """
+    from kis_api import get_rate_limiter
+
+    rate = 0.0
+    for account in accounts or [None]:
+        rate += (account.get_rate_limiter() if account is not None else get_rate_limiter()).rate
+    return max(1, int(rate * (tick or POLL_TICK) * POLL_BUDGET_RATIO) * chunk)
@@ -0,0 +1,177 @@
+import math
+import datetime
+
+
+# 시세 필드 (숫자) 와 전체 슬롯
+FIELDS = ('current_price', 'price_diff', 'change_rate', 'volume', 'trading_value',
+          'open_price', 'high_price', 'low_price')
+SLOTS = ('stock_code', 'stock_name') + FIELDS
+_SLOT_SET = frozenset(SLOTS)
+
+
+# -------------------------------------------------
+class Quote:
+    """
+    종목 시세 한 건. 틱마다 종목 수만큼 만들어지므로 dict 대신 __slots__ 로 필드를 고정합니다.
+    지표, 알림, 조회 API 등 기존 코드가 result['current_price'], result.get('volume'), result.items() 로
+    읽으므로 읽기 전용 매핑처럼도 동작하며, 같은 키와 값을 가진 dict 와 같다고 비교됩니다.
+    """
+    __slots__ = SLOTS
+
+    def __init__(self, stock_code, stock_name, current_price, price_diff, change_rate, volume,
+                 trading_value, open_price, high_price, low_price):
+        self.stock_code = stock_code
+        self.stock_name = stock_name
+        self.current_price = current_price
+        self.price_diff = price_diff
+        self.change_rate = change_rate
+        self.volume = volume
+        self.trading_value = trading_value
+        self.open_price = open_price
+        self.high_price = high_price
+        self.low_price = low_price
+
+    def __getitem__(self, key):
+        if key not in _SLOT_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _SLOT_SET else default
+
+    def __contains__(self, key):
+        return key in _SLOT_SET
+
+    def __iter__(self):
+        return iter(SLOTS)
+
+    def __len__(self):
+        return len(SLOTS)
+
+    def keys(self):
+        return SLOTS
+
+    def values(self):
+        return [getattr(self, key) for key in SLOTS]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in SLOTS]
+
+    def to_dict(self):
+        return dict(zip(SLOTS, self.values()))
+
+    def __eq__(self, other):
+        if isinstance(other, Quote):
+            return self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Quote({self.to_dict()!r})"
+
+
+# -------------------------------------------------
+# line protocol 이스케이프 (influxdb_client Point 와 같은 규칙)
+_ESCAPE_MEASUREMENT = str.maketrans({',': r'\,', ' ': r'\ ', '\n': r'\n', '\r': r'\r', '\t': r'\t'})
+_ESCAPE_TAG = str.maketrans({',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n', '\r': r'\r',
+                             '\t': r'\t'})
+
+# 필드는 이름순 (Point.to_line_protocol 과 같은 순서)
+_FIELDS_TEMPLATE = (b" change_rate=%b,current_price=%di,high_price=%di,low_price=%di,"
+                    b"open_price=%di,price_diff=%di,trading_value=%di,volume=%di")
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _escape_tag(value):
+    value = str(value).translate(_ESCAPE_TAG)
+    # 역슬래시로 끝나는 태그 값은 공백을 붙임 (Point 와 같음)
+    return value + ' ' if value.endswith('\\') else value
+
+
+def _time_ns(t):
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=datetime.timezone.utc)
+    delta = t - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000000 + delta.microseconds * 1000
+
+
+# -------------------------------------------------
+class LineEncoder:
+    """
+    Quote 를 build_point() 와 Point 직렬화를 거치지 않고 line protocol 로 바로 쓰는 인코더.
+    측정값과 code, name 태그는 종목마다 한 번만 이스케이프하여 캐시하고, 필드는 미리 만든
+    bytes 형식 하나로 채우며, 여러 시세를 재사용하는 버퍼 하나에 이어 씁니다.
+    결과는 build_point(stock, quote).to_line_protocol() 을 줄바꿈으로 이은 것과 같습니다.
+
+    Args:
+        measurement (str): 측정값 이름
+    """
+
+    def __init__(self, measurement="stock_price"):
+        self.measurement = measurement
+        self._measurement = measurement.translate(_ESCAPE_MEASUREMENT)
+        # (code, name) -> b"measurement,code=...,name=..."
+        self._prefixes = {}
+        self._buffer = bytearray()
+        # influx_writer 가 이 모듈을 가져오므로 인코더를 만들 때 한 번만 가져옴 (순환 import 방지)
+        from influx_writer import build_point
+        self._build_point = build_point
+
+    def prefix(self, stock):
+        """종목의 측정값, 태그 부분 (캐시)"""
+        key = (stock['code'], stock['name'])
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            # 태그는 키 이름순 (code, name), 빈 값은 생략
+            tags = ''.join(f",{tag}={_escape_tag(value)}" for tag, value in zip(('code', 'name'), key)
+                           if value is not None and _escape_tag(value) != '')
+            prefix = (self._measurement + tags).encode('utf-8')
+            self._prefixes[key] = prefix
+        return prefix
+
+    def encode(self, quotes, times=None):
+        """
+        시세를 line protocol 로 변환합니다.
+
+        Args:
+            quotes (list): (stock, Quote) 튜플 리스트
+            times (list or datetime): 시세별 시각 datetime 리스트, 또는 모든 시세에 붙일 시각 하나
+                (없으면 InfluxDB 수신 시각)
+
+        Returns:
+            bytes: 줄바꿈으로 구분한 line protocol (마지막 줄바꿈 없음)
+        """
+        buffer = self._buffer
+        del buffer[:]
+        template = _FIELDS_TEMPLATE
+        # 시각이 하나면 타임스탬프 부분을 한 번만 만듦
+        suffix = b" %d\n" % _time_ns(times) if isinstance(times, datetime.datetime) else None
+        for i, (stock, quote) in enumerate(quotes):
+            change_rate = quote.change_rate if type(quote) is Quote else None
+            if type(change_rate) is not float or not math.isfinite(change_rate):
+                # dict 시세, 실수가 아닌 등락률, NaN 등은 Point 로 직렬화 (드묾)
+                point = self._build_point(stock, quote, measurement=self.measurement,
+                                          time=times if suffix is not None else times[i] if times else None)
+                buffer += point.to_line_protocol().encode('utf-8')
+                buffer += b"\n"
+                continue
+            text = repr(change_rate)
+            if text.endswith('.0'):
+                text = text[:-2]
+            buffer += self.prefix(stock)
+            buffer += template % (text.encode(), quote.current_price, quote.high_price,
+                                  quote.low_price, quote.open_price, quote.price_diff,
+                                  quote.trading_value, quote.volume)
+            if suffix is not None:
+                buffer += suffix
+                continue
+            if times:
+                buffer += b" %d" % _time_ns(times[i])
+            buffer += b"\n"
+        # 배치 스레드가 항목 사이에 줄바꿈을 넣으므로 마지막 줄바꿈은 뺌
+        del buffer[-1:]
+        return bytes(buffer)
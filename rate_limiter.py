@@ -0,0 +1,107 @@
+import time
+import asyncio
+
+
+# -------------------------------------------------
+class TokenBucket:
+    """
+    asyncio 용 토큰 버킷 속도 제한기.
+    초당 rate 개의 토큰이 채워지며, 요청마다 토큰 1개를 소비합니다.
+    토큰이 부족하면 모자란 만큼만 기다린 뒤 진행합니다.
+
+    Args:
+        rate (float): 초당 허용 요청 수 (KIS 초당 거래건수 제한)
+        capacity (float): 버킷 최대 크기 (순간 허용 요청 수, 기본값 1)
+    """
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError("rate 는 0보다 커야 합니다.")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _reserve(self):
+        """토큰 1개를 예약하고 기다려야 하는 시간(초)을 반환합니다."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    async def acquire(self, deadline=None):
+        """
+        토큰 1개를 얻을 때까지 기다립니다.
+
+        Args:
+            deadline (float): 마감 시각 (이벤트 루프 시간). 그 전에 토큰을 얻을 수 없으면 기다리지 않음
+
+        Returns:
+            bool: 토큰을 얻었는지 여부
+        """
+        # 예약은 await 없이 처리되므로 같은 이벤트 루프 안에서는 락이 필요 없습니다.
+        wait = self._reserve()
+        if wait > 0:
+            if deadline is not None and asyncio.get_running_loop().time() + wait >= deadline:
+                # 예약을 되돌려 뒤 요청이 밀리지 않게 함
+                self._tokens += 1
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+    def on_success(self):
+        """요청 성공 알림 (고정 속도 버킷은 무시)"""
+
+    def on_rate_limited(self):
+        """초당 거래건수 초과 알림 (고정 속도 버킷은 무시)"""
+        return False
+
+
+# -------------------------------------------------
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    응답에 따라 속도를 조절하는 AIMD 토큰 버킷.
+    성공한 요청마다 rate 를 increase / rate 씩 올려 초당 약 increase 만큼 늘리고,
+    초당 거래건수 초과 응답을 받으면 rate 를 decrease 배로 줄입니다.
+    같은 순간에 몰려 온 거부 응답으로 여러 번 줄어들지 않도록 감소는 1초에 한 번만 합니다.
+
+    Args:
+        rate (float): 시작 초당 요청 수
+        min_rate (float): 최소 초당 요청 수
+        max_rate (float): 최대 초당 요청 수
+        increase (float): 초당 증가량
+        decrease (float): 감소 배율 (0 < decrease < 1)
+    """
+
+    def __init__(self, rate, min_rate=1.0, max_rate=None, increase=1.0, decrease=0.5,
+                 capacity=1):
+        super().__init__(rate, capacity)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate) if max_rate else self.rate
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+        self._last_decrease = float('-inf')
+
+    def on_success(self):
+        self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_rate_limited(self):
+        """
+        rate 를 줄입니다.
+
+        Returns:
+            bool: 이번 호출로 rate 를 줄였는지 여부
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return False
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        # 이미 쌓인 토큰을 버려 줄어든 속도가 바로 적용되도록 함
+        self._tokens = min(self._tokens, 0.0)
+        return True
@@ -0,0 +1,200 @@
+import os
+import logging
+import datetime
+
+from influx_writer import build_point
+from market_calendar import korea_tz
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 봉 간격(초)
+BAR_INTERVALS = {'1m': 60, '5m': 300, '1d': 86400}
+
+# 만들 봉 종류
+ROLLUP_INTERVALS = [interval.strip() for interval in
+                    os.getenv('ROLLUP_INTERVALS', '1m,5m,1d').split(',')
+                    if interval.strip() in BAR_INTERVALS]
+
+
+# -------------------------------------------------
+def bar_measurement(interval):
+    """봉 측정값 이름 (stock_bar_1m, stock_bar_5m, stock_bar_1d)"""
+    return f"stock_bar_{interval}"
+
+
+def bar_bucket(interval):
+    """
+    봉을 저장할 bucket. ROLLUP_BUCKET_1M 처럼 간격별로 지정하면 bucket 마다 보관 기간을 따로 둘 수 있습니다.
+    (지정하지 않으면 None, writer 의 기본 bucket)
+    """
+    return os.getenv(f'ROLLUP_BUCKET_{interval.upper()}') or None
+
+
+# -------------------------------------------------
+def _day_start(ts):
+    # 일봉 시각은 해당 일 0시 (KST)
+    day = datetime.datetime.fromtimestamp(ts, korea_tz).date()
+    return korea_tz.localize(datetime.datetime.combine(day, datetime.time())).timestamp()
+
+
+def bucket_start(interval, ts):
+    """ts 가 속한 봉의 시작 시각(epoch 초)"""
+    if interval == '1d':
+        return _day_start(ts)
+    seconds = BAR_INTERVALS[interval]
+    return ts // seconds * seconds
+
+
+# -------------------------------------------------
+class _Bar:
+    __slots__ = ('start', 'open', 'high', 'low', 'close', 'volume_base', 'value_base',
+                 'volume', 'value')
+
+    def __init__(self, start, price, volume_base, value_base):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume_base = volume_base
+        self.value_base = value_base
+        self.volume = volume_base
+        self.value = value_base
+
+    def fields(self):
+        return {
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': max(0, self.volume - self.volume_base),
+            'trading_value': max(0, self.value - self.value_base),
+        }
+
+
+# -------------------------------------------------
+class Rollups:
+    """
+    틱마다 들어오는 시세로 종목별 OHLCV 봉(1분, 5분, 일)을 메모리에서 만드는 집계기.
+    봉 구간이 바뀌면 끝난 봉을 내보내며, 장 마감 때는 flush() 로 진행 중인 봉을 모두 내보냅니다.
+
+    분봉의 시가는 구간의 첫 시세, 고가/저가는 관측한 현재가와 함께 당일 고가(high_price)/저가(low_price)가
+    구간 안에서 새로 바뀌었으면 그 값도 반영합니다. (조회 사이에 생긴 고점, 저점)
+    거래량과 거래대금은 누적값(volume, trading_value)의 구간 증가분이며,
+    일봉은 KIS 당일 시가, 고가, 저가, 누적 거래량/거래대금을 그대로 사용합니다.
+
+    Args:
+        intervals (list): 봉 종류 (기본값 ROLLUP_INTERVALS)
+    """
+
+    def __init__(self, intervals=None):
+        self.intervals = list(intervals or ROLLUP_INTERVALS)
+        # code -> {interval: _Bar}
+        self.bars = {}
+        # code -> (stock, 마지막 누적 거래량, 누적 거래대금, 당일 고가, 당일 저가, 일자 시작)
+        self.last = {}
+
+    def update(self, quotes, ts):
+        """
+        한 틱의 시세를 반영합니다.
+
+        Args:
+            quotes (list): (stock, result) 튜플 리스트
+            ts (float): 시세 시각 (epoch 초)
+
+        Returns:
+            list: 끝난 봉 (interval, stock, start, fields) 리스트
+        """
+        done = []
+        for stock, result in quotes:
+            price = result.get('current_price')
+            if price is None:
+                continue
+            code = stock['code']
+            volume = result.get('volume') or 0
+            value = result.get('trading_value') or 0
+            day_high = result.get('high_price')
+            day_low = result.get('low_price')
+            day = _day_start(ts)
+
+            previous = self.last.get(code)
+            same_day = previous is not None and previous[5] == day
+            bars = self.bars.setdefault(code, {})
+            for interval in self.intervals:
+                start = bucket_start(interval, ts)
+                bar = bars.get(interval)
+                if bar is not None and bar.start != start:
+                    done.append((interval, stock, bar.start, bar.fields()))
+                    bar = None
+                if bar is None:
+                    if interval == '1d':
+                        bar = _Bar(start, price, 0, 0)
+                    elif same_day:
+                        # 직전 구간 마지막 누적값부터 증가분을 셈
+                        bar = _Bar(start, price, previous[1], previous[2])
+                    elif previous is not None:
+                        # 새 거래일 첫 봉은 동시호가 거래량까지 포함
+                        bar = _Bar(start, price, 0, 0)
+                    else:
+                        # 처음 본 종목은 그 이전 누적값을 알 수 없으므로 지금부터 셈
+                        bar = _Bar(start, price, volume, value)
+                    bars[interval] = bar
+
+                if interval == '1d':
+                    bar.open = result.get('open_price') or bar.open
+                    bar.high = day_high or max(bar.high, price)
+                    bar.low = day_low or min(bar.low, price)
+                else:
+                    bar.high = max(bar.high, price)
+                    bar.low = min(bar.low, price)
+                    if same_day:
+                        if day_high and previous[3] and day_high > previous[3]:
+                            bar.high = max(bar.high, day_high)
+                        if day_low and previous[4] and day_low < previous[4]:
+                            bar.low = min(bar.low, day_low)
+                bar.close = price
+                bar.volume = volume
+                bar.value = value
+
+            self.last[code] = (stock, volume, value, day_high, day_low, day)
+
+        return self._count(done)
+
+    def flush(self):
+        """진행 중인 봉을 모두 내보냅니다. (장 마감, 종료 시)"""
+        done = []
+        for code, bars in self.bars.items():
+            stock = self.last[code][0]
+            for interval, bar in bars.items():
+                done.append((interval, stock, bar.start, bar.fields()))
+        self.bars.clear()
+        return self._count(done)
+
+    def retain(self, codes):
+        """관심종목에서 빠진 종목의 상태를 버립니다."""
+        for code in [code for code in self.last if code not in codes]:
+            self.bars.pop(code, None)
+            del self.last[code]
+
+    # -------------------------------------------------
+    @staticmethod
+    def _count(done):
+        for interval, _, _, _ in done:
+            registry.inc('rollup_bars_total', interval=interval)
+        return done
+
+
+# -------------------------------------------------
+def bar_points(bars):
+    """
+    봉을 bucket 별 InfluxDB 포인트로 변환합니다. (시각은 봉 시작 시각)
+
+    Returns:
+        dict: bucket -> Point 리스트 (None 은 writer 의 기본 bucket)
+    """
+    by_bucket = {}
+    for interval, stock, start, fields in bars:
+        point = build_point(stock, fields, measurement=bar_measurement(interval),
+                            time=datetime.datetime.fromtimestamp(start, korea_tz))
+        by_bucket.setdefault(bar_bucket(interval), []).append(point)
+    return by_bucket
@@ -0,0 +1,341 @@
+from bootstrap import bootstrap
+
+if __name__ == '__main__':
+    # 모듈 상수가 환경 변수를 읽으므로 .env 와 로깅을 다른 모듈보다 먼저 초기화
+    bootstrap()
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+from bisect import bisect
+
+from kis_api import (
+    KisAccount,
+    get_rate_limiter,
+    get_current_prices_async,
+    get_current_prices_multi_async,
+    KIS_MULTI_PRICE,
+    KIS_TICK_DEADLINE
+)
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 해시 링에서 노드 하나가 차지하는 가상 노드 수 (많을수록 고르게 나뉨)
+SHARD_REPLICAS = int(os.getenv('SHARD_REPLICAS', '160'))
+
+# 기본 앱키(APP_KEY) 샤드 이름
+DEFAULT_ACCOUNT = 'default'
+
+
+# -------------------------------------------------
+def _hash(key):
+    # 프로세스, 노드가 달라도 같은 값이 나와야 하므로 hash() 대신 md5 사용
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+# -------------------------------------------------
+class HashRing:
+    """
+    일관된 해싱(consistent hashing) 링.
+    노드마다 replicas 개의 가상 노드를 링에 올려 두고, 키는 시계 방향으로 가장 가까운
+    가상 노드의 주인에게 배정합니다. 노드를 하나 추가하면 전체 키의 약 1/N 만 옮겨집니다.
+
+    Args:
+        nodes (list): 노드 이름 리스트
+        replicas (int): 노드당 가상 노드 수
+    """
+
+    def __init__(self, nodes, replicas=None):
+        self.nodes = list(dict.fromkeys(nodes))
+        if not self.nodes:
+            raise ValueError("nodes 가 비어 있습니다.")
+        replicas = replicas or SHARD_REPLICAS
+        ring = sorted((_hash(f"{node}#{i}"), node)
+                      for node in self.nodes for i in range(replicas))
+        self._hashes = [point for point, _ in ring]
+        self._owners = [node for _, node in ring]
+
+    def node_for(self, key):
+        """키를 맡은 노드 이름을 반환합니다."""
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def assign(self, stocks):
+        """
+        종목을 노드별로 나눕니다.
+
+        Args:
+            stocks (list): {'code', 'name'} 딕셔너리 리스트
+
+        Returns:
+            dict: 노드 이름 -> 종목 리스트 (모든 노드 포함, 입력 순서 유지)
+        """
+        groups = {node: [] for node in self.nodes}
+        for stock in stocks:
+            groups[self.node_for(stock['code'])].append(stock)
+        return groups
+
+
+# -------------------------------------------------
+def load_accounts(path=None):
+    """
+    샤드 앱키 파일(CONFIG_DIR/shards.json)을 읽는 함수. 파일이 없으면 빈 리스트를 반환합니다.
+
+    파일 예시:
+        [{"name": "key1", "app_key": "...", "app_secret": "..."},
+         {"name": "key2", "app_key": "...", "app_secret": "...", "url_base": "https://..."}]
+
+    Returns:
+        list: KisAccount 리스트
+    """
+    path = path or os.path.join(os.getenv('CONFIG_DIR', 'config'), 'shards.json')
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return [KisAccount(entry['name'], entry['app_key'], entry['app_secret'],
+                           entry.get('url_base')) for entry in entries]
+    except Exception as e:
+        logger.error(f"샤드 앱키 파일 로드 실패: {e}")
+        return []
+
+
+# -------------------------------------------------
+class ShardRouter:
+    """
+    관심종목을 워커(프로세스, 노드)와 앱키로 나누어 조회하는 라우터.
+    먼저 워커 링으로 이 워커가 맡을 종목을 고르고, 다시 앱키 링으로 앱키마다 나누어
+    앱키별 토큰과 속도 제한기로 동시에 조회합니다. 모든 워커가 같은 워커 목록을 쓰면
+    통신 없이도 종목마다 정확히 한 워커가 맡습니다.
+
+    Args:
+        accounts (list): KisAccount 리스트 (없으면 기본 앱키 하나)
+        workers (list): 전체 워커 이름 리스트 (없으면 워커 하나가 전체를 맡음)
+        worker (str): 이 워커의 이름
+        multi (bool): 멀티종목 시세조회 사용 여부 (기본값 KIS_MULTI_PRICE)
+    """
+
+    def __init__(self, accounts=None, workers=None, worker=None, multi=None, replicas=None):
+        self.accounts = {account.name: account for account in accounts or []} \
+            or {DEFAULT_ACCOUNT: None}
+        self.account_ring = HashRing(self.accounts, replicas)
+        self.workers = list(workers or [])
+        self.worker = worker
+        if self.workers and worker not in self.workers:
+            raise ValueError(f"SHARD_WORKER({worker}) 가 SHARD_WORKERS 에 없습니다.")
+        self.worker_ring = HashRing(self.workers, replicas) if self.workers else None
+        self.multi = KIS_MULTI_PRICE if multi is None else multi
+        self.stats = {}
+        self.missing = []
+        self.updated_at = None
+
+    def owned(self, stocks):
+        """이 워커가 맡은 종목만 반환합니다."""
+        if self.worker_ring is None:
+            return list(stocks)
+        return [stock for stock in stocks if self.worker_ring.node_for(stock['code']) == self.worker]
+
+    async def fetch(self, stock_list, client=None, deadline=None):
+        """
+        종목을 앱키별로 나누어 동시에 조회합니다. (stock_list 는 owned() 결과)
+
+        Args:
+            stock_list (list): 조회할 종목
+            client (KisClient): 사용할 클라이언트
+            deadline (float): 모든 앱키가 공유하는 조회 마감 시각 (기본값 지금 + KIS_TICK_DEADLINE)
+
+        Returns:
+            list: stock_list 와 같은 순서의 시세 딕셔너리 리스트 (실패한 종목은 None)
+        """
+        fetch = get_current_prices_multi_async if self.multi else get_current_prices_async
+        deadline = deadline or asyncio.get_running_loop().time() + KIS_TICK_DEADLINE
+        groups = [(name, stocks) for name, stocks in self.account_ring.assign(stock_list).items()
+                  if stocks]
+
+        async def run(name, stocks):
+            started = time.perf_counter()
+            try:
+                results = await fetch(stocks, client=client, deadline=deadline,
+                                      account=self.accounts[name])
+            except Exception as e:
+                logger.error(f"샤드 {name} 조회 실패: {e}")
+                results = [None] * len(stocks)
+            registry.observe('shard_fetch_seconds', time.perf_counter() - started, shard=name)
+            return results
+
+        grouped = await asyncio.gather(*(run(name, stocks) for name, stocks in groups))
+
+        found = {}
+        for (name, stocks), results in zip(groups, grouped):
+            self._record(name, stocks, results)
+            for stock, result in zip(stocks, results):
+                if result:
+                    found[stock['code']] = result
+        self.missing = [stock['code'] for stock in stock_list if stock['code'] not in found]
+        self.updated_at = time.time()
+        return [found.get(stock['code']) for stock in stock_list]
+
+    def _record(self, name, stocks, results):
+        fetched = sum(1 for result in results if result)
+        account = self.accounts[name]
+        limiter = account.get_rate_limiter() if account is not None else get_rate_limiter()
+        self.stats[name] = {
+            'codes': len(stocks),
+            'fetched': fetched,
+            'failed': len(stocks) - fetched,
+            'rate': round(limiter.rate, 2),
+            'updated_at': time.time(),
+        }
+        registry.set('shard_codes', len(stocks), shard=name)
+        registry.set('shard_fetched', fetched, shard=name)
+
+    def coverage(self, stocks):
+        """
+        샤드 배정과 직전 틱 조회 결과를 보고합니다. (조회 API /shards)
+
+        Args:
+            stocks (list): 전체 관심종목 리스트
+
+        Returns:
+            dict: worker, workers(워커별 배정 종목 수), total, owned, covered,
+                  missing(직전 틱에 가져오지 못한 종목), shards(앱키별 현황), updated_at
+        """
+        owned = self.owned(stocks)
+        assigned = self.account_ring.assign(owned)
+        workers = {}
+        if self.worker_ring is not None:
+            workers = {worker: len(group) for worker, group in self.worker_ring.assign(stocks).items()}
+        shards = []
+        for name, group in assigned.items():
+            entry = {'account': name, 'codes': len(group)}
+            entry.update({key: value for key, value in self.stats.get(name, {}).items()
+                          if key != 'codes'})
+            shards.append(entry)
+        missing = set(self.missing)
+        covered = sum(1 for stock in owned if stock['code'] not in missing) \
+            if self.updated_at is not None else 0
+        return {
+            'worker': self.worker,
+            'workers': workers,
+            'total': len(stocks),
+            'owned': len(owned),
+            'covered': covered,
+            'missing': list(self.missing),
+            'shards': shards,
+            'updated_at': self.updated_at,
+        }
+
+
+# -------------------------------------------------
+def merge_coverage(reports, workers=None):
+    """
+    여러 워커의 coverage() 보고를 합쳐 전체 커버리지를 계산하는 코디네이터 뷰.
+
+    Args:
+        reports (list): 워커별 coverage() 결과 (/shards 응답)
+        workers (list): 전체 워커 이름 리스트 (보고하지 않은 워커를 찾을 때 사용)
+
+    Returns:
+        dict: total, owned, covered, ratio, workers(워커별 owned/covered/updated_at),
+              unreported(보고가 없는 워커), missing(가져오지 못한 종목)
+    """
+    total = max((report['total'] for report in reports), default=0)
+    by_worker = {}
+    missing = []
+    for report in reports:
+        by_worker[report['worker']] = {'owned': report['owned'], 'covered': report['covered'],
+                                       'updated_at': report['updated_at']}
+        missing.extend(report['missing'])
+    expected = set(workers or ())
+    for report in reports:
+        expected.update(report['workers'])
+    owned = sum(entry['owned'] for entry in by_worker.values())
+    covered = sum(entry['covered'] for entry in by_worker.values())
+    return {
+        'total': total,
+        'owned': owned,
+        'covered': covered,
+        'ratio': covered / total if total else 0.0,
+        'workers': by_worker,
+        'unreported': sorted(expected - set(by_worker)),
+        'missing': missing,
+    }
+
+
+# -------------------------------------------------
+async def fetch_reports(urls, timeout=5):
+    """
+    워커들의 조회 API GET /shards 보고를 동시에 가져오는 함수. 응답하지 않는 워커는 빠집니다.
+
+    Args:
+        urls (list): 워커 조회 API 주소 리스트 (예: http://a:8000)
+        timeout (float): 요청 타임아웃(초)
+
+    Returns:
+        list: coverage() 결과 리스트
+    """
+    import aiohttp
+
+    async def fetch(session, url):
+        try:
+            async with session.get(url.rstrip('/') + '/shards') as response:
+                response.raise_for_status()
+                return await response.json()
+        except Exception as e:
+            logger.error(f"{url} 샤드 보고 조회 실패: {e}")
+            return None
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        reports = await asyncio.gather(*(fetch(session, url) for url in urls))
+    return [report for report in reports if report is not None]
+
+
+# -------------------------------------------------
+def load_router():
+    """
+    환경 변수와 샤드 앱키 파일로 라우터를 만드는 함수.
+    SHARD_WORKERS 도 없고 shards.json 도 없으면 None 을 반환합니다. (샤딩 사용 안 함)
+    """
+    workers = [worker.strip() for worker in os.getenv('SHARD_WORKERS', '').split(',')
+               if worker.strip()]
+    accounts = load_accounts()
+    if not workers and not accounts:
+        return None
+    router = ShardRouter(accounts, workers, os.getenv('SHARD_WORKER'))
+    logger.info(f"샤딩 사용: 워커 {router.worker or '-'} / {len(workers) or 1}개, "
+                f"앱키 {len(router.accounts)}개")
+    return router
+
+
+# -------------------------------------------------
+def main(argv=None):
+    """
+    워커들의 /shards 보고를 모아 전체 커버리지(merge_coverage)를 출력합니다.
+    모든 워커가 응답하고 전체 종목을 가져왔으면 0, 아니면 1 을 반환합니다.
+    """
+    parser = argparse.ArgumentParser(description="샤드 워커 커버리지 합계 (각 워커의 GET /shards)")
+    parser.add_argument('--workers', required=True,
+                        help="워커 조회 API 주소 (쉼표 구분, 예: http://a:8000,http://b:8000)")
+    parser.add_argument('--timeout', type=float, default=5, help="요청 타임아웃(초)")
+    args = parser.parse_args(argv)
+
+    urls = [url.strip() for url in args.workers.split(',') if url.strip()]
+    reports = asyncio.run(fetch_reports(urls, args.timeout))
+    merged = merge_coverage(reports)
+    print(json.dumps(merged, ensure_ascii=False, indent=2))
+    complete = len(reports) == len(urls) and not merged['unreported'] and \
+        merged['covered'] == merged['total']
+    return 0 if complete else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import os
+import time
+import logging
+import threading
+
+from metrics import registry
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".lp"
+
+
+# -------------------------------------------------
+class Spool:
+    """
+    InfluxDB 에 저장하지 못한 포인트를 보관하는 append-only 세그먼트 로그.
+    line protocol 을 그대로 세그먼트 파일에 이어 쓰고, fsync 는
+    fsync_interval 마다 한 번씩 묶어서 수행합니다.
+    전체 크기가 max_bytes 를 넘으면 가장 오래된 세그먼트부터 삭제합니다.
+
+    Args:
+        directory (str): 세그먼트 저장 디렉토리 (기본값 CONFIG_DIR/spool)
+        segment_bytes (int): 세그먼트 하나의 최대 크기
+        max_bytes (int): 스풀 전체 최대 크기
+        fsync_interval (float): fsync 묶음 주기(초)
+    """
+
+    def __init__(self, directory=None, segment_bytes=None, max_bytes=None,
+                 fsync_interval=None):
+        self.directory = directory or os.path.join(
+            os.getenv('CONFIG_DIR', 'config'), 'spool')
+        self.segment_bytes = segment_bytes or int(os.getenv('SPOOL_SEGMENT_BYTES', str(1024 * 1024)))
+        self.max_bytes = max_bytes or int(os.getenv('SPOOL_MAX_BYTES', str(100 * 1024 * 1024)))
+        self.fsync_interval = float(os.getenv('SPOOL_FSYNC_INTERVAL', '1')) \
+            if fsync_interval is None else fsync_interval
+
+        # 카운터
+        self.spooled = 0
+        self.replayed = 0
+        self.evicted = 0
+        self.dropped = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+        self._current = None
+        self._last_fsync = 0.0
+        self._sizes = {}
+        for name in self._segment_names():
+            self._sizes[name] = os.path.getsize(self._path(name))
+        self._next_seq = self._seq(max(self._sizes)) + 1 if self._sizes else 0
+
+    # -------------------------------------------------
+    def append(self, data):
+        """line protocol(bytes 또는 str)을 스풀에 추가합니다."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        data = data.rstrip(b'\n')
+        if not data:
+            return
+        data += b'\n'
+
+        with self._lock:
+            if self._file is None or self._sizes[self._current] >= self.segment_bytes:
+                self._roll()
+            self._file.write(data)
+            self._file.flush()
+            self._sizes[self._current] += len(data)
+            lines = data.count(b'\n')
+            self.spooled += lines
+            registry.inc('spool_points_total', lines, result='spooled')
+
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+            self._evict()
+
+    def pending_bytes(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def replay(self, write):
+        """
+        오래된 세그먼트부터 write(data) 로 다시 저장하고 성공한 세그먼트를 삭제합니다.
+        write 가 예외를 던지면 중단하고 남은 세그먼트는 다음 replay 때 처리합니다.
+
+        Args:
+            write (callable): line protocol bytes 를 동기적으로 저장하는 함수
+
+        Returns:
+            int: 다시 저장한 포인트 수
+        """
+        with self._lock:
+            self._seal()
+            names = sorted(self._sizes)
+
+        replayed = 0
+        for name in names:
+            try:
+                with open(self._path(name), 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+
+            if data:
+                try:
+                    write(data)
+                except Exception as e:
+                    if is_bad_request(e):
+                        logger.error(f"스풀 세그먼트 {name} 형식 오류로 폐기: {e}")
+                        self.dropped += data.count(b'\n')
+                        registry.inc('spool_points_total', data.count(b'\n'), result='dropped')
+                    else:
+                        logger.warning(f"스풀 재전송 실패: {e}")
+                        break
+                else:
+                    replayed += data.count(b'\n')
+
+            with self._lock:
+                self._remove(name)
+        self.replayed += replayed
+        if replayed:
+            registry.inc('spool_points_total', replayed, result='replayed')
+        registry.set('spool_pending_bytes', self.pending_bytes())
+        return replayed
+
+    def close(self):
+        with self._lock:
+            self._seal()
+
+    # -------------------------------------------------
+    def _roll(self):
+        self._seal()
+        name = f"{self._next_seq:012d}{SEGMENT_SUFFIX}"
+        self._next_seq += 1
+        self._file = open(self._path(name), 'ab')
+        self._current = name
+        self._sizes[name] = 0
+
+    def _seal(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._last_fsync = time.monotonic()
+
+    def _evict(self):
+        total = sum(self._sizes.values())
+        for name in sorted(self._sizes):
+            if total <= self.max_bytes or name == self._current:
+                break
+            with open(self._path(name), 'rb') as f:
+                evicted = f.read().count(b'\n')
+            self.evicted += evicted
+            registry.inc('spool_points_total', evicted, result='evicted')
+            total -= self._sizes[name]
+            self._remove(name)
+            logger.warning(f"스풀 용량 초과로 세그먼트 {name} 삭제")
+
+    def _remove(self, name):
+        self._sizes.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def _segment_names(self):
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _seq(name):
+        return int(name[:-len(SEGMENT_SUFFIX)])
+
+
+# -------------------------------------------------
+def is_bad_request(exception):
+    # 400 응답은 재시도해도 성공하지 않으므로 폐기 대상
+    return getattr(exception, 'status', None) == 400 or \
+        getattr(getattr(exception, 'response', None), 'status', None) == 400
+
+
+# -------------------------------------------------
+class SpoolReplayer(threading.Thread):
+    """
+    주기적으로 스풀을 확인하여 쌓인 포인트를 InfluxDB 로 다시 저장하는 백그라운드 스레드.
+
+    Args:
+        spool (Spool): 대상 스풀
+        write (callable): line protocol bytes 를 동기적으로 저장하는 함수
+        interval (float): 확인 주기(초)
+    """
+
+    def __init__(self, spool, write, interval=None):
+        super().__init__(name="spool-replayer", daemon=True)
+        self.spool = spool
+        self.write = write
+        self.interval = interval or float(os.getenv('SPOOL_REPLAY_INTERVAL', '30'))
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.spool.pending_bytes():
+                continue
+            try:
+                count = self.spool.replay(self.write)
+                if count:
+                    logger.info(f"스풀에서 {count}개 포인트 재전송 완료")
+            except Exception as e:
+                logger.error(f"스풀 재전송 오류: {e}")
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 스키마 버전 (PRAGMA user_version)
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stocks (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS last_quotes (
+    code TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS spool_offsets (
+    name TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS backfill_chunks (
+    chunk TEXT PRIMARY KEY,
+    done_at REAL NOT NULL
+);
+"""
+
+
+# -------------------------------------------------
+class StateStore:
+    """
+    토큰, 관심종목 등 로컬 상태를 보관하는 SQLite(WAL) 저장소.
+    모든 쓰기는 키 단위 upsert 이므로 실행 기간과 관계없이 크기와 접근 비용이 일정합니다.
+    처음 열 때 같은 디렉토리의 TinyDB 파일(db.json)이 있으면 한 번만 옮겨 옵니다.
+
+    Args:
+        path (str): 데이터베이스 파일 경로 (기본값 CONFIG_DIR/state.db)
+        legacy_path (str): 옮겨 올 TinyDB 파일 경로 (기본값 같은 디렉토리의 db.json)
+    """
+
+    def __init__(self, path=None, legacy_path=None):
+        self.path = path or os.path.join(os.getenv('CONFIG_DIR', 'config'), 'state.db')
+        self.legacy_path = legacy_path or os.path.join(os.path.dirname(self.path), 'db.json')
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+        if self.get('migrated_from') is None and os.path.exists(self.legacy_path):
+            self.migrate(self.legacy_path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------------------------------
+    def get(self, key, default=None):
+        """키에 저장된 값을 반환합니다. (JSON 역직렬화)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key, value):
+        """키에 값을 저장합니다. (있으면 덮어씀)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                "updated_at = excluded.updated_at",
+                (key, json.dumps(value, ensure_ascii=False), time.time()))
+
+    # -------------------------------------------------
+    def load_token(self, key='token'):
+        """
+        저장된 접근 토큰을 반환합니다.
+
+        Args:
+            key (str): 저장 키 (앱키가 여러 개이면 앱키마다 다른 키 사용)
+
+        Returns:
+            tuple: (access_token, issued_time) 또는 None
+        """
+        token_data = self.get(key)
+        try:
+            if not token_data or not token_data['access_token'] or not token_data['issued_time']:
+                return None
+            return token_data['access_token'], datetime.fromisoformat(token_data['issued_time'])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save_token(self, access_token, issued_time, key='token'):
+        """접근 토큰을 저장합니다. (이전 토큰을 덮어씀)"""
+        self.set(key, {
+            'access_token': access_token,
+            'issued_time': issued_time.isoformat()
+        })
+
+    # -------------------------------------------------
+    def load_stocks(self):
+        """관심종목 리스트를 저장 순서대로 반환합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, code FROM stocks ORDER BY position").fetchall()
+        return [{'name': name, 'code': code} for name, code in rows]
+
+    def save_stocks(self, stocks):
+        """
+        관심종목 리스트를 저장합니다.
+        종목코드 기준으로 upsert 하고 목록에서 빠진 종목만 삭제합니다.
+        """
+        rows = {}
+        for position, stock in enumerate(stocks):
+            rows.setdefault(stock['code'], (stock['code'], stock.get('name', ''), position))
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            existing = {code for code, in self._conn.execute("SELECT code FROM stocks")}
+            self._conn.executemany(
+                "DELETE FROM stocks WHERE code = ?",
+                [(code,) for code in existing - rows.keys()])
+            self._conn.executemany(
+                "INSERT INTO stocks (code, name, position) VALUES (?, ?, ?) "
+                "ON CONFLICT(code) DO UPDATE SET name = excluded.name, "
+                "position = excluded.position",
+                rows.values())
+            # 관심종목 파일이 없을 때 Watchlist 가 변경을 확인하는 저장 횟수
+            self._conn.execute(
+                "INSERT INTO kv (key, value, updated_at) VALUES ('stocks_version', '1', ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1, "
+                "updated_at = excluded.updated_at",
+                (time.time(),))
+
+    def stocks_version(self):
+        """관심종목을 저장할 때마다 바뀌는 값 (저장 횟수, 종목 수)"""
+        with self._lock:
+            saved, count = self._conn.execute(
+                "SELECT (SELECT value FROM kv WHERE key = 'stocks_version'), "
+                "(SELECT COUNT(*) FROM stocks)").fetchone()
+        return (int(saved or 0), count)
+
+    # -------------------------------------------------
+    def load_quotes(self):
+        """종목별 마지막 시세를 반환합니다. {code: result}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT code, data FROM last_quotes").fetchall()
+        return {code: json.loads(data) for code, data in rows}
+
+    def save_quotes(self, quotes):
+        """
+        종목별 마지막 시세를 저장합니다.
+
+        Args:
+            quotes (list): (stock, result) 튜플 리스트
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO last_quotes (code, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(code) DO UPDATE SET data = excluded.data, "
+                "updated_at = excluded.updated_at",
+                [(stock['code'], json.dumps(result, ensure_ascii=False), now)
+                 for stock, result in quotes])
+
+    # -------------------------------------------------
+    def get_spool_offset(self, name):
+        """스풀 재전송 위치(세그먼트 번호)를 반환합니다. (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq FROM spool_offsets WHERE name = ?", (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_spool_offset(self, name, seq):
+        """스풀 재전송 위치를 저장합니다."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO spool_offsets (name, seq, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET seq = excluded.seq, "
+                "updated_at = excluded.updated_at",
+                (name, seq, time.time()))
+
+    # -------------------------------------------------
+    def load_backfill_chunks(self, chunks):
+        """chunks 중 이미 완료된 과거 시세 조각을 반환합니다."""
+        chunks = list(chunks)
+        done = set()
+        with self._lock:
+            # SQLite 변수 개수 제한을 넘지 않도록 나누어 조회
+            for i in range(0, len(chunks), 500):
+                part = chunks[i:i + 500]
+                rows = self._conn.execute(
+                    "SELECT chunk FROM backfill_chunks WHERE chunk IN "
+                    f"({','.join('?' * len(part))})", part).fetchall()
+                done.update(row[0] for row in rows)
+        return done
+
+    def save_backfill_chunks(self, chunks):
+        """과거 시세 조각을 완료로 기록합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO backfill_chunks (chunk, done_at) VALUES (?, ?)",
+                [(chunk, now) for chunk in chunks])
+
+    def prune_backfill_chunks(self, before):
+        """before(epoch 초) 이전에 완료된 기록을 지웁니다."""
+        with self._lock:
+            self._conn.execute("DELETE FROM backfill_chunks WHERE done_at < ?", (before,))
+
+    # -------------------------------------------------
+    def migrate(self, legacy_path):
+        """
+        TinyDB 파일(db.json)의 마지막 토큰과 관심종목을 옮겨 옵니다. (한 번만 실행)
+
+        Args:
+            legacy_path (str): TinyDB 파일 경로
+        """
+        if not os.path.exists(legacy_path) or os.path.getsize(legacy_path) == 0:
+            # 옮길 내용이 없으면 이전한 것으로 기록하여 매번 다시 확인하지 않음
+            self.set('migrated_from', legacy_path)
+            return
+
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f) or {}
+        except (OSError, ValueError) as e:
+            logger.error(f"TinyDB 파일 이전 실패: {e}")
+            return
+
+        def documents(table):
+            docs = legacy.get(table) or {}
+            return [docs[doc_id] for doc_id in sorted(docs, key=int)]
+
+        tokens = documents('token')
+        if tokens and self.load_token() is None:
+            token_data = tokens[-1]
+            if token_data.get('access_token') and token_data.get('issued_time'):
+                self.set('token', {'access_token': token_data['access_token'],
+                                   'issued_time': token_data['issued_time']})
+
+        stocks = [stock for stock in documents('stocks') if stock.get('code')]
+        if stocks and not self.load_stocks():
+            self.save_stocks(stocks)
+
+        self.set('migrated_from', legacy_path)
+        logger.info(f"TinyDB 상태 이전 완료 (토큰 {len(tokens)}건 중 최신 1건, 종목 {len(stocks)}개)")
+
+
+# CONFIG_DIR 별로 공유하는 저장소
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# -------------------------------------------------
+def default_store():
+    """현재 CONFIG_DIR 의 state.db 저장소를 반환합니다. (처음 호출 시 열고 이후 재사용)"""
+    path = os.path.join(os.getenv('CONFIG_DIR', 'config'), 'state.db')
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = StateStore(path)
+    return store
+
+
+# -------------------------------------------------
+def close_stores():
+    """열려 있는 저장소를 모두 닫습니다."""
+    with _stores_lock:
+        for store in _stores.values():
+            store.close()
+        _stores.clear()
@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+import threading
+
+from rate_limiter import TokenBucket
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 텔레그램 메시지 최대 길이
+MAX_MESSAGE_LENGTH = 4096
+
+
+# -------------------------------------------------
+class TelegramNotifier:
+    """
+    알림을 텔레그램으로 보내는 비동기 전송 큐.
+    전용 스레드의 이벤트 루프에서 동작하므로 submit() 은 큐에 넣고 바로 반환합니다.
+    coalesce 초 동안 들어온 알림은 메시지 하나로 합치고, 전송은 토큰 버킷으로 제한합니다.
+
+    Args:
+        token (str): 봇 토큰 (기본값 TELEGRAM_TOKEN)
+        chat_id (str): 받을 채팅 ID (기본값 TELEGRAM_CHAT_ID)
+        base_url (str): Bot API 주소 (기본값 https://api.telegram.org/bot)
+        rate (float): 초당 최대 전송 수
+        coalesce (float): 알림을 모으는 시간(초)
+        max_queue (int): 큐 최대 크기 (넘치면 버림)
+    """
+
+    def __init__(self, token=None, chat_id=None, base_url=None, rate=None,
+                 coalesce=None, max_queue=1000):
+        self.token = token or os.getenv('TELEGRAM_TOKEN')
+        self.chat_id = chat_id or os.getenv('TELEGRAM_CHAT_ID')
+        self.base_url = base_url or os.getenv('TELEGRAM_BASE_URL', 'https://api.telegram.org/bot')
+        self.rate = rate or float(os.getenv('TELEGRAM_RATE', '1'))
+        self.coalesce = float(os.getenv('TELEGRAM_COALESCE', '2')) if coalesce is None else coalesce
+        self.max_queue = max_queue
+
+        self.sent = 0
+        self.dropped = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def submit(self, alerts):
+        """알림 리스트를 전송 큐에 넣습니다. (전송을 기다리지 않음)"""
+        for alert in alerts:
+            self._loop.call_soon_threadsafe(self._put, alert.message)
+
+    def close(self, timeout=10):
+        """큐에 남은 알림을 보내고 종료합니다."""
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._put, None)
+        self._thread.join(timeout)
+
+    # -------------------------------------------------
+    def _put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("알림 큐가 가득 차 알림을 버립니다.")
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(self.max_queue)
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._consume())
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        # python-telegram-bot 은 알림 스레드에서 처음 필요할 때 불러옴
+        from telegram import Bot
+
+        bot = Bot(self.token, base_url=self.base_url)
+        bucket = TokenBucket(self.rate)
+        closing = False
+        try:
+            while not closing:
+                message = await self._queue.get()
+                if message is None:
+                    break
+                messages = [message]
+
+                # coalesce 시간 동안 들어온 알림을 함께 보냄
+                deadline = self._loop.time() + self.coalesce
+                while True:
+                    timeout = deadline - self._loop.time()
+                    try:
+                        message = await asyncio.wait_for(self._queue.get(), max(timeout, 0))
+                    except asyncio.TimeoutError:
+                        break
+                    if message is None:
+                        closing = True
+                        break
+                    messages.append(message)
+
+                for text in _chunks(messages):
+                    await bucket.acquire()
+                    await self._send(bot, text)
+        finally:
+            await bot.shutdown()
+
+    async def _send(self, bot, text, retries=3):
+        from telegram.error import RetryAfter, TelegramError
+
+        for _ in range(retries):
+            try:
+                await bot.send_message(chat_id=self.chat_id, text=text)
+                self.sent += 1
+                return
+            except RetryAfter as e:
+                delay = e.retry_after.total_seconds() \
+                    if hasattr(e.retry_after, 'total_seconds') else e.retry_after
+                logger.warning(f"텔레그램 전송 제한, {delay}초 후 재시도")
+                await asyncio.sleep(delay)
+            except TelegramError as e:
+                logger.error(f"텔레그램 전송 실패: {e}")
+                return
+        self.dropped += 1
+
+
+# -------------------------------------------------
+def _chunks(messages):
+    """여러 알림을 텔레그램 최대 길이 이하의 메시지로 합칩니다."""
+    text = ""
+    for message in messages:
+        message = message[:MAX_MESSAGE_LENGTH]
+        if text and len(text) + 1 + len(message) > MAX_MESSAGE_LENGTH:
+            yield text
+            text = ""
+        text = f"{text}\n{message}" if text else message
+    if text:
+        yield text
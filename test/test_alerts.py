@@ -0,0 +1,110 @@
+import pytest
+import os,sys
+import time
+import json
+import numpy as np
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import AlertEngine, load_rules
+
+
+def make_items(rows):
+    return [({'code': code, 'name': f'종목{code}'},
+             {'current_price': price, 'change_rate': rate, 'volume': volume})
+            for code, price, rate, volume in rows]
+
+def test_change_rate_threshold_and_cooldown():
+    """등락률 기준 및 쿨다운 테스트"""
+    engine = AlertEngine([
+        {'name': '급등', 'type': 'change_rate_above', 'threshold': 5, 'cooldown': 10},
+        {'name': '급락', 'type': 'change_rate_below', 'threshold': -5}
+    ], max_codes=8)
+
+    alerts = engine.evaluate(make_items([
+        ('000001', 1000, 6.0, 0), ('000002', 1000, -7.5, 0), ('000003', 1000, 1.0, 0)
+    ]), now=0)
+    assert [(alert.rule, alert.code) for alert in alerts] == [('급등', '000001'), ('급락', '000002')]
+    assert alerts[0].message == '[급등] 종목000001(000001) 현재가 1,000원, 등락률 +6.00%'
+
+    # 쿨다운 안에서는 다시 울리지 않음
+    assert engine.evaluate(make_items([('000001', 1000, 6.5, 0)]), now=300) == []
+    assert len(engine.evaluate(make_items([('000001', 1000, 6.5, 0)]), now=600)) == 1
+
+def test_price_cross():
+    """특정 종목 가격 돌파 테스트"""
+    engine = AlertEngine([
+        {'name': '돌파', 'type': 'price_cross_above', 'codes': ['000001'], 'price': 1000}
+    ], max_codes=8)
+
+    assert engine.evaluate(make_items([('000001', 990, 0, 0), ('000002', 990, 0, 0)]), now=0) == []
+    alerts = engine.evaluate(make_items([('000001', 1010, 0, 0), ('000002', 1010, 0, 0)]), now=60)
+    assert [alert.code for alert in alerts] == ['000001']
+    # 기준가 위에 머무는 동안은 다시 울리지 않음
+    assert engine.evaluate(make_items([('000001', 1020, 0, 0)]), now=99999) == []
+
+def test_grows_past_max_codes():
+    """처음 할당한 종목 수를 넘는 종목도 알림을 평가하는지 테스트"""
+    engine = AlertEngine([
+        {'name': '급등', 'type': 'change_rate_above', 'threshold': 5},
+        {'name': '돌파', 'type': 'price_cross_above', 'codes': ['000001', '000002', '000005'],
+         'price': 1000},
+        {'name': '거래량', 'type': 'volume_spike', 'ratio': 3}
+    ], max_codes=2)
+    assert engine.max_codes == 4
+
+    codes = [f'{i:06d}' for i in range(1, 7)]
+    engine.evaluate(make_items([(code, 990, 0, 100) for code in codes]), now=0)
+    assert engine.max_codes == 8
+    alerts = engine.evaluate(make_items([(code, 1010, 6.0, 200) for code in codes]), now=60)
+    assert sorted(alert.code for alert in alerts if alert.rule == '급등') == codes
+    assert sorted(alert.code for alert in alerts if alert.rule == '돌파') == ['000001', '000002', '000005']
+
+def test_volume_spike():
+    """거래량 급증 테스트"""
+    engine = AlertEngine([
+        {'name': '거래량', 'type': 'volume_spike', 'ratio': 3, 'window': 5, 'warmup': 3}
+    ], max_codes=4)
+
+    volume = 0
+    for t in range(6):
+        volume += 100
+        assert engine.evaluate(make_items([('000001', 1000, 0, volume)]), now=t * 60) == []
+    volume += 400
+    alerts = engine.evaluate(make_items([('000001', 1000, 0, volume)]), now=360)
+    assert len(alerts) == 1
+    assert alerts[0].value == pytest.approx(4.0)
+
+def test_load_rules(tmp_path):
+    """알림 규칙 파일 로드 테스트"""
+    path = tmp_path / 'alerts.json'
+    assert load_rules(str(path)) == []
+    path.write_text(json.dumps([{'type': 'change_rate_above', 'threshold': 5}]), encoding='utf-8')
+    assert load_rules(str(path)) == [{'type': 'change_rate_above', 'threshold': 5}]
+
+def test_evaluate_arrays_is_fast():
+    """수천 종목 규칙 평가가 1ms 이내인지 테스트"""
+    n = 3000
+    engine = AlertEngine([
+        {'type': 'change_rate_above', 'threshold': 5},
+        {'type': 'change_rate_below', 'threshold': -5},
+        {'type': 'price_cross_above', 'price': 10000},
+        {'type': 'volume_spike', 'ratio': 3}
+    ], max_codes=n)
+    for i in range(n):
+        engine.row(f'{i:06d}')
+
+    rng = np.random.default_rng(0)
+    rows = np.arange(n)
+    volume = np.zeros(n)
+    timings = []
+    for t in range(20):
+        price = rng.normal(10000, 100, n)
+        change_rate = rng.normal(0, 1, n)
+        volume += rng.integers(0, 1000, n)
+        start = time.perf_counter()
+        engine.evaluate_arrays(rows, price, change_rate, volume, now=t * 60)
+        timings.append(time.perf_counter() - start)
+
+    assert sorted(timings)[len(timings) // 2] < 0.001
@@ -0,0 +1,156 @@
+import pytest
+import os,sys
+import json
+import time
+import socket
+from unittest.mock import patch
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+from api_server import QuoteBoard, create_app, start_api_server
+from tick_store import TickStore
+
+
+def make_quote(code, price):
+    return ({'code': code, 'name': f'종목{code}'},
+            {'stock_code': code, 'stock_name': f'종목{code}', 'current_price': price,
+             'change_rate': 1.5, 'volume': 100})
+
+@pytest.fixture
+def board():
+    board = QuoteBoard()
+    board.publish([make_quote('005930', 70000), make_quote('000660', 180000)],
+                  [{'code': '005930', 'name': '삼성전자'}, {'code': '000660', 'name': 'SK하이닉스'}])
+    return board
+
+def test_quotes_and_etag(board):
+    """전체 시세 조회 및 조건부 응답 테스트"""
+    client = TestClient(create_app(board))
+
+    res = client.get('/quotes')
+    assert res.status_code == 200
+    assert res.json()['005930']['current_price'] == 70000
+    etag = res.headers['etag']
+
+    assert client.get('/quotes', headers={'If-None-Match': etag}).status_code == 304
+
+    board.publish([make_quote('005930', 70100)])
+    res = client.get('/quotes', headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.headers['etag'] != etag
+
+def test_single_and_bulk_quotes(board):
+    """종목별, 여러 종목 시세 조회 테스트"""
+    client = TestClient(create_app(board))
+
+    res = client.get('/quotes/000660')
+    assert res.json()['current_price'] == 180000
+    etag = res.headers['etag']
+
+    # 다른 종목만 바뀌면 ETag 유지
+    board.publish([make_quote('005930', 70100)])
+    assert client.get('/quotes/000660', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/quotes/999999').status_code == 404
+
+    res = client.get('/quotes', params={'codes': '005930,999999'})
+    assert list(res.json()) == ['005930']
+
+def test_history_and_watchlist(board):
+    """최근 시세, 관심종목 조회 테스트"""
+    store = TickStore(max_codes=4, capacity=10)
+    for i in range(3):
+        store.append('005930', make_quote('005930', 70000 + i)[1], timestamp=i)
+    client = TestClient(create_app(board, store))
+
+    res = client.get('/quotes/005930/history', params={'n': 2})
+    assert res.json()['current_price'] == [70001, 70002]
+    assert client.get('/quotes/000660/history').status_code == 404
+
+    res = client.get('/watchlist')
+    assert [stock['code'] for stock in res.json()] == ['005930', '000660']
+
+def test_history_etag_follows_tick_store(board):
+    """시세가 그대로여도 기록이 쌓이면 최근 시세 ETag 가 바뀌는지 테스트"""
+    store = TickStore(max_codes=4, capacity=3)
+    quote = make_quote('005930', 70000)[1]
+    for i in range(3):
+        store.append('005930', quote, timestamp=i)
+    client = TestClient(create_app(board, store))
+
+    res = client.get('/quotes/005930/history', params={'n': 2})
+    etag = res.headers['etag']
+    assert client.get('/quotes/005930/history', params={'n': 2},
+                      headers={'If-None-Match': etag}).status_code == 304
+    # 304 응답은 본문을 만들지 않음
+    with patch.object(store, 'window', side_effect=AssertionError):
+        assert client.get('/quotes/005930/history', params={'n': 2},
+                          headers={'If-None-Match': etag}).status_code == 304
+    # n 이 다르면 본문도 다름
+    assert client.get('/quotes/005930/history', params={'n': 3},
+                      headers={'If-None-Match': etag}).status_code == 200
+
+    # 같은 시세가 한 번 더 기록되면 (보관 개수가 가득 찬 뒤에도) 창이 움직임
+    store.append('005930', quote, timestamp=3)
+    res = client.get('/quotes/005930/history', params={'n': 2}, headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.json()['timestamp'] == [2000, 3000]
+
+def test_metrics_endpoint(board):
+    """자체 모니터링 지표 조회 테스트"""
+    from metrics import Metrics
+
+    registry = Metrics()
+    registry.inc('ticks_total', 3)
+    client = TestClient(create_app(board, registry=registry))
+
+    res = client.get('/metrics')
+    assert res.status_code == 200
+    assert res.headers['content-type'].startswith('text/plain')
+    assert 'stock_monitor_ticks_total 3' in res.text
+
+def test_shards_endpoint(board):
+    """샤드 커버리지 조회 테스트"""
+    from sharding import ShardRouter
+
+    client = TestClient(create_app(board))
+    assert client.get('/shards').status_code == 404
+
+    router = ShardRouter(workers=['w1', 'w2'], worker='w1')
+    client = TestClient(create_app(board, shards=router))
+    body = client.get('/shards').json()
+    assert body['worker'] == 'w1'
+    assert body['total'] == 2
+    assert sum(body['workers'].values()) == 2
+
+def test_server_sent_events(board):
+    """server-sent events 로 변경 시세를 받는지 테스트"""
+    import httpx
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = start_api_server(board, host='127.0.0.1', port=port)
+    try:
+        for _ in range(100):
+            if server.started:
+                break
+            time.sleep(0.05)
+
+        events = []
+        with httpx.stream('GET', f'http://127.0.0.1:{port}/stream', timeout=5) as res:
+            for line in res.iter_lines():
+                if line.startswith('event:'):
+                    events.append(line.split(':', 1)[1].strip())
+                    if events == ['snapshot']:
+                        board.publish([make_quote('005930', 70200)])
+                elif line.startswith('data:') and len(events) == 2:
+                    data = json.loads(line.split(':', 1)[1])
+                    break
+    finally:
+        server.should_exit = True
+
+    assert events == ['snapshot', 'quotes']
+    assert data['quotes'] == {'005930': make_quote('005930', 70200)[1]}
@@ -0,0 +1,245 @@
+import pytest
+import os,sys
+import datetime
+from unittest.mock import patch
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_store import StateStore
+from market_calendar import MarketCalendar, korea_tz
+from rate_limiter import AdaptiveRateLimiter
+from backfill import plan_chunks, backfill, chunk_key, minute_points, covered_minutes, Chunk
+
+STOCK = {'code': '005930', 'name': '삼성전자'}
+
+
+def kst(*args):
+    return korea_tz.localize(datetime.datetime(*args))
+
+class FakeGaps:
+    """저장된 분, 일을 흉내 내는 대역"""
+
+    def __init__(self, minutes=(), days=()):
+        self.covered_minutes = set(minutes)
+        self.covered_days = set(days)
+
+    def minutes(self, code, start, stop):
+        return self.covered_minutes
+
+    def days(self, code, start, stop):
+        return self.covered_days
+
+class FakeWriter:
+    def __init__(self):
+        self.batches = []
+        self.buckets = []
+
+    def write_sync(self, points, bucket=None):
+        self.batches.append(points)
+        self.buckets.append(bucket)
+
+@pytest.fixture
+def calendar():
+    return MarketCalendar()
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    yield store
+    store.close()
+
+
+def test_plan_minute_windows(calendar):
+    """빈 분이 있는 119분 창만 조각으로 나누는지 테스트"""
+    start, end = kst(2026, 10, 13), kst(2026, 10, 15)
+    now = kst(2026, 10, 16).timestamp()
+    chunks = plan_chunks([STOCK], start, end, FakeGaps(), daily=False, calendar=calendar, now=now)
+
+    # 09:00 ~ 15:30 (391분) -> 창 4개씩 2일
+    assert len(chunks) == 8
+    assert [chunk.end for chunk in chunks[:4]] == ['153000', '133100', '113200', '093300']
+    assert sum(len(chunk.missing) for chunk in chunks) == 391 * 2
+
+    # 13:32 ~ 15:30 이 이미 저장되어 있으면 그 창은 건너뜀 (조용한 종목처럼 5분마다 저장된 분봉도 포함)
+    covered = list(range(int(kst(2026, 10, 13, 13, 32).timestamp()),
+                         int(kst(2026, 10, 13, 15, 30).timestamp()), 300)) + \
+        [int(kst(2026, 10, 13, 15, 30).timestamp())]
+    chunks = plan_chunks([STOCK], start, end, FakeGaps(minutes=covered), daily=False,
+                         calendar=calendar, now=now)
+    assert len(chunks) == 7
+    assert chunks[0].end == '133100'
+
+def test_plan_skips_future_minutes(calendar):
+    """아직 끝나지 않은 분은 채우지 않는지 테스트"""
+    now = kst(2026, 10, 13, 9, 10, 30).timestamp()
+    chunks = plan_chunks([STOCK], kst(2026, 10, 13), kst(2026, 10, 14), FakeGaps(),
+                         daily=False, calendar=calendar, now=now)
+    assert len(chunks) == 1
+    assert chunks[0].end == '090900'
+    assert len(chunks[0].missing) == 10
+
+def test_plan_daily_runs(calendar):
+    """빠진 거래일만 연속 구간으로 묶는지 테스트"""
+    start, end = kst(2026, 10, 12), kst(2026, 10, 17)
+    now = kst(2026, 10, 17).timestamp()
+    chunks = plan_chunks([STOCK], start, end, FakeGaps(days={'20261014'}), minute=False,
+                         calendar=calendar, now=now)
+
+    assert [(chunk.date, chunk.end) for chunk in chunks] == \
+        [('20261012', '20261013'), ('20261015', '20261016')]
+
+def test_covered_minutes():
+    """분봉 간격이 heartbeat 이내인 사이 분만 저장된 것으로 보는지 테스트"""
+    assert covered_minutes([0, 300, 600, 1500], heartbeat=300) == set(range(0, 660, 60)) | {1500}
+    assert covered_minutes([0, 120], heartbeat=60) == {0, 120}
+
+def make_minute_rows(*rows):
+    return [{'stck_bsop_date': '20261013', 'stck_cntg_hour': hour, 'stck_prpr': str(price),
+             'stck_oprc': str(price), 'stck_hgpr': str(price), 'stck_lwpr': str(price),
+             'cntg_vol': '10', 'acml_tr_pbmn': str(value)}
+            for hour, price, value in rows]
+
+def test_minute_points_only_missing():
+    """빈 분만 분봉 포인트로 만들고 분봉 거래대금은 누적값 차이로 계산하는지 테스트"""
+    t1 = int(kst(2026, 10, 13, 9, 1).timestamp())
+    chunk = Chunk('1m', STOCK, '20261013', '090200', frozenset([t1]))
+    rows = make_minute_rows(('090200', 70200, 3000), ('090100', 70100, 2500), ('090000', 70000, 1000))
+    points = minute_points(chunk, rows)
+
+    # stock_price 는 만들지 않고, bucket 을 따로 두지 않으면 기본 bucket
+    lines = [point.to_line_protocol() for point in points[None]]
+    assert len(lines) == 1
+    assert lines[0].startswith('stock_bar_1m,code=005930')
+    assert 'close=70100i' in lines[0]
+    assert 'trading_value=1500i' in lines[0]
+
+    # 분봉 bucket 을 지정하면 그 bucket 으로
+    with patch.dict(os.environ, {'ROLLUP_BUCKET_1M': 'bars_1m'}):
+        points = minute_points(chunk, rows)
+    assert list(points) == ['bars_1m']
+    assert points['bars_1m'][0].to_line_protocol().startswith('stock_bar_1m')
+
+def test_minute_points_first_row_trading_value():
+    """장 시작 분봉은 누적 거래대금을, 창 앞 분이 없는 분봉은 거래대금 없이 저장하는지 테스트"""
+    t0 = int(kst(2026, 10, 13, 9, 0).timestamp())
+    chunk = Chunk('1m', STOCK, '20261013', '090100', frozenset([t0, t0 + 60]))
+    points = minute_points(chunk, make_minute_rows(('090100', 70100, 2500), ('090000', 70000, 1000)))
+    lines = [point.to_line_protocol() for point in points[None]]
+    assert 'trading_value=1000i' in lines[0]
+    assert 'trading_value=1500i' in lines[1]
+
+    # 응답이 가득 찼는데 창 앞 분이 없으면 (장 시작이 아님) 거래대금을 알 수 없음
+    with patch('backfill.MINUTE_CHART_ROWS', 2):
+        points = minute_points(chunk, make_minute_rows(('090100', 70100, 2500),
+                                                       ('090000', 70000, 1000)))
+    lines = [point.to_line_protocol() for point in points[None]]
+    assert 'trading_value' not in lines[0]
+    assert 'trading_value=1500i' in lines[1]
+
+# 로컬 목 서버 실행 헬퍼
+async def start_mock_server(routes):
+    from aiohttp import web
+
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+def minute_handler_factory(calls):
+    from aiohttp import web
+
+    async def handler(request):
+        calls.append(dict(request.query))
+        date = request.query['FID_INPUT_DATE_1']
+        end = datetime.datetime.strptime(date + request.query['FID_INPUT_HOUR_1'], '%Y%m%d%H%M%S')
+        rows = []
+        for i in range(120):
+            t = end - datetime.timedelta(minutes=i)
+            rows.append({'stck_bsop_date': t.strftime('%Y%m%d'),
+                         'stck_cntg_hour': t.strftime('%H%M%S'),
+                         'stck_prpr': '70000', 'stck_oprc': '70000', 'stck_hgpr': '70100',
+                         'stck_lwpr': '69900', 'cntg_vol': '100',
+                         'acml_tr_pbmn': str(1000000 - i * 100)})
+        return web.json_response({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리',
+                                  'output1': {}, 'output2': rows})
+
+    return handler
+
+def daily_handler_factory(calls):
+    from aiohttp import web
+
+    async def handler(request):
+        calls.append(dict(request.query))
+        rows = [{'stck_bsop_date': date, 'stck_clpr': '70000', 'stck_oprc': '69000',
+                 'stck_hgpr': '71000', 'stck_lwpr': '68000', 'acml_vol': '1000000',
+                 'acml_tr_pbmn': '70000000000'}
+                for date in ('20261016', '20261015', '20261014', '20261013', '20261012')
+                if request.query['FID_INPUT_DATE_1'] <= date <= request.query['FID_INPUT_DATE_2']]
+        return web.json_response({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리',
+                                  'output1': {}, 'output2': rows})
+
+    return handler
+
+def test_backfill_resume(store):
+    """빈 구간을 채우고 다시 실행하면 완료한 조각은 건너뛰는지 테스트"""
+    import kis_api
+
+    minute_calls, daily_calls = [], []
+    client = kis_api.KisClient()
+    runner, url_base = client.run(start_mock_server({
+        '/uapi/domestic-stock/v1/quotations/inquire-time-dailychartprice':
+            minute_handler_factory(minute_calls),
+        '/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice':
+            daily_handler_factory(daily_calls),
+    }))
+    writer = FakeWriter()
+    start, end = kst(2026, 10, 13), kst(2026, 10, 15)
+    try:
+        with patch('kis_api.URL_BASE', url_base), \
+                patch('kis_api.APP_KEY', 'test_app_key'), \
+                patch('kis_api.APP_SECRET', 'test_app_secret'), \
+                patch('token_manager.TokenManager.get', return_value='test_token'), \
+                patch('kis_api.rate_limiter', AdaptiveRateLimiter(500, max_rate=500)), \
+                patch('backfill.BACKFILL_BATCH', 500):
+            stats = backfill([STOCK], start, end, writer, gaps=FakeGaps(), store=store,
+                             client=client)
+            again = backfill([STOCK], start, end, writer, gaps=FakeGaps(), store=store,
+                             client=client)
+    finally:
+        client.run(runner.cleanup())
+        client.close()
+
+    # 분봉 2일 x 4창 + 일봉 1구간
+    assert stats['chunks'] == 9
+    assert stats['done'] == 9
+    assert stats['failed'] == 0
+    assert len(minute_calls) == 8
+    assert len(daily_calls) == 1
+    # 분봉마다 stock_bar_1m 한 포인트 + 일봉 2개
+    assert stats['points'] == 391 * 2 + 2
+    # 큰 배치로 나누어 저장
+    assert len(writer.batches) >= 2
+    assert all(len(batch) >= 500 for batch in writer.batches[:-1])
+    # 모든 분봉에 거래대금이 있음
+    assert all('trading_value=100i' in point.to_line_protocol()
+               for batch in writer.batches for point in batch
+               if point.to_line_protocol().startswith('stock_bar_1m'))
+
+    assert again['skipped'] == 9
+    assert again['chunks'] == 0
+    assert len(minute_calls) == 8
+
+def test_backfill_chunk_checkpoint(store):
+    """완료 기록 저장, 조회, 정리 테스트"""
+    chunk = Chunk('1d', STOCK, '20261012', '20261016', frozenset())
+    store.save_backfill_chunks([chunk_key(chunk)])
+    assert store.load_backfill_chunks([chunk_key(chunk), 'x']) == {chunk_key(chunk)}
+
+    store.prune_backfill_chunks(before=float('inf'))
+    assert store.load_backfill_chunks([chunk_key(chunk)]) == set()
@@ -0,0 +1,87 @@
+import pytest
+import os,sys
+import json
+import logging
+import logging.handlers
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bootstrap
+
+
+def test_load_config_once(tmp_path, monkeypatch):
+    """.env 를 한 번만 로드하는지 테스트"""
+    (tmp_path / '.env').write_text('BOOTSTRAP_TEST_VALUE=first\n')
+    monkeypatch.setenv('CONFIG_DIR', str(tmp_path))
+    monkeypatch.delenv('BOOTSTRAP_TEST_VALUE', raising=False)
+    monkeypatch.setattr(bootstrap, '_config_loaded', False)
+
+    bootstrap.load_config()
+    assert os.environ['BOOTSTRAP_TEST_VALUE'] == 'first'
+
+    # 두 번째 호출은 파일을 다시 읽지 않음
+    monkeypatch.delenv('BOOTSTRAP_TEST_VALUE')
+    bootstrap.load_config()
+    assert 'BOOTSTRAP_TEST_VALUE' not in os.environ
+
+def test_setup_logging_once(monkeypatch):
+    """로깅 핸들러를 한 번만 등록하는지 테스트"""
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    monkeypatch.setattr(bootstrap, '_logging_ready', False)
+
+    bootstrap.setup_logging()
+    bootstrap.setup_logging()
+
+    assert len(root.handlers) == 1
+    assert logging.getLogger('apscheduler').level == logging.ERROR
+
+def test_json_formatter():
+    """JSON lines 포맷 테스트"""
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, "저장 %d포인트", (3,), None)
+    record.fields = {'written': 3}
+
+    entry = json.loads(bootstrap.JsonFormatter().format(record))
+
+    assert entry['message'] == "저장 3포인트"
+    assert entry['level'] == 'INFO'
+    assert entry['written'] == 3
+
+def test_setup_logging_prod(monkeypatch, capsys):
+    """prod 모드에서 큐 리스너가 JSON 한 줄을 출력하는지 테스트"""
+    root = logging.getLogger()
+    monkeypatch.setattr(root, 'handlers', [])
+    monkeypatch.setattr(bootstrap, '_logging_ready', False)
+
+    bootstrap.setup_logging(mode='prod')
+    try:
+        assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+        logging.getLogger('app').info("요약 %s", "한 줄", extra={'fields': {'failed': 0}})
+    finally:
+        bootstrap.stop_logging()
+
+    line = capsys.readouterr().err.strip().splitlines()[-1]
+    entry = json.loads(line)
+    assert entry['message'] == "요약 한 줄"
+    assert entry['failed'] == 0
+
+def test_import_has_no_side_effects(tmp_path):
+    """app, kis_api 를 import 만 하면 .env 로드, 클라이언트/상태 생성이 일어나지 않는지 테스트"""
+    import subprocess
+
+    (tmp_path / '.env').write_text('BOOTSTRAP_TEST_VALUE=loaded\n')
+    code = (
+        "import bootstrap, kis_api, app, os\n"
+        "assert not bootstrap._config_loaded and not bootstrap._logging_ready\n"
+        "assert 'BOOTSTRAP_TEST_VALUE' not in os.environ\n"
+        "assert kis_api.kis_client is None and kis_api.token_manager is None\n"
+        "assert app.watchlist is None and app.tick_store is None and app.writer is None\n"
+        "app.setup()\n"
+        "assert app.tick_store is not None and app.quote_board is not None\n"
+    )
+    env = dict(os.environ, CONFIG_DIR=str(tmp_path))
+    env.pop('BOOTSTRAP_TEST_VALUE', None)
+    proc = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert proc.returncode == 0, proc.stderr
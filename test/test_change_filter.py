@@ -0,0 +1,55 @@
+import pytest
+import os,sys
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from change_filter import ChangeFilter, parse_deadbands
+
+
+@pytest.fixture
+def sample_result():
+    return {
+        'stock_code': '005930',
+        'stock_name': '삼성전자',
+        'current_price': 70000,
+        'change_rate': 1.45,
+        'volume': 1000000
+    }
+
+def test_suppress_unchanged(sample_result):
+    """변화 없는 시세 생략 테스트"""
+    change_filter = ChangeFilter(heartbeat=0, deadbands={})
+
+    assert change_filter.should_write('005930', sample_result, now=0)
+    assert not change_filter.should_write('005930', dict(sample_result), now=60)
+    assert change_filter.should_write('005930', dict(sample_result, volume=1000100), now=120)
+    assert change_filter.should_write('000660', sample_result, now=120)
+    assert change_filter.passed == 3
+    assert change_filter.suppressed == 1
+
+def test_heartbeat(sample_result):
+    """heartbeat 주기마다 저장 테스트"""
+    change_filter = ChangeFilter(heartbeat=5, deadbands={})
+
+    assert change_filter.should_write('005930', sample_result, now=0)
+    assert not change_filter.should_write('005930', sample_result, now=240)
+    assert change_filter.should_write('005930', sample_result, now=300)
+    assert not change_filter.should_write('005930', sample_result, now=360)
+
+def test_deadband(sample_result):
+    """필드별 허용폭 테스트 (마지막 저장값 기준)"""
+    change_filter = ChangeFilter(heartbeat=0, deadbands={'change_rate': 0.1, 'volume': 1000})
+
+    assert change_filter.should_write('005930', sample_result, now=0)
+    assert not change_filter.should_write(
+        '005930', dict(sample_result, change_rate=1.50, volume=1000500), now=60)
+    # 누적 차이가 허용폭을 넘으면 저장
+    assert change_filter.should_write(
+        '005930', dict(sample_result, change_rate=1.60, volume=1000500), now=120)
+
+def test_parse_deadbands():
+    """허용폭 설정 문자열 파싱 테스트"""
+    assert parse_deadbands("change_rate:0.05, current_price:10") == \
+        {'change_rate': 0.05, 'current_price': 10.0}
+    assert parse_deadbands(None) == {}
@@ -0,0 +1,67 @@
+import pytest
+import os,sys
+import numpy as np
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import IndicatorEngine
+
+
+def make_items(codes, prices, change_rates, volume=100, trading_value=10000):
+    return [({'code': code, 'name': code},
+             {'current_price': int(price), 'change_rate': float(rate),
+              'volume': volume, 'trading_value': trading_value})
+            for code, price, rate in zip(codes, prices, change_rates)]
+
+def test_indicators_match_reference():
+    """증분 계산 결과가 전체 재계산과 같은지 테스트"""
+    rng = np.random.default_rng(0)
+    codes = ['000001', '000002', '000003']
+    ticks = 50
+    prices = rng.integers(9000, 11000, size=(ticks, len(codes)))
+    rates = rng.normal(0, 2, size=(ticks, len(codes))).round(2)
+
+    engine = IndicatorEngine(max_codes=8, sma_window=5, ema_spans=(3,), vol_window=7)
+    for t in range(ticks):
+        result = engine.update(make_items(codes, prices[t], rates[t]))
+
+    ema = prices[0].astype(float)
+    for t in range(1, ticks):
+        ema = ema + 0.5 * (prices[t] - ema)
+
+    for i, (stock, fields) in enumerate(result):
+        assert stock['code'] == codes[i]
+        assert fields['sma_5'] == pytest.approx(prices[-5:, i].mean())
+        assert fields['ema_3'] == pytest.approx(ema[i])
+        assert fields['volatility_7'] == pytest.approx(rates[-7:, i].std(), abs=1e-9)
+        assert fields['vwap'] == pytest.approx(100.0)
+
+def test_partial_window_and_duplicates():
+    """구간이 덜 찬 경우와 중복 종목 처리 테스트"""
+    engine = IndicatorEngine(max_codes=4, sma_window=10, ema_spans=(12, 26), vol_window=10)
+    engine.update(make_items(['000001'], [100], [1.0]))
+    result = engine.update(make_items(['000001', '000001'], [110, 120], [2.0, 3.0]))
+
+    assert len(result) == 1
+    fields = result[0][1]
+    assert fields['sma_10'] == pytest.approx(110.0)
+    assert fields['volatility_10'] == pytest.approx(1.0)
+
+def test_zero_volume_has_no_vwap():
+    """거래량이 0 이면 vwap 을 내보내지 않는지 테스트"""
+    engine = IndicatorEngine(max_codes=2)
+    result = engine.update(make_items(['000001'], [100], [0.0], volume=0, trading_value=0))
+    assert 'vwap' not in result[0][1]
+
+def test_grows_past_max_codes():
+    """처음 할당한 종목 수를 넘으면 기존 상태를 유지한 채 늘리는지 테스트"""
+    engine = IndicatorEngine(max_codes=1, sma_window=10, ema_spans=(3,), vol_window=10)
+    engine.update(make_items(['000001'], [100], [1.0]))
+    result = engine.update(make_items(['000001', '000002', '000003'], [110, 200, 300], [1.0, 2.0, 3.0]))
+
+    assert engine.max_codes == 4
+    fields = {stock['code']: values for stock, values in result}
+    assert fields['000001']['sma_10'] == pytest.approx(105.0)
+    assert fields['000003']['sma_10'] == pytest.approx(300.0)
+    assert fields['000003']['ema_3'] == pytest.approx(300.0)
@@ -0,0 +1,127 @@
+import pytest
+import os,sys
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from influx_writer import InfluxWriter, build_point
+
+
+# InfluxDB /api/v2/write 대체 서버
+@pytest.fixture
+def influx_server():
+    requests_received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            requests_received.append((self.path, body.decode('utf-8')))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', requests_received
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def sample_result():
+    return {
+        'stock_code': '005930',
+        'stock_name': '삼성전자',
+        'current_price': 70000,
+        'change_rate': 1.45,
+        'volume': 1000000
+    }
+
+def test_build_point(sample_result):
+    """시세 딕셔너리 -> Point 변환 테스트 (숫자 필드만 저장)"""
+    point = build_point({'code': '005930', 'name': '삼성전자'}, sample_result)
+    line = point.to_line_protocol()
+
+    assert line.startswith('stock_price,code=005930,name=삼성전자 ')
+    assert 'current_price=70000i' in line
+    assert 'change_rate=1.45' in line
+    assert 'stock_name' not in line
+
+def test_writer_batches_tick(influx_server, sample_result):
+    """한 틱의 포인트가 gzip 요청 하나로 전송되는지 테스트"""
+    url, requests_received = influx_server
+    writer = InfluxWriter(url=url, token='token', org='org', bucket='bucket',
+                          batch_size=100, flush_interval=10000, gzip=True)
+
+    points = [build_point({'code': f'{i:06d}', 'name': f'종목{i}'}, sample_result)
+              for i in range(24)]
+    writer.write(points)
+    writer.close()
+
+    assert len(requests_received) == 1
+    path, body = requests_received[0]
+    assert path.startswith('/api/v2/write')
+    assert len(body.splitlines()) == 24
+
+def test_writer_spools_failed_batch(influx_server, tmp_path):
+    """저장 실패한 배치를 스풀에 보관하고 재전송하는지 테스트"""
+    from spool import Spool
+
+    url, requests_received = influx_server
+    spool = Spool(directory=str(tmp_path))
+    writer = InfluxWriter(url=url, token='token', org='org', bucket='bucket', spool=spool)
+
+    data = b'stock_price,code=005930 current_price=70000i'
+    writer._on_error(('bucket', 'org', 'ns'), data, ConnectionError('influxdb down'))
+    assert spool.spooled == 1
+
+    assert spool.replay(writer.write_sync) == 1
+    writer.close()
+
+    assert requests_received[-1][1].strip() == data.decode('utf-8')
+
+def test_writer_spools_other_bucket(influx_server, tmp_path):
+    """다른 bucket 의 실패 배치는 bucket 별 스풀에 보관하고 그 bucket 으로 재전송하는지 테스트"""
+    from spool import Spool
+
+    url, requests_received = influx_server
+    spool = Spool(directory=str(tmp_path))
+    writer = InfluxWriter(url=url, token='token', org='org', bucket='bucket', spool=spool)
+
+    data = b'stock_bar_1m,code=005930 close=70000i'
+    writer._on_error(('bars', 'org', 'ns'), data, ConnectionError('influxdb down'))
+    bar_spool = writer._spool_for('bars')
+    assert spool.spooled == 0
+    assert bar_spool.spooled == 1
+    assert bar_spool.directory == os.path.join(str(tmp_path), 'bars')
+
+    assert bar_spool.replay(writer._bucket_spools['bars'][1].write) == 1
+    writer.close()
+
+    path, body = requests_received[-1]
+    assert 'bucket=bars' in path
+    assert body.strip() == data.decode('utf-8')
+
+def test_writer_write_quotes(influx_server):
+    """시세를 line protocol 로 바로 변환하여 batch_size 종목씩 저장하는지 테스트"""
+    from quote import Quote
+
+    url, requests_received = influx_server
+    writer = InfluxWriter(url=url, token='token', org='org', bucket='bucket',
+                          batch_size=10, flush_interval=10000, gzip=False)
+
+    quotes = [({'code': f'{i:06d}', 'name': f'종목{i}'},
+               Quote(f'{i:06d}', f'종목{i}', 70000 + i, 100, 0.14, 1000, 70000000, 69900, 70100, 69800))
+              for i in range(25)]
+    writer.write_quotes(quotes)
+    writer.close()
+
+    lines = [line for _, body in requests_received for line in body.splitlines()]
+    assert lines == [build_point(stock, quote).to_line_protocol() for stock, quote in quotes]
@@ -3,11 +3,11 @@ import os,sys
 import json
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
-from tinydb import TinyDB
 
 # 상위 디렉토리를 시스템 경로에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from state_store import StateStore, close_stores
 from kis_api import (
     load_token, 
     save_token, 
@@ -35,8 +35,10 @@ def setup_env():
     yield
     
     # 테스트 후 정리
-    if os.path.exists('test_config/db.json'):
-        os.remove('test_config/db.json')
+    close_stores()
+    for name in ('db.json', 'state.db', 'state.db-wal', 'state.db-shm'):
+        if os.path.exists(os.path.join('test_config', name)):
+            os.remove(os.path.join('test_config', name))
     if os.path.exists('test_config'):
         os.rmdir('test_config')
 
@@ -56,18 +58,17 @@ def test_save_token():
         
         save_token('test_token')
         
-        # TinyDB에서 직접 토큰 확인
-        db = TinyDB('test_config/db.json')
-        token_table = db.table('token')
-        token_data = token_table.all()[-1] if token_table.all() else None
-        db.close()
+        # 상태 저장소에서 직접 토큰 확인
+        store = StateStore('test_config/state.db')
+        token_data = store.get('token')
+        store.close()
         
         assert token_data is not None
         assert token_data['access_token'] == 'test_token'
         assert token_data['issued_time'] == mock_now.isoformat()
 
 # 인증 관련 테스트
-@patch('kis_api.requests.post')
+@patch('requests.Session.post')
 def test_auth_success(mock_post):
     """인증 성공 테스트"""
     mock_response = MagicMock()
@@ -77,16 +78,15 @@ def test_auth_success(mock_post):
     
     auth()
     
-    # TinyDB에서 직접 토큰 확인
-    db = TinyDB('test_config/db.json')
-    token_table = db.table('token')
-    token_data = token_table.all()[-1] if token_table.all() else None
-    db.close()
+    # 상태 저장소에서 직접 토큰 확인
+    store = StateStore('test_config/state.db')
+    token_data = store.get('token')
+    store.close()
     
     assert token_data is not None
     assert token_data['access_token'] == 'test_token'
 
-@patch('kis_api.requests.post')
+@patch('requests.Session.post')
 def test_auth_failure(mock_post):
     """인증 실패 테스트"""
     mock_response = MagicMock()
@@ -98,7 +98,7 @@ def test_auth_failure(mock_post):
     assert str(exc_info.value) == '인증 실패'
 
 # 주식 시세 조회 테스트
-@patch('kis_api.requests.get')
+@patch('requests.Session.get')
 def test_get_current_price_success(mock_get):
     """주식 시세 조회 성공 테스트"""
     mock_response = MagicMock()
@@ -119,7 +119,7 @@ def test_get_current_price_success(mock_get):
     }
     mock_get.return_value = mock_response
     
-    with patch('kis_api.load_token', return_value='test_token'):
+    with patch('token_manager.TokenManager.get', return_value='test_token'):
         result = get_current_price('005930', '삼성전자')
         
         assert result is not None
@@ -129,3 +129,364 @@ def test_get_current_price_success(mock_get):
         assert result['change_rate'] == 1.45
 
 
+# 로컬 목 서버 실행 헬퍼
+async def start_mock_server(routes):
+    from aiohttp import web
+
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+# 비동기 시세 조회 테스트
+def test_get_current_prices_async():
+    """로컬 서버를 이용한 비동기 시세 일괄 조회 테스트"""
+    from aiohttp import web
+    import kis_api
+
+    async def handler(request):
+        code = request.query['FID_INPUT_ISCD']
+        if code == '999999':
+            return web.json_response({'rt_cd': '1', 'msg_cd': 'E', 'msg1': 'error'})
+        return web.json_response({
+            'rt_cd': '0',
+            'output': {
+                'stck_shrn_iscd': code,
+                'stck_prpr': '70000',
+                'prdy_vrss': '1000',
+                'prdy_ctrt': '1.45',
+                'acml_vol': '1000000',
+                'acml_tr_pbmn': '70000000000',
+                'stck_oprc': '69000',
+                'stck_hgpr': '71000',
+                'stck_lwpr': '68000'
+            }
+        })
+
+    client = kis_api.KisClient()
+
+    async def run():
+        runner, url_base = await start_mock_server(
+            {'/uapi/domestic-stock/v1/quotations/inquire-price': handler})
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'):
+                stocks = [
+                    {'code': '005930', 'name': '삼성전자'},
+                    {'code': '999999', 'name': '없는종목'},
+                    {'code': '000660', 'name': 'SK하이닉스'}
+                ]
+                return await kis_api.get_current_prices_async(
+                    stocks, rate=100, client=client)
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'):
+        results = client.run(run())
+    client.close()
+
+    assert results[0]['stock_code'] == '005930'
+    assert results[0]['stock_name'] == '삼성전자'
+    assert results[1] is None
+    assert results[2]['current_price'] == 70000
+
+def test_kis_client_retry_async():
+    """5xx 응답 재시도 테스트"""
+    from aiohttp import web
+    import kis_api
+
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        if len(calls) < 3:
+            return web.Response(status=503, text='busy')
+        return web.json_response({'rt_cd': '0'})
+
+    client = kis_api.KisClient(max_retries=2)
+
+    async def run():
+        runner, url_base = await start_mock_server({'/ping': handler})
+        try:
+            return await client.get_async(f'{url_base}/ping')
+        finally:
+            await runner.cleanup()
+
+    status, data = client.run(run())
+    client.close()
+
+    assert status == 200
+    assert data == {'rt_cd': '0'}
+    assert len(calls) == 3
+
+def test_kis_client_timeouts():
+    """동기 요청에 기본 타임아웃이 적용되는지 테스트"""
+    import kis_api
+
+    client = kis_api.KisClient(connect_timeout=1, read_timeout=2)
+    with patch.object(client.session, 'get') as mock_get:
+        client.get('http://localhost/ping')
+    mock_get.assert_called_once_with('http://localhost/ping', timeout=(1, 2))
+    client.close()
+
+# 멀티종목 시세 조회 테스트
+def test_get_current_prices_multi_async():
+    """멀티종목 조회 분할 및 단건 조회 대체 테스트"""
+    from aiohttp import web
+    import kis_api
+
+    calls = {'multi': 0, 'single': 0}
+
+    async def multi_handler(request):
+        calls['multi'] += 1
+        rows = []
+        for i in range(1, 31):
+            code = request.query.get(f'FID_INPUT_ISCD_{i}')
+            if code is None or code == '000034':
+                continue
+            rows.append({
+                'inter_shrn_iscd': code,
+                'inter_kor_isnm': f'종목{code}',
+                'inter2_prpr': '10000',
+                'inter2_prdy_vrss': '100',
+                'prdy_vrss_sign': '5',
+                'prdy_ctrt': '0.99',
+                'acml_vol': '500',
+                'acml_tr_pbmn': '5000000',
+                'inter2_oprc': '10100',
+                'inter2_hgpr': '10200',
+                'inter2_lwpr': '9900'
+            })
+        return web.json_response({'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': 'ok', 'output': rows})
+
+    async def single_handler(request):
+        calls['single'] += 1
+        code = request.query['FID_INPUT_ISCD']
+        return web.json_response({
+            'rt_cd': '0',
+            'output': {
+                'stck_shrn_iscd': code,
+                'stck_prpr': '20000',
+                'prdy_vrss': '0',
+                'prdy_ctrt': '0.00',
+                'acml_vol': '10',
+                'acml_tr_pbmn': '200000',
+                'stck_oprc': '20000',
+                'stck_hgpr': '20000',
+                'stck_lwpr': '20000'
+            }
+        })
+
+    client = kis_api.KisClient()
+    stocks = [{'code': f'{i:06d}', 'name': f'종목{i}'} for i in range(35)]
+
+    async def run():
+        runner, url_base = await start_mock_server({
+            '/uapi/domestic-stock/v1/quotations/intstock-multprice': multi_handler,
+            '/uapi/domestic-stock/v1/quotations/inquire-price': single_handler
+        })
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'):
+                return await kis_api.get_current_prices_multi_async(
+                    stocks, rate=100, client=client)
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'):
+        results = client.run(run())
+    client.close()
+
+    assert calls == {'multi': 2, 'single': 1}
+    assert [result['stock_code'] for result in results] == [stock['code'] for stock in stocks]
+    assert results[0]['stock_name'] == '종목0'
+    assert results[0]['current_price'] == 10000
+    assert results[0]['price_diff'] == -100
+    assert results[0]['change_rate'] == -0.99
+    assert results[34]['current_price'] == 20000
+
+def test_rate_limited_retry():
+    """초당 거래건수 초과 응답 시 속도를 낮추고 다시 조회하는지 테스트"""
+    from aiohttp import web
+    import kis_api
+    from rate_limiter import AdaptiveRateLimiter
+
+    calls = []
+
+    async def handler(request):
+        calls.append(request.query['FID_INPUT_ISCD'])
+        if len(calls) <= 2:
+            return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00201',
+                                      'msg1': '초당 거래건수를 초과하였습니다.'}, status=500)
+        return web.json_response({'rt_cd': '0', 'output': {
+            'stck_shrn_iscd': request.query['FID_INPUT_ISCD'], 'stck_prpr': '70000',
+            'prdy_vrss': '0', 'prdy_ctrt': '0', 'acml_vol': '0', 'acml_tr_pbmn': '0',
+            'stck_oprc': '70000', 'stck_hgpr': '70000', 'stck_lwpr': '70000'}})
+
+    client = kis_api.KisClient(max_retries=2)
+    limiter = AdaptiveRateLimiter(40, max_rate=40)
+    limiter.saved_rate = limiter.rate
+
+    async def run():
+        runner, url_base = await start_mock_server(
+            {'/uapi/domestic-stock/v1/quotations/inquire-price': handler})
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'), \
+                    patch('kis_api.KIS_BACKOFF', 0.01):
+                stocks = [{'code': '005930', 'name': '삼성전자'},
+                          {'code': '000660', 'name': 'SK하이닉스'}]
+                return await kis_api.get_current_prices_async(stocks, client=client)
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'), \
+            patch('kis_api.rate_limiter', limiter):
+        results = client.run(run())
+        # 학습한 속도는 상태 저장소에 저장됨
+        from state_store import default_store
+        assert default_store().get('kis_rate') == round(limiter.rate, 2)
+    client.close()
+
+    assert [result['current_price'] for result in results] == [70000, 70000]
+    # KisClient 내부 재시도 없이 두 종목 모두 거부 후 한 번씩 다시 조회
+    assert len(calls) == 4
+    # 40 -> 20 으로 한 번만 줄고 이후 성공 2건만큼 증가
+    assert 20 < limiter.rate < 20.2
+
+def test_rate_limited_deadline():
+    """마감 시각이 지나면 더 이상 재시도하지 않는지 테스트"""
+    from aiohttp import web
+    import kis_api
+
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00201',
+                                  'msg1': '초당 거래건수를 초과하였습니다.'}, status=500)
+
+    client = kis_api.KisClient()
+
+    async def run():
+        runner, url_base = await start_mock_server(
+            {'/uapi/domestic-stock/v1/quotations/inquire-price': handler})
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'):
+                loop = kis_api.asyncio.get_running_loop()
+                return await kis_api.get_current_prices_async(
+                    [{'code': '005930', 'name': '삼성전자'}], rate=100, client=client,
+                    deadline=loop.time() + 0.05)
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'):
+        results = client.run(run())
+    client.close()
+
+    assert results == [None]
+    assert len(calls) == 1
+
+def test_tiered_tick_deadline():
+    """등급별 조회 틱은 계속 거부되어도 POLL_TICK 안에 끝나는지 테스트"""
+    import time
+    from aiohttp import web
+    import kis_api
+    from rate_limiter import AdaptiveRateLimiter
+    from poll_scheduler import rate_budget
+
+    calls = []
+
+    async def handler(request):
+        calls.append(1)
+        return web.json_response({'rt_cd': '1', 'msg_cd': 'EGW00201',
+                                  'msg1': '초당 거래건수를 초과하였습니다.'}, status=500)
+
+    client = kis_api.KisClient(max_retries=0)
+    limiter = AdaptiveRateLimiter(20, max_rate=20)
+    limiter.saved_rate = limiter.rate
+    poll_tick = 1
+
+    async def run():
+        runner, url_base = await start_mock_server(
+            {'/uapi/domestic-stock/v1/quotations/inquire-price': handler})
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'), \
+                    patch('kis_api.KIS_BACKOFF', 0.01):
+                stocks = [{'code': f"{i:06d}", 'name': f"종목 {i}"}
+                          for i in range(rate_budget(tick=poll_tick))]
+                return await kis_api.get_current_prices_async(
+                    stocks, client=client, deadline=kis_api.tick_deadline(poll_tick))
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'), \
+            patch('kis_api.rate_limiter', limiter):
+        started = time.perf_counter()
+        results = client.run(run())
+        elapsed = time.perf_counter() - started
+    client.close()
+
+    assert results and all(result is None for result in results)
+    # 속도가 반씩 줄어 대기 중인 요청이 밀려도 틱 주기 안에 포기
+    assert elapsed < poll_tick
+    assert calls
+
+def test_over_budget_ticks_rotate():
+    """요청 예산을 넘는 틱이 이어져도 건너뛴 종목을 다음 틱에 먼저 조회하는지 테스트"""
+    import asyncio
+    from aiohttp import web
+    import kis_api
+
+    fetched = set()
+
+    async def handler(request):
+        code = request.query['FID_INPUT_ISCD']
+        fetched.add(code)
+        return web.json_response({'rt_cd': '0', 'output': {
+            'stck_shrn_iscd': code, 'stck_prpr': '70000',
+            'prdy_vrss': '0', 'prdy_ctrt': '0', 'acml_vol': '0', 'acml_tr_pbmn': '0',
+            'stck_oprc': '70000', 'stck_hgpr': '70000', 'stck_lwpr': '70000'}})
+
+    client = kis_api.KisClient(max_retries=0)
+    stocks = [{'code': f"{i:06d}", 'name': f"종목 {i}"} for i in range(20)]
+    ticks = []
+
+    async def run():
+        runner, url_base = await start_mock_server(
+            {'/uapi/domestic-stock/v1/quotations/inquire-price': handler})
+        try:
+            with patch('kis_api.URL_BASE', url_base), \
+                    patch('kis_api.APP_KEY', 'test_app_key'), \
+                    patch('kis_api.APP_SECRET', 'test_app_secret'):
+                for _ in range(2):
+                    # 초당 20건으로 0.5초 안에는 절반 정도만 조회 가능
+                    deadline = asyncio.get_running_loop().time() + 0.5
+                    ticks.append(await kis_api.get_current_prices_async(
+                        stocks, rate=20, client=client, deadline=deadline))
+        finally:
+            await runner.cleanup()
+
+    with patch('token_manager.TokenManager.get', return_value='test_token'), \
+            patch('kis_api._deadline_skipped', set()):
+        client.run(run())
+    client.close()
+
+    assert all(None in results for results in ticks)
+    # 결과는 관심종목 순서 그대로
+    for results in ticks:
+        assert all(result['stock_code'] == stock['code']
+                   for stock, result in zip(stocks, results) if result)
+    assert fetched == {stock['code'] for stock in stocks}
@@ -0,0 +1,200 @@
+import pytest
+import os,sys
+import json
+import asyncio
+from datetime import datetime
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kis_stream import (
+    FIELDS,
+    KisStream,
+    parse_frame,
+    subscribe_message,
+    tick_to_result,
+    tick_time
+)
+
+
+# 테스트용 체결 레코드 생성
+def make_record(code, price, volume):
+    values = dict.fromkeys(FIELDS, '0')
+    values.update({
+        'MKSC_SHRN_ISCD': code,
+        'STCK_CNTG_HOUR': '093015',
+        'STCK_PRPR': str(price),
+        'PRDY_VRSS': '-100',
+        'PRDY_CTRT': '-0.14',
+        'STCK_OPRC': '70100',
+        'STCK_HGPR': '70500',
+        'STCK_LWPR': '69800',
+        'CNTG_VOL': '10',
+        'ACML_VOL': str(volume),
+        'ACML_TR_PBMN': str(price * volume),
+        'BSOP_DATE': '20250502'
+    })
+    return '^'.join(values[name] for name in FIELDS)
+
+def make_frame(records):
+    return f"0|H0STCNT0|{len(records):03d}|" + '^'.join(records)
+
+def test_parse_frame_multiple_records():
+    """여러 건이 담긴 프레임 파싱 테스트"""
+    frame = make_frame([make_record('005930', 70000, 100),
+                        make_record('000660', 180000, 50)])
+    ticks = parse_frame(frame)
+
+    assert len(ticks) == 2
+    assert ticks[0].code == '005930'
+    assert ticks[0].current_price == 70000
+    assert ticks[0].price_diff == -100
+    assert ticks[0].change_rate == -0.14
+    assert ticks[1].volume == 50
+    assert tick_time(ticks[0]).replace(tzinfo=None) == datetime(2025, 5, 2, 9, 30, 15)
+
+    result = tick_to_result(ticks[0], '삼성전자')
+    assert result['stock_name'] == '삼성전자'
+    assert result['trading_value'] == 7000000
+
+def test_parse_frame_ignores_other_messages():
+    """체결 데이터가 아닌 프레임 무시 테스트"""
+    assert parse_frame('0|H0STASP0|001|005930^1') == []
+    assert parse_frame('1|H0STCNT0|001|encrypted') == []
+
+def test_subscribe_message():
+    """실시간 등록 메시지 테스트"""
+    message = json.loads(subscribe_message('key', '005930'))
+    assert message['header']['approval_key'] == 'key'
+    assert message['header']['tr_type'] == '1'
+    assert message['body']['input'] == {'tr_id': 'H0STCNT0', 'tr_key': '005930'}
+
+def test_stream_reconnect_and_replay():
+    """로컬 웹소켓 서버 재생 및 재접속 후 재등록 테스트"""
+    from aiohttp import web, WSMsgType
+
+    stocks = [{'code': '005930', 'name': '삼성전자'},
+              {'code': '000660', 'name': 'SK하이닉스'}]
+    frames_per_connection = 500
+    subscriptions = []
+    connections = []
+    received = []
+
+    async def ws_handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.append(ws)
+
+        subscribed = []
+        while len(subscribed) < len(stocks):
+            msg = await ws.receive()
+            body = json.loads(msg.data)
+            subscribed.append(body['body']['input']['tr_key'])
+            await ws.send_str(json.dumps({
+                'header': {'tr_id': 'H0STCNT0', 'tr_key': subscribed[-1]},
+                'body': {'rt_cd': '0', 'msg_cd': 'OPSP0000', 'msg1': 'SUBSCRIBE SUCCESS'}
+            }))
+        subscriptions.append(subscribed)
+
+        await ws.send_str(json.dumps({'header': {'tr_id': 'PINGPONG'}}))
+        pong = await ws.receive()
+        assert json.loads(pong.data)['header']['tr_id'] == 'PINGPONG'
+
+        for i in range(frames_per_connection):
+            await ws.send_str(make_frame([make_record(code, 70000 + i, i) for code in subscribed]))
+
+        if len(connections) == 1:
+            await ws.close()  # 첫 연결은 끊어서 재접속 유도
+        else:
+            async for msg in ws:
+                if msg.type == WSMsgType.CLOSE:
+                    break
+        return ws
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/ws', ws_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        def on_ticks(ticks):
+            received.extend(ticks)
+            if len(received) >= 2 * frames_per_connection * len(stocks):
+                stream.stop()
+
+        stream = KisStream(stocks, on_ticks, url=f'http://127.0.0.1:{port}/ws',
+                           approval_key='test_key', reconnect_delay=0.01)
+        try:
+            await asyncio.wait_for(stream.run(), timeout=10)
+        finally:
+            await runner.cleanup()
+        return stream
+
+    stream = asyncio.run(run())
+
+    assert stream.connections == 2
+    assert subscriptions == [['005930', '000660'], ['005930', '000660']]
+    assert len(received) == 2 * frames_per_connection * len(stocks)
+    assert received[-1].current_price == 70000 + frames_per_connection - 1
+
+def test_stream_update_and_key_refresh():
+    """관심종목 변경 시 바뀐 종목만 등록/해제하고 접속키가 만료되면 새 접속키로 다시 접속하는지 테스트"""
+    from unittest.mock import patch
+    from aiohttp import web, WSMsgType
+
+    messages = []
+
+    async def ws_handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connection = len({message[0] for message in messages})
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                break
+            body = json.loads(msg.data)
+            messages.append((connection, body['header']['approval_key'],
+                             body['header']['tr_type'], body['body']['input']['tr_key']))
+        return ws
+
+    async def wait_for(condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/ws', ws_handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        stream = KisStream([{'code': '005930', 'name': '삼성전자'}], lambda ticks: None,
+                           url=f'http://127.0.0.1:{port}/ws', approval_key='old_key',
+                           reconnect_delay=0.01)
+
+        async def drive():
+            await wait_for(lambda: len(messages) == 1)
+            await stream.update([{'code': '000660', 'name': 'SK하이닉스'}])
+            # 접속키 만료 후 새 접속키로 다시 접속하여 바뀐 종목을 등록
+            await wait_for(lambda: len(messages) == 4)
+            stream.stop()
+
+        try:
+            with patch('kis_stream.APPROVAL_KEY_TTL', 0.5), \
+                    patch('kis_stream.get_approval_key', return_value='new_key'):
+                await asyncio.wait_for(asyncio.gather(stream.run(), drive()), timeout=10)
+        finally:
+            await runner.cleanup()
+        return stream
+
+    stream = asyncio.run(run())
+
+    assert stream.connections == 2
+    assert messages == [(0, 'old_key', '1', '005930'),
+                        (0, 'old_key', '2', '005930'),
+                        (0, 'old_key', '1', '000660'),
+                        (1, 'new_key', '1', '000660')]
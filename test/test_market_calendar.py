@@ -0,0 +1,71 @@
+import pytest
+import os,sys
+import datetime
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_calendar import MarketCalendar, MarketSessionTrigger, korea_tz
+
+
+def kst(*args):
+    return korea_tz.localize(datetime.datetime(*args))
+
+@pytest.fixture
+def calendar():
+    return MarketCalendar()
+
+def test_is_open_regular_session(calendar):
+    """정규장 시간 확인 테스트"""
+    assert calendar.is_open(kst(2025, 5, 2, 9, 0))
+    assert calendar.is_open(kst(2025, 5, 2, 15, 29, 59))
+    assert not calendar.is_open(kst(2025, 5, 2, 8, 59))
+    # 15:30 종가 단일가 분까지 포함
+    assert calendar.is_open(kst(2025, 5, 2, 15, 30))
+    assert calendar.is_open(kst(2025, 5, 2, 15, 30, 0, 500000))
+    assert not calendar.is_open(kst(2025, 5, 2, 15, 31))
+    assert calendar.session(kst(2025, 5, 2, 15, 30))[1] == kst(2025, 5, 2, 15, 30)
+    assert not calendar.is_open(kst(2025, 5, 3, 10, 0))  # 토요일
+
+def test_holidays_and_late_open(calendar):
+    """휴장일, 수능일, 연초 첫 거래일 테스트"""
+    assert not calendar.is_open(kst(2025, 5, 5, 10, 0))  # 어린이날
+    assert not calendar.is_open(kst(2025, 11, 13, 9, 30))  # 수능일 지연 개장
+    assert calendar.is_open(kst(2025, 11, 13, 16, 0))
+    assert not calendar.is_open(kst(2026, 1, 2, 9, 30))  # 연초 첫 거래일
+    assert calendar.is_open(kst(2026, 1, 2, 10, 0))
+
+def test_next_open(calendar):
+    """다음 개장 시각 테스트"""
+    # 금요일 장 종료 후 -> 어린이날 연휴(5/5, 5/6) 다음 날
+    assert calendar.next_open(kst(2025, 5, 2, 15, 30)) == kst(2025, 5, 7, 9, 0)
+    # 설 연휴 전
+    assert calendar.next_open(kst(2025, 1, 24, 16, 0)) == kst(2025, 1, 31, 9, 0)
+    # 개장 시각 당일 장 전
+    assert calendar.next_open(kst(2025, 5, 7, 7, 0)) == kst(2025, 5, 7, 9, 0)
+
+def test_naive_datetime_is_kst(calendar):
+    """timezone 이 없는 시각은 KST 로 처리하는지 테스트"""
+    assert calendar.is_open(datetime.datetime(2025, 5, 2, 10, 0))
+
+def test_trigger_skips_to_next_session(calendar):
+    """장 밖에서는 다음 개장 시각으로 건너뛰는지 테스트"""
+    trigger = MarketSessionTrigger(calendar, interval=60)
+
+    # 장중: 다음 분 정각
+    assert trigger.get_next_fire_time(None, kst(2025, 5, 2, 10, 0, 30)) == kst(2025, 5, 2, 10, 1)
+    assert trigger.get_next_fire_time(kst(2025, 5, 2, 10, 1), kst(2025, 5, 2, 10, 1, 0, 5)) \
+        == kst(2025, 5, 2, 10, 2)
+    # 폐장 시각(종가)에 마지막으로 한 번 실행
+    assert trigger.get_next_fire_time(kst(2025, 5, 2, 15, 29), kst(2025, 5, 2, 15, 29, 1)) \
+        == kst(2025, 5, 2, 15, 30)
+    # 마지막 실행 이후 -> 연휴 다음 개장
+    assert trigger.get_next_fire_time(kst(2025, 5, 2, 15, 30), kst(2025, 5, 2, 15, 30, 1)) \
+        == kst(2025, 5, 7, 9, 0)
+
+    # 짧은 간격도 폐장 분에는 15:30 한 번만 실행
+    trigger = MarketSessionTrigger(calendar, interval=5)
+    assert trigger.get_next_fire_time(kst(2025, 5, 2, 15, 29, 55), kst(2025, 5, 2, 15, 29, 56)) \
+        == kst(2025, 5, 2, 15, 30)
+    assert trigger.get_next_fire_time(kst(2025, 5, 2, 15, 30), kst(2025, 5, 2, 15, 30, 1)) \
+        == kst(2025, 5, 7, 9, 0)
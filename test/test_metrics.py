@@ -0,0 +1,59 @@
+import pytest
+import os,sys
+import datetime
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Histogram, Metrics
+
+
+def test_histogram_quantile():
+    """히스토그램 분위수 추정 테스트"""
+    histogram = Histogram((0.1, 0.2, 0.5))
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.05, 0.05, 0.15, 0.15, 0.3, 0.3, 0.3, 0.3, 0.4, 1.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 2, 5, 1]
+    assert histogram.count == 10
+    assert histogram.sum == pytest.approx(3.0)
+    assert 0.2 < histogram.quantile(0.5) <= 0.5
+    assert histogram.quantile(0.99) == 0.5
+
+def test_counters_and_labels():
+    """label 별 카운터, 게이지, 타이머 테스트"""
+    registry = Metrics()
+    registry.inc('kis_errors_total', tr_id='FHKST01010100', status=500, msg_cd='EGW00201')
+    registry.inc('kis_errors_total', tr_id='FHKST01010100', status='500', msg_cd='EGW00201')
+    registry.set('tick_last_seconds', 1.5)
+    with registry.timer('tick_seconds'):
+        pass
+
+    assert registry.get('kis_errors_total', tr_id='FHKST01010100', status=500,
+                        msg_cd='EGW00201') == 2
+    assert registry.get('tick_last_seconds') == 1.5
+    assert registry.histograms[('tick_seconds', ())].count == 1
+
+def test_render_and_points():
+    """/metrics 텍스트와 stock_monitor_internal 포인트 변환 테스트"""
+    registry = Metrics()
+    registry.inc('ticks_total')
+    registry.observe('kis_request_seconds', 0.03, tr_id='FHKST11300006')
+
+    text = registry.render()
+    assert '# TYPE stock_monitor_ticks_total counter' in text
+    assert 'stock_monitor_ticks_total 1' in text
+    assert 'stock_monitor_kis_request_seconds_bucket{tr_id="FHKST11300006",le="0.05"} 1' in text
+    assert 'stock_monitor_kis_request_seconds_count{tr_id="FHKST11300006"} 1' in text
+
+    lines = sorted(point.to_line_protocol() for point in registry.points())
+    assert lines[0].startswith('stock_monitor_internal,metric=kis_request_seconds,'
+                               'tr_id=FHKST11300006 count=1i,')
+    assert lines[1] == 'stock_monitor_internal,metric=ticks_total value=1'
+
+    # 틱 시각을 붙이면 스풀에서 재전송되어도 원래 시각으로 저장됨
+    t = datetime.datetime(2026, 10, 13, 0, 0, 1, tzinfo=datetime.timezone.utc)
+    lines = [point.to_line_protocol() for point in registry.points(time=t)]
+    assert all(line.endswith(f' {int(t.timestamp()) * 1000000000}') for line in lines)
@@ -0,0 +1,121 @@
+import pytest
+import os,sys
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poll_scheduler import PollScheduler
+
+INTERVALS = {'hot': 5, 'normal': 60, 'quiet': 300}
+
+
+def quote(price, change_rate=0.0, volume=1000):
+    return {'current_price': price, 'change_rate': change_rate, 'volume': volume}
+
+def make_stocks(n):
+    return [{'code': f'{i:06d}', 'name': f'종목{i}'} for i in range(n)]
+
+
+def test_new_codes_due_immediately():
+    """새 종목은 바로 조회되고 보통 등급 간격으로 다시 예약되는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stocks = make_stocks(3)
+    scheduler.sync(stocks)
+
+    assert scheduler.due(now=0) == stocks
+    assert scheduler.due(now=30) == []
+    assert scheduler.due(now=60) == stocks
+
+def test_budget_defers_oldest_first():
+    """예산을 넘는 종목은 밀렸다가 다음 틱에 먼저 조회되는지 테스트"""
+    scheduler = PollScheduler(INTERVALS, budget=2)
+    stocks = make_stocks(5)
+    scheduler.sync(stocks)
+
+    first = scheduler.due(now=0)
+    second = scheduler.due(now=5)
+    third = scheduler.due(now=10)
+    assert len(first) == len(second) == 2
+    assert len(third) == 1
+    assert {stock['code'] for stock in first + second + third} == \
+        {stock['code'] for stock in stocks}
+
+def test_hot_by_change_rate():
+    """등락률 변화가 큰 종목은 hot 으로 자주 조회되는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = make_stocks(1)[0]
+    scheduler.sync([stock])
+    scheduler.due(now=0)
+    assert scheduler.update(stock, quote(1000, 0.1), now=0) == 'normal'
+
+    scheduler.due(now=60)
+    assert scheduler.update(stock, quote(1010, 1.1, 2000), now=60) == 'hot'
+    assert scheduler.due(now=64) == []
+    assert scheduler.due(now=65) == [stock]
+
+def test_hot_by_large_move():
+    """등락률 절댓값이 크면 hot 인지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = make_stocks(1)[0]
+    scheduler.sync([stock])
+    assert scheduler.update(stock, quote(1080, 8.0), now=0) == 'hot'
+
+def test_hot_by_volume_acceleration():
+    """거래량 증가 속도가 평균보다 크게 늘면 hot 인지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = make_stocks(1)[0]
+    scheduler.sync([stock])
+    scheduler.update(stock, quote(1000, volume=1000), now=0)
+    scheduler.update(stock, quote(1000, volume=1600), now=60)
+    assert scheduler.update(stock, quote(1000, volume=2200), now=120) == 'normal'
+    assert scheduler.update(stock, quote(1000, volume=5000), now=180) == 'hot'
+
+def test_hot_hold_and_quiet_backoff():
+    """hot 은 일정 시간 유지된 뒤 풀리고, 변화가 없으면 quiet 로 물러나는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = make_stocks(1)[0]
+    scheduler.sync([stock])
+    scheduler.update(stock, quote(1000), now=0)
+    assert scheduler.update(stock, quote(1010, 1.0), now=5) == 'hot'
+    # 변화가 없어도 POLL_HOT_HOLD(60초) 동안 유지
+    assert scheduler.update(stock, quote(1010, 1.0), now=30) == 'hot'
+
+    tiers = [scheduler.update(stock, quote(1010, 1.0), now=now) for now in (70, 130, 190)]
+    assert tiers == ['normal', 'normal', 'quiet']
+    scheduler.due(now=190)
+    assert scheduler.due(now=400) == []
+    assert scheduler.due(now=490) == [stock]
+
+def test_pinned_tier():
+    """stocks.json 의 tier 로 등급을 고정하는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = {'code': '005930', 'name': '삼성전자', 'tier': 'hot'}
+    scheduler.sync([stock])
+    assert scheduler.update(stock, quote(1000), now=0) == 'hot'
+    assert scheduler.update(stock, quote(1000), now=5) == 'hot'
+    assert scheduler.tiers()['hot'] == 1
+
+def test_failed_result_keeps_tier():
+    """조회에 실패하면 등급을 유지한 채 다시 예약되는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stock = make_stocks(1)[0]
+    scheduler.sync([stock])
+    scheduler.due(now=0)
+    assert scheduler.update(stock, None, now=0) == 'normal'
+    assert scheduler.due(now=60) == [stock]
+
+def test_sync_removes_codes():
+    """관심종목에서 빠진 종목은 더 이상 조회되지 않는지 테스트"""
+    scheduler = PollScheduler(INTERVALS)
+    stocks = make_stocks(3)
+    scheduler.sync(stocks)
+    scheduler.sync(stocks[:1])
+
+    assert len(scheduler) == 1
+    assert scheduler.due(now=0) == stocks[:1]
+
+def test_budget_callable():
+    """예산을 함수로 줄 수 있는지 테스트"""
+    scheduler = PollScheduler(INTERVALS, budget=lambda: 1)
+    scheduler.sync(make_stocks(3))
+    assert len(scheduler.due(now=0)) == 1
@@ -0,0 +1,73 @@
+import pytest
+import os,sys
+import json
+import datetime
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quote import Quote, LineEncoder
+from influx_writer import build_point
+from market_calendar import korea_tz
+
+STOCK = {'code': '005930', 'name': '삼성전자'}
+
+
+def make_quote(code='005930', name='삼성전자', price=70000, change_rate=1.45):
+    return Quote(code, name, price, 1000, change_rate, 1000000, 70000000000, 69000, 70500, 68800)
+
+
+def test_quote_reads_like_dict():
+    """기존 코드가 쓰는 dict 방식 읽기와 dict 비교, JSON 변환이 되는지 테스트"""
+    quote = make_quote()
+    assert quote['current_price'] == 70000
+    assert quote.get('volume') == 1000000
+    assert quote.get('timestamp', 0) == 0
+    assert quote.get('items') is None
+    with pytest.raises(KeyError):
+        quote['keys']
+    assert 'change_rate' in quote
+    assert dict(quote) == quote.to_dict()
+    assert quote == dict(quote)
+    assert quote == make_quote()
+    assert quote != make_quote(price=70100)
+    assert json.loads(json.dumps(quote, default=dict))['stock_name'] == '삼성전자'
+
+    with pytest.raises(AttributeError):
+        quote.extra = 1
+
+def test_encoder_matches_point():
+    """인코더 출력이 build_point 의 line protocol 과 같은지 테스트 (이스케이프, 실수, 음수)"""
+    stocks = [STOCK, {'code': '000660', 'name': 'SK 하이닉스'}, {'code': '035720', 'name': 'a,b=c\\'},
+              {'code': '068270', 'name': ''}]
+    quotes = [make_quote(), make_quote(change_rate=-2.0), make_quote(change_rate=0.1 + 0.2),
+              make_quote(change_rate=0)]
+    pairs = list(zip(stocks, quotes))
+
+    expected = [build_point(stock, quote).to_line_protocol() for stock, quote in pairs]
+    encoder = LineEncoder()
+    assert encoder.encode(pairs).decode('utf-8') == '\n'.join(expected)
+    # 버퍼를 재사용해도 이전 내용이 남지 않음
+    assert encoder.encode(pairs[:1]).decode('utf-8') == expected[0]
+    assert encoder.encode([]) == b''
+
+def test_encoder_times_and_fallback():
+    """시각을 붙이고, dict 시세와 NaN 은 Point 로 직렬화하는지 테스트"""
+    t = korea_tz.localize(datetime.datetime(2026, 10, 13, 9, 0, 1, 250000))
+    pairs = [(STOCK, make_quote()), (STOCK, make_quote(change_rate=float('nan'))),
+             (STOCK, make_quote().to_dict())]
+
+    lines = LineEncoder().encode(pairs, [t, t, t]).decode('utf-8').splitlines()
+    expected = [build_point(stock, quote, time=t).to_line_protocol() for stock, quote in pairs]
+    assert lines == expected
+    assert lines[0].endswith(f' {int(t.timestamp()) * 1000000000 + 250000000}')
+    assert 'change_rate' not in lines[1]
+
+def test_encoder_single_time():
+    """모든 시세에 같은 틱 시각을 붙이는지 테스트"""
+    t = korea_tz.localize(datetime.datetime(2026, 10, 13, 9, 0, 1))
+    pairs = [(STOCK, make_quote()), ({'code': '000660', 'name': 'SK하이닉스'}, make_quote(code='000660')),
+             (STOCK, make_quote().to_dict())]
+
+    lines = LineEncoder().encode(pairs, t).decode('utf-8').splitlines()
+    assert lines == [build_point(stock, quote, time=t).to_line_protocol() for stock, quote in pairs]
@@ -0,0 +1,73 @@
+import pytest
+import os,sys
+import time
+import asyncio
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucket, AdaptiveRateLimiter
+
+
+def test_token_bucket_invalid_rate():
+    """잘못된 rate 테스트"""
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+def test_token_bucket_spacing():
+    """초당 요청 수 제한 테스트"""
+    bucket = TokenBucket(50)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(bucket.acquire() for _ in range(11)))
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # 첫 요청은 즉시, 나머지 10건은 1/50초 간격
+    assert 0.18 <= elapsed < 0.4
+
+def test_token_bucket_deadline():
+    """마감 시각 전에 토큰을 얻을 수 없으면 기다리지 않고 예약을 되돌리는지 테스트"""
+    bucket = TokenBucket(10)
+
+    async def run():
+        deadline = asyncio.get_running_loop().time() + 0.15
+        return await asyncio.gather(*(bucket.acquire(deadline) for _ in range(4)))
+
+    start = time.monotonic()
+    # 첫 요청은 즉시, 0.1초 뒤 한 건, 나머지는 마감 후라 거절
+    assert asyncio.run(run()) == [True, True, False, False]
+    assert time.monotonic() - start < 0.15
+    assert -1.1 < bucket._tokens < -0.9
+
+def test_adaptive_rate_increase():
+    """성공 시 초당 약 increase 만큼 증가하고 max_rate 를 넘지 않는지 테스트"""
+    limiter = AdaptiveRateLimiter(10, max_rate=12, increase=1)
+    for _ in range(10):
+        limiter.on_success()
+    assert 10.9 < limiter.rate < 11.0
+
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 12
+
+def test_adaptive_rate_decrease():
+    """초당 거래건수 초과 시 배율로 감소하고 1초에 한 번만 줄어드는지 테스트"""
+    limiter = AdaptiveRateLimiter(16, min_rate=3, decrease=0.5)
+    assert limiter.on_rate_limited() is True
+    assert limiter.rate == 8
+    # 같은 순간에 몰려 온 거부 응답은 한 번만 반영
+    assert limiter.on_rate_limited() is False
+    assert limiter.rate == 8
+
+    limiter._last_decrease -= 1
+    limiter.on_rate_limited()
+    limiter._last_decrease -= 1
+    limiter.on_rate_limited()
+    assert limiter.rate == 3
+
+def test_adaptive_rate_bounds():
+    """시작 속도가 범위를 벗어나면 범위 안으로 맞추는지 테스트"""
+    assert AdaptiveRateLimiter(100, max_rate=20).rate == 20
+    assert AdaptiveRateLimiter(0.5, min_rate=1, max_rate=20).rate == 1
@@ -0,0 +1,109 @@
+import pytest
+import os,sys
+import datetime
+from unittest.mock import patch
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_calendar import korea_tz
+from rollups import Rollups, bar_points, bucket_start
+
+STOCK = {'code': '005930', 'name': '삼성전자'}
+
+
+def kst(*args):
+    return korea_tz.localize(datetime.datetime(*args)).timestamp()
+
+def quote(price, volume, value, high=None, low=None, open_price=69000):
+    return {'current_price': price, 'volume': volume, 'trading_value': value,
+            'open_price': open_price, 'high_price': high or price, 'low_price': low or price}
+
+def bars_by_interval(bars):
+    return {interval: (start, fields) for interval, stock, start, fields in bars}
+
+
+def test_bucket_start():
+    """봉 시작 시각이 간격 경계와 KST 0시에 맞는지 테스트"""
+    ts = kst(2026, 10, 13, 9, 7, 42)
+    assert bucket_start('1m', ts) == kst(2026, 10, 13, 9, 7)
+    assert bucket_start('5m', ts) == kst(2026, 10, 13, 9, 5)
+    assert bucket_start('1d', ts) == kst(2026, 10, 13)
+
+def test_minute_bar_ohlcv():
+    """구간이 바뀌면 끝난 분봉을 내보내고 거래량, 거래대금은 누적값 증가분인지 테스트"""
+    rollups = Rollups(['1m'])
+    assert rollups.update([(STOCK, quote(70000, 1000, 10000))], kst(2026, 10, 13, 9, 0, 5)) == []
+    rollups.update([(STOCK, quote(70300, 1300, 13000, high=70300))], kst(2026, 10, 13, 9, 1, 5))
+    rollups.update([(STOCK, quote(70100, 1500, 15000, high=70300))], kst(2026, 10, 13, 9, 1, 35))
+    bars = rollups.update([(STOCK, quote(70200, 1600, 16000, high=70300))], kst(2026, 10, 13, 9, 2, 5))
+
+    assert len(bars) == 1
+    interval, stock, start, fields = bars[0]
+    assert (interval, stock, start) == ('1m', STOCK, kst(2026, 10, 13, 9, 1))
+    assert fields == {'open': 70300, 'high': 70300, 'low': 70100, 'close': 70100,
+                      'volume': 500, 'trading_value': 5000}
+
+def test_intraday_extremes_from_day_high_low():
+    """조회 사이에 당일 고가/저가가 바뀌면 분봉 고가/저가에 반영하는지 테스트"""
+    rollups = Rollups(['5m'])
+    rollups.update([(STOCK, quote(70000, 1000, 0, high=70000, low=69500))], kst(2026, 10, 13, 9, 4))
+    rollups.update([(STOCK, quote(70100, 1100, 0, high=70800, low=69500))], kst(2026, 10, 13, 9, 5))
+    bars = rollups.update([(STOCK, quote(70000, 1200, 0, high=70800, low=69000))],
+                          kst(2026, 10, 13, 9, 10))
+
+    start, fields = bars_by_interval(bars)['5m']
+    assert start == kst(2026, 10, 13, 9, 5)
+    # 고점 70800 은 09:04 ~ 09:05 사이에 생겨 09:05 봉에 반영, 저점 69000 은 다음 봉
+    assert fields['high'] == 70800
+    assert fields['low'] == 70100
+    assert fields['volume'] == 100
+
+def test_daily_bar_uses_day_fields():
+    """일봉은 KIS 당일 시가, 고가, 저가, 누적 거래량을 그대로 쓰는지 테스트"""
+    rollups = Rollups(['1d'])
+    rollups.update([(STOCK, quote(70000, 5000, 350000, high=71000, low=68500))],
+                   kst(2026, 10, 13, 15, 29))
+    bars = rollups.update([(STOCK, quote(70500, 100, 7000))], kst(2026, 10, 14, 9, 0))
+
+    start, fields = bars_by_interval(bars)['1d']
+    assert start == kst(2026, 10, 13)
+    assert fields == {'open': 69000, 'high': 71000, 'low': 68500, 'close': 70000,
+                      'volume': 5000, 'trading_value': 350000}
+
+def test_new_day_counts_from_zero():
+    """새 거래일 첫 분봉의 거래량은 누적값 전체(동시호가 포함)인지 테스트"""
+    rollups = Rollups(['1m'])
+    rollups.update([(STOCK, quote(70000, 5000, 0))], kst(2026, 10, 13, 15, 29))
+    rollups.flush()
+    rollups.update([(STOCK, quote(70500, 800, 0))], kst(2026, 10, 14, 9, 0, 2))
+    bars = rollups.flush()
+    assert bars[0][3]['volume'] == 800
+
+def test_flush_and_retain():
+    """flush 는 진행 중인 봉을 모두 내보내고 retain 은 빠진 종목 상태를 버리는지 테스트"""
+    other = {'code': '000660', 'name': 'SK하이닉스'}
+    rollups = Rollups()
+    rollups.update([(STOCK, quote(70000, 1000, 0)), (other, quote(180000, 10, 0))],
+                   kst(2026, 10, 13, 15, 29, 1))
+    bars = rollups.flush()
+    assert sorted((interval, stock['code']) for interval, stock, _, _ in bars) == \
+        sorted((interval, code) for interval in ('1m', '5m', '1d') for code in ('005930', '000660'))
+    assert rollups.flush() == []
+
+    rollups.retain({'005930'})
+    assert set(rollups.last) == {'005930'}
+
+def test_bar_points_buckets():
+    """봉마다 지정한 bucket 과 측정값 이름, 봉 시작 시각으로 변환하는지 테스트"""
+    rollups = Rollups()
+    rollups.update([(STOCK, quote(70000, 1000, 0))], kst(2026, 10, 13, 9, 3))
+    bars = rollups.flush()
+
+    with patch.dict(os.environ, {'ROLLUP_BUCKET_1D': 'stock_daily'}):
+        by_bucket = bar_points(bars)
+    assert [point.to_line_protocol().split(',')[0] for point in by_bucket[None]] == \
+        ['stock_bar_1m', 'stock_bar_5m']
+    daily = by_bucket['stock_daily'][0].to_line_protocol()
+    assert daily.startswith('stock_bar_1d,code=005930')
+    assert daily.endswith(str(int(kst(2026, 10, 13))) + '000000000')
@@ -0,0 +1,212 @@
+import pytest
+import os,sys
+import json
+import asyncio
+import threading
+
+# 상위 디렉토리와 벤치마크 대역 서버를 시스템 경로에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'bench'))
+
+from state_store import close_stores
+from kis_api import KisAccount, KisClient
+from sharding import HashRing, ShardRouter, merge_coverage, load_accounts, load_router, main
+from fake_servers import FakeKis, build_app
+
+STOCKS = [{'code': f'{100000 + i:06d}', 'name': f'종목{i}'} for i in range(300)]
+
+
+@pytest.fixture(autouse=True)
+def setup_env():
+    os.environ['CONFIG_DIR'] = 'test_config'
+    os.makedirs('test_config', exist_ok=True)
+    yield
+    close_stores()
+    for name in os.listdir('test_config'):
+        os.remove(os.path.join('test_config', name))
+    os.rmdir('test_config')
+
+
+@pytest.fixture
+def fake_kis():
+    """별도 스레드의 이벤트 루프에서 KIS 대역 서버 3개를 실행 (앱키 3개 흉내)"""
+    from aiohttp import web
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        servers = []
+        for seed in range(3):
+            kis = FakeKis(latency=0, jitter=0, rate_limit=0, seed=seed)
+            runner = web.AppRunner(build_app(kis), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            servers.append((kis, runner, f'http://127.0.0.1:{port}'))
+        return servers
+
+    servers = asyncio.run_coroutine_threadsafe(start(), loop).result(10)
+    yield [(kis, url) for kis, _, url in servers]
+
+    async def stop():
+        for _, runner, _ in servers:
+            await runner.cleanup()
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_hash_ring_balance():
+    """종목이 노드마다 고르게 나뉘는지 테스트"""
+    ring = HashRing(['a', 'b', 'c', 'd'])
+    groups = ring.assign(STOCKS)
+    sizes = [len(group) for group in groups.values()]
+    assert sum(sizes) == len(STOCKS)
+    assert min(sizes) > len(STOCKS) / 4 * 0.6
+    assert max(sizes) < len(STOCKS) / 4 * 1.4
+
+def test_hash_ring_add_node_moves_few():
+    """노드를 추가하면 약 1/N 만 새 노드로 옮겨지는지 테스트"""
+    stocks = [{'code': f'{i:06d}'} for i in range(2000)]
+    before = HashRing(['a', 'b', 'c', 'd'])
+    after = HashRing(['a', 'b', 'c', 'd', 'e'])
+
+    moved = [stock['code'] for stock in stocks
+             if before.node_for(stock['code']) != after.node_for(stock['code'])]
+    assert 0.12 < len(moved) / len(stocks) < 0.28
+    # 옮겨진 종목은 모두 새 노드로 감
+    assert all(after.node_for(code) == 'e' for code in moved)
+
+def test_hash_ring_empty():
+    """노드가 없으면 오류"""
+    with pytest.raises(ValueError):
+        HashRing([])
+
+def test_router_owned_disjoint():
+    """워커마다 겹치지 않게 전체 종목을 나누어 맡는지 테스트"""
+    workers = ['w1', 'w2', 'w3']
+    owned = [ShardRouter(workers=workers, worker=worker).owned(STOCKS) for worker in workers]
+
+    codes = [stock['code'] for group in owned for stock in group]
+    assert sorted(codes) == sorted(stock['code'] for stock in STOCKS)
+    assert len(set(codes)) == len(codes)
+
+def test_router_unknown_worker():
+    """SHARD_WORKER 가 워커 목록에 없으면 오류"""
+    with pytest.raises(ValueError):
+        ShardRouter(workers=['w1', 'w2'], worker='w3')
+
+def test_sharded_fetch(fake_kis, monkeypatch):
+    """앱키별 대역 서버로 나누어 조회하고 커버리지를 보고하는지 테스트"""
+    monkeypatch.setattr('kis_api.KIS_RATE_LIMIT', 500)
+    monkeypatch.setattr('kis_api.KIS_RATE_MAX', 500)
+    accounts = [KisAccount(f'key{i}', f'app{i}', f'secret{i}', url)
+                for i, (_, url) in enumerate(fake_kis)]
+    client = KisClient()
+    reports = []
+    try:
+        for multi in (False, True):
+            for kis, _ in fake_kis:
+                kis.reset()
+            routers = [ShardRouter(accounts, ['w1', 'w2'], worker, multi=multi)
+                       for worker in ('w1', 'w2')]
+            reports = []
+            for router in routers:
+                owned = router.owned(STOCKS)
+                results = client.run(router.fetch(owned, client=client))
+                assert [result['stock_code'] for result in results] == \
+                    [stock['code'] for stock in owned]
+                reports.append(router.coverage(STOCKS))
+
+            # 앱키(대역 서버)마다 자기 몫의 종목만 조회
+            assigned = routers[0].account_ring.assign(STOCKS)
+            for (kis, _), account in zip(fake_kis, accounts):
+                assert kis.quotes == len(assigned[account.name])
+                assert kis.quotes > 0
+    finally:
+        client.close()
+
+    report = reports[0]
+    assert report['worker'] == 'w1'
+    assert report['total'] == len(STOCKS)
+    assert report['covered'] == report['owned']
+    assert sum(shard['codes'] for shard in report['shards']) == report['owned']
+    assert all(shard['failed'] == 0 for shard in report['shards'])
+
+    merged = merge_coverage(reports)
+    assert merged['owned'] == len(STOCKS)
+    assert merged['covered'] == len(STOCKS)
+    assert merged['ratio'] == 1.0
+    assert merged['unreported'] == []
+
+def test_merge_coverage_unreported():
+    """보고하지 않은 워커와 누락 종목을 찾는지 테스트"""
+    report = {'worker': 'w1', 'workers': {'w1': 150, 'w2': 150}, 'total': 300,
+              'owned': 150, 'covered': 149, 'missing': ['100001'], 'shards': [],
+              'updated_at': 1.0}
+    merged = merge_coverage([report])
+    assert merged['covered'] == 149
+    assert merged['unreported'] == ['w2']
+    assert merged['missing'] == ['100001']
+    assert merged['ratio'] == pytest.approx(149 / 300)
+
+def test_coverage_cli(capsys):
+    """워커들의 /shards 보고를 모아 합친 커버리지를 출력하는지 테스트"""
+    from aiohttp import web
+
+    report = {'worker': 'w1', 'workers': {'w1': 150, 'w2': 150}, 'total': 300,
+              'owned': 150, 'covered': 150, 'missing': [], 'shards': [], 'updated_at': 1.0}
+
+    async def shards(request):
+        return web.json_response(report)
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        app = web.Application()
+        app.router.add_get('/shards', shards)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = asyncio.run_coroutine_threadsafe(start(), loop).result(10)
+    try:
+        # w2 는 응답하지 않음 (닫힌 포트)
+        code = main(['--workers', f'http://127.0.0.1:{port},http://127.0.0.1:1', '--timeout', '2'])
+        merged = json.loads(capsys.readouterr().out)
+        assert code == 1
+        assert merged['covered'] == 150
+        assert merged['unreported'] == ['w2']
+
+        report['workers'] = {'w1': 300}
+        report['owned'] = report['covered'] = 300
+        assert main(['--workers', f'http://127.0.0.1:{port}/']) == 0
+        assert json.loads(capsys.readouterr().out)['ratio'] == 1.0
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+def test_load_router(monkeypatch):
+    """설정이 없으면 샤딩을 사용하지 않는지 테스트"""
+    monkeypatch.delenv('SHARD_WORKERS', raising=False)
+    assert load_router() is None
+
+    with open('test_config/shards.json', 'w', encoding='utf-8') as f:
+        f.write('[{"name": "key1", "app_key": "a", "app_secret": "b"}]')
+    assert [account.name for account in load_accounts()] == ['key1']
+
+    monkeypatch.setenv('SHARD_WORKERS', 'w1,w2')
+    monkeypatch.setenv('SHARD_WORKER', 'w2')
+    router = load_router()
+    assert router.worker == 'w2'
+    assert list(router.accounts) == ['key1']
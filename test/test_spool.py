@@ -0,0 +1,79 @@
+import pytest
+import os,sys
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spool import Spool
+from metrics import registry
+
+
+def make_lines(start, count):
+    return '\n'.join(f'stock_price,code={i:06d} current_price={i}i'
+                     for i in range(start, start + count))
+
+def test_append_and_replay(tmp_path):
+    """스풀 저장 후 재전송 테스트"""
+    spool = Spool(directory=str(tmp_path), segment_bytes=200, fsync_interval=0)
+    spool.append(make_lines(0, 5).encode('utf-8'))
+    spool.append(make_lines(5, 5))
+    assert spool.spooled == 10
+    assert len(os.listdir(tmp_path)) > 1  # 세그먼트 분할
+
+    written = []
+    count = spool.replay(lambda data: written.append(data))
+
+    assert count == 10
+    assert spool.replayed == 10
+    assert b''.join(written).decode('utf-8').splitlines() == make_lines(0, 10).splitlines()
+    assert spool.pending_bytes() == 0
+    assert os.listdir(tmp_path) == []
+
+def test_replay_failure_keeps_segments(tmp_path):
+    """재전송 실패 시 세그먼트를 보존하는지 테스트"""
+    spool = Spool(directory=str(tmp_path))
+    spool.append(make_lines(0, 3))
+
+    def fail(data):
+        raise ConnectionError('influxdb down')
+
+    assert spool.replay(fail) == 0
+    assert spool.pending_bytes() > 0
+
+    # 재시작 후에도 남아 있는 세그먼트를 재전송
+    spool.close()
+    restarted = Spool(directory=str(tmp_path))
+    written = []
+    assert restarted.replay(lambda data: written.append(data)) == 3
+    restarted.append(make_lines(3, 1))
+    assert sorted(os.listdir(tmp_path)) == ['000000000001.lp']
+
+def test_evict_oldest_segment(tmp_path):
+    """용량 초과 시 오래된 세그먼트 삭제 테스트"""
+    spool = Spool(directory=str(tmp_path), segment_bytes=100, max_bytes=250)
+    for i in range(10):
+        spool.append(make_lines(i * 2, 2))
+
+    assert spool.pending_bytes() <= 250 + 100
+    assert spool.evicted > 0
+    written = []
+    spool.replay(lambda data: written.append(data))
+    lines = b''.join(written).decode('utf-8').splitlines()
+    # 가장 최근 데이터는 남아 있어야 함
+    assert lines[-1] == make_lines(19, 1)
+    assert len(lines) + spool.evicted == 20
+
+def test_counters_exported(tmp_path):
+    """스풀 카운터가 자체 모니터링 지표(/metrics)로 나가는지 테스트"""
+    registry.reset()
+    spool = Spool(directory=str(tmp_path), segment_bytes=100, max_bytes=150, fsync_interval=0)
+    spool.append(make_lines(0, 3))
+    spool.append(make_lines(3, 3))
+    spool.append(make_lines(6, 3))
+    assert registry.get('spool_points_total', result='spooled') == 9
+    assert registry.get('spool_points_total', result='evicted') == spool.evicted > 0
+
+    spool.replay(lambda data: None)
+    assert registry.get('spool_points_total', result='replayed') == spool.replayed
+    assert registry.get('spool_pending_bytes') == 0
+    assert 'stock_monitor_spool_points_total{result="spooled"} 9' in registry.render()
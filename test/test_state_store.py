@@ -0,0 +1,89 @@
+import pytest
+import os,sys
+import json
+from datetime import datetime
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from state_store import StateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = StateStore(str(tmp_path / 'state.db'))
+    yield store
+    store.close()
+
+def test_token_upsert(store):
+    """토큰을 덮어써서 저장하는지 테스트"""
+    assert store.load_token() is None
+
+    for i in range(3):
+        store.save_token(f'token{i}', datetime(2025, 1, 1, 9, i))
+
+    assert store.load_token() == ('token2', datetime(2025, 1, 1, 9, 2))
+    count = store._conn.execute("SELECT COUNT(*) FROM kv WHERE key = 'token'").fetchone()[0]
+    assert count == 1
+
+def test_stocks_upsert(store):
+    """관심종목 upsert 및 빠진 종목 삭제 테스트"""
+    store.save_stocks([{"name": "삼성전자", "code": "005930"},
+                       {"name": "SK하이닉스", "code": "000660"}])
+    store.save_stocks([{"name": "NAVER", "code": "035420"},
+                       {"name": "삼성전자", "code": "005930"}])
+
+    assert store.load_stocks() == [{"name": "NAVER", "code": "035420"},
+                                   {"name": "삼성전자", "code": "005930"}]
+
+def test_stocks_version(store):
+    """관심종목을 저장할 때마다 버전이 바뀌는지 테스트"""
+    assert store.stocks_version() == (0, 0)
+    store.save_stocks([{"name": "삼성전자", "code": "005930"}])
+    assert store.stocks_version() == (1, 1)
+    store.save_stocks([{"name": "NAVER", "code": "035420"}])
+    assert store.stocks_version() == (2, 1)
+
+def test_quotes_and_spool_offsets(store):
+    """마지막 시세, 스풀 위치 저장 테스트"""
+    store.save_quotes([({'code': '005930'}, {'current_price': 70000})])
+    store.save_quotes([({'code': '005930'}, {'current_price': 70100})])
+    assert store.load_quotes() == {'005930': {'current_price': 70100}}
+
+    assert store.get_spool_offset('influx') is None
+    store.set_spool_offset('influx', 12)
+    assert store.get_spool_offset('influx') == 12
+
+def test_migrate_tinydb(tmp_path):
+    """TinyDB 파일을 한 번만 옮겨 오는지 테스트"""
+    legacy = {
+        "_default": {},
+        "token": {
+            "1": {"access_token": "old", "issued_time": "2025-01-01T08:00:00"},
+            "2": {"access_token": "new", "issued_time": "2025-01-02T08:00:00"}
+        },
+        "stocks": {"1": {"name": "삼성전자", "code": "005930"}}
+    }
+    with open(tmp_path / 'db.json', 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.load_token() == ('new', datetime(2025, 1, 2, 8, 0))
+    assert store.load_stocks() == [{"name": "삼성전자", "code": "005930"}]
+
+    # 이전 후 저장한 값은 다시 열어도 덮어쓰지 않음
+    store.save_stocks([])
+    store.close()
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.load_stocks() == []
+    store.close()
+
+def test_migrate_empty_file(tmp_path, caplog):
+    """빈 TinyDB 파일은 오류 없이 이전한 것으로 기록하는지 테스트"""
+    (tmp_path / 'db.json').write_bytes(b'')
+
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get('migrated_from') == str(tmp_path / 'db.json')
+    assert store.load_stocks() == []
+    store.close()
+    assert not [record for record in caplog.records if record.levelname == 'ERROR']
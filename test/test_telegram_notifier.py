@@ -0,0 +1,86 @@
+import pytest
+import os,sys
+import json
+import time
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import Alert
+from telegram_notifier import TelegramNotifier
+
+
+# 텔레그램 Bot API 대체 서버
+@pytest.fixture
+def bot_server():
+    messages = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                params = json.loads(body)
+            else:
+                params = {key: values[0] for key, values in parse_qs(body).items()}
+            messages.append((self.path, params))
+
+            response = json.dumps({'ok': True, 'result': {
+                'message_id': len(messages),
+                'date': int(time.time()),
+                'chat': {'id': int(params['chat_id']), 'type': 'private'},
+                'text': params['text']
+            }}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/bot', messages
+    server.shutdown()
+    server.server_close()
+
+def make_alert(i):
+    return Alert('급등', f'{i:06d}', f'종목{i}', 6.0, f'[급등] 종목{i}({i:06d})')
+
+def test_submit_is_non_blocking_and_coalesces(bot_server):
+    """알림이 모아서 한 번에 전송되는지 테스트"""
+    base_url, messages = bot_server
+    notifier = TelegramNotifier(token='123:abc', chat_id='42', base_url=base_url,
+                                rate=10, coalesce=0.3)
+
+    start = time.perf_counter()
+    notifier.submit([make_alert(i) for i in range(5)])
+    assert time.perf_counter() - start < 0.05
+    notifier.close()
+
+    assert notifier.sent == 1
+    assert len(messages) == 1
+    path, params = messages[0]
+    assert path == '/bot123:abc/sendMessage'
+    assert params['text'].splitlines() == [f'[급등] 종목{i}({i:06d})' for i in range(5)]
+
+def test_rate_limited_sends(bot_server):
+    """연속 알림이 전송 속도 제한을 지키는지 테스트"""
+    base_url, messages = bot_server
+    notifier = TelegramNotifier(token='123:abc', chat_id='42', base_url=base_url,
+                                rate=20, coalesce=0)
+
+    start = time.perf_counter()
+    for i in range(5):
+        notifier.submit([make_alert(i)])
+        time.sleep(0.01)
+    notifier.close()
+
+    assert notifier.sent == len(messages)
+    assert sum(len(params['text'].splitlines()) for _, params in messages) == 5
+    assert time.perf_counter() - start >= (notifier.sent - 1) / 20
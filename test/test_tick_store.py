@@ -0,0 +1,60 @@
+import pytest
+import os,sys
+import numpy as np
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tick_store import TickStore
+
+
+def make_result(price, volume=0):
+    return {'current_price': price, 'change_rate': price / 1000, 'volume': volume}
+
+def test_append_and_window():
+    """추가 및 최근 구간 조회 테스트"""
+    store = TickStore(max_codes=4, capacity=5)
+    for i in range(3):
+        store.append('005930', make_result(100 + i), timestamp=i)
+
+    window = store.window('005930', 'current_price')
+    assert window.tolist() == [100, 101, 102]
+    assert store.window('005930', 'timestamp', 2).tolist() == [1000, 2000]
+    assert store.window('000660', 'current_price').size == 0
+
+def test_window_wraps_without_copy():
+    """링 버퍼가 한 바퀴 돈 뒤에도 연속 view 를 반환하는지 테스트"""
+    store = TickStore(max_codes=2, capacity=4)
+    for i in range(10):
+        store.append('005930', make_result(i), timestamp=i)
+
+    window = store.window('005930', 'current_price')
+    assert window.tolist() == [6, 7, 8, 9]
+    assert np.shares_memory(window, store.arrays['current_price'])
+    assert not window.flags.writeable
+    assert store.latest('005930')['current_price'] == 9
+
+def test_grows_past_max_codes():
+    """처음 할당한 종목 수를 넘으면 기존 기록을 유지한 채 두 배로 늘리는지 테스트"""
+    store = TickStore(max_codes=2, capacity=4)
+    nbytes = store.nbytes
+    for i in range(3):
+        store.append('000001', make_result(10 + i), timestamp=i)
+    for code in ('000002', '000003'):
+        store.append(code, make_result(1))
+
+    assert set(store.index) == {'000001', '000002', '000003'}
+    assert store.max_codes == 4
+    assert store.nbytes == nbytes * 2
+    assert store.window('000001', 'current_price').tolist() == [10, 11, 12]
+    assert store.latest('000003')['current_price'] == 1
+    assert store.column('current_price').tolist() == [12, 1, 1]
+
+def test_column():
+    """전체 종목 최근 값 조회 테스트"""
+    store = TickStore(max_codes=4, capacity=3)
+    store.append('000001', make_result(10))
+    store.append('000002', make_result(20))
+    store.append('000001', make_result(11))
+
+    assert store.column('current_price').tolist() == [11, 20]
@@ -0,0 +1,100 @@
+import pytest
+import os,sys
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_manager import TokenManager
+
+
+def test_get_issues_once_and_caches():
+    """토큰을 한 번만 발급하고 메모리에서 재사용하는지 테스트"""
+    issue = MagicMock(return_value='new_token')
+    save = MagicMock()
+    manager = TokenManager(issue, load=lambda: None, save=save)
+
+    assert manager.get() == 'new_token'
+    assert manager.get() == 'new_token'
+    issue.assert_called_once()
+    save.assert_called_once_with('new_token')
+
+def test_get_restores_saved_token():
+    """저장소에 유효한 토큰이 있으면 재발급하지 않는지 테스트"""
+    issue = MagicMock(return_value='new_token')
+    load = MagicMock(return_value=('saved_token', datetime.now() - timedelta(hours=1)))
+    manager = TokenManager(issue, load=load)
+
+    assert manager.get() == 'saved_token'
+    assert manager.get() == 'saved_token'
+    issue.assert_not_called()
+    load.assert_called_once()
+
+def test_get_refreshes_before_expiry():
+    """만료 여유 시간 안에 들어온 토큰은 미리 갱신하는지 테스트"""
+    issue = MagicMock(return_value='new_token')
+    load = MagicMock(return_value=('old_token', datetime.now() - timedelta(hours=22, minutes=30)))
+    manager = TokenManager(issue, load=load)
+
+    assert manager.get() == 'new_token'
+    issue.assert_called_once()
+
+def test_invalidate():
+    """토큰 무효화 후 재발급 테스트"""
+    issue = MagicMock(side_effect=['token_1', 'token_2'])
+    manager = TokenManager(issue)
+
+    assert manager.get() == 'token_1'
+    manager.invalidate()
+    assert manager.get() == 'token_2'
+
+def test_single_flight():
+    """동시 호출 시 발급이 한 번만 일어나는지 테스트"""
+    calls = []
+
+    def issue():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'new_token'
+
+    manager = TokenManager(issue)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get()))
+               for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ['new_token'] * 10
+
+def test_get_async_does_not_block_loop():
+    """재발급 중에도 이벤트 루프가 멈추지 않고 발급은 한 번만 하는지 테스트"""
+    import asyncio
+
+    def issue():
+        time.sleep(0.2)
+        return 'new_token'
+
+    issue_mock = MagicMock(side_effect=issue)
+    manager = TokenManager(issue_mock)
+    ticks = []
+
+    async def heartbeat():
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        return await asyncio.gather(heartbeat(), *(manager.get_async() for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert results[1:] == ['new_token'] * 5
+    issue_mock.assert_called_once()
+    # 발급이 끝나기 전에 다른 코루틴이 계속 실행됨
+    assert ticks[-1] - ticks[0] < 0.2
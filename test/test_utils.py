@@ -3,11 +3,11 @@ import os,sys
 import json
 from datetime import datetime
 from unittest.mock import patch, MagicMock
-from tinydb import TinyDB, Query
 
 # 상위 디렉토리를 시스템 경로에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from state_store import StateStore, close_stores
 from utils import load_stocks, save_stocks, get_stock_by_code
 
 # 테스트용 환경 변수 설정
@@ -18,10 +18,10 @@ def setup_env():
     os.makedirs('test_config', exist_ok=True)
     yield
     # 테스트 후 정리
-    if os.path.exists('test_config/stocks.json'):
-        os.remove('test_config/stocks.json')
-    if os.path.exists('test_config/db.json'):
-        os.remove('test_config/db.json')
+    close_stores()
+    for name in ('stocks.json', 'state.db', 'state.db-wal', 'state.db-shm'):
+        if os.path.exists(os.path.join('test_config', name)):
+            os.remove(os.path.join('test_config', name))
     if os.path.exists('test_config'):
         os.rmdir('test_config')
 
@@ -46,13 +46,12 @@ def test_load_stocks_from_json(sample_stocks):
     
     assert result == sample_stocks
 
-def test_load_stocks_from_tinydb(sample_stocks):
-    """TinyDB에서 주식 데이터 로드 테스트"""
-    # TinyDB에 데이터 저장
-    db = TinyDB('test_config/db.json')
-    stocks_table = db.table('stocks')
-    stocks_table.insert_multiple(sample_stocks)
-    db.close()
+def test_load_stocks_from_state_store(sample_stocks):
+    """상태 저장소에서 주식 데이터 로드 테스트"""
+    # 상태 저장소에 데이터 저장
+    store = StateStore('test_config/state.db')
+    store.save_stocks(sample_stocks)
+    store.close()
     
     # 데이터 로드
     result = load_stocks()
@@ -0,0 +1,87 @@
+import pytest
+import os,sys
+import json
+
+# 상위 디렉토리를 시스템 경로에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watchlist import Watchlist
+
+
+def write_stocks(path, stocks):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stocks, f, ensure_ascii=False)
+
+@pytest.fixture
+def stocks_path(tmp_path):
+    path = tmp_path / 'stocks.json'
+    write_stocks(path, [{"name": "삼성전자", "code": "005930"},
+                        {"name": "SK하이닉스", "code": "000660"}])
+    return str(path)
+
+def counting_loader(path):
+    calls = []
+    def load():
+        calls.append(1)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return load, calls
+
+def test_lookup_and_cache(stocks_path):
+    """색인 조회 및 파일이 그대로면 다시 읽지 않는지 테스트"""
+    load, calls = counting_loader(stocks_path)
+    watchlist = Watchlist(stocks_path, load)
+
+    assert watchlist.get("005930")["name"] == "삼성전자"
+    assert watchlist.get_by_name("SK하이닉스")["code"] == "000660"
+    assert watchlist.get("999999") is None
+
+    snapshot = watchlist.snapshot()
+    assert watchlist.snapshot() is snapshot
+    assert len(calls) == 1
+
+def test_reload_on_change(stocks_path):
+    """파일이 바뀌면 다음 스냅샷에 반영되는지 테스트"""
+    load, calls = counting_loader(stocks_path)
+    watchlist = Watchlist(stocks_path, load)
+    before = watchlist.snapshot()
+
+    # 다른 파일로 교체 (inode 변경)
+    new_path = stocks_path + '.tmp'
+    write_stocks(new_path, [{"name": "NAVER", "code": "035420"}])
+    os.replace(new_path, stocks_path)
+
+    after = watchlist.snapshot()
+    assert after.version == before.version + 1
+    assert [stock['code'] for stock in after.stocks] == ["035420"]
+    assert watchlist.get("005930") is None
+    # 이전 스냅샷은 그대로 유지
+    assert before.by_code["005930"]["name"] == "삼성전자"
+    assert len(calls) == 2
+
+def test_reload_from_state_store(tmp_path, monkeypatch):
+    """stocks.json 이 없으면 상태 저장소의 관심종목이 바뀔 때 다시 읽는지 테스트"""
+    from state_store import default_store, close_stores
+    from utils import load_stocks
+
+    monkeypatch.setenv('CONFIG_DIR', str(tmp_path))
+    calls = []
+
+    def load():
+        calls.append(1)
+        return load_stocks()
+
+    try:
+        store = default_store()
+        store.save_stocks([{"name": "삼성전자", "code": "005930"}])
+        watchlist = Watchlist(load=load)
+        assert [stock['code'] for stock in watchlist.snapshot().stocks] == ["005930"]
+        watchlist.snapshot()
+        assert len(calls) == 1
+
+        # 종목 수가 같아도 저장할 때마다 다시 읽음
+        store.save_stocks([{"name": "NAVER", "code": "035420"}])
+        assert [stock['code'] for stock in watchlist.snapshot().stocks] == ["035420"]
+        assert len(calls) == 2
+    finally:
+        close_stores()
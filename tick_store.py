@@ -0,0 +1,158 @@
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 필드별 저장 타입 (timestamp 는 epoch ms)
+FIELD_DTYPES = {
+    'timestamp': np.int64,
+    'current_price': np.int32,
+    'price_diff': np.int32,
+    'change_rate': np.float32,
+    'volume': np.int64,
+    'trading_value': np.int64,
+    'open_price': np.int32,
+    'high_price': np.int32,
+    'low_price': np.int32,
+}
+
+
+# -------------------------------------------------
+def grow_rows(array, rows, fill=0):
+    """
+    array 의 첫 번째 축을 rows 행으로 늘린 새 배열을 반환합니다. (기존 행은 복사, 새 행은 fill)
+    종목별 행을 미리 할당하는 TickStore, IndicatorEngine, AlertEngine 이 종목이 늘 때 사용합니다.
+    """
+    grown = np.full((rows,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+# -------------------------------------------------
+class TickStore:
+    """
+    종목별 최근 시세를 보관하는 NumPy 링 버퍼.
+    필드마다 (max_codes, 2 * capacity) 배열을 미리 할당하고 같은 값을 두 칸에 기록하여
+    최근 n 개 구간을 항상 복사 없이 연속된 view 로 꺼낼 수 있습니다.
+    종목이 max_codes 를 넘으면 행을 두 배로 늘리므로 관심종목이 많아도 빠지는 종목이 없습니다. (nbytes 참고)
+
+    Args:
+        max_codes (int): 처음 할당할 종목 수 (넘으면 두 배씩 늘림)
+        capacity (int): 종목별 보관할 최근 시세 수
+    """
+
+    def __init__(self, max_codes=None, capacity=None):
+        self.max_codes = max_codes or int(os.getenv('TICK_STORE_MAX_CODES', '256'))
+        self.capacity = capacity or int(os.getenv('TICK_STORE_CAPACITY', '390'))
+
+        self.arrays = {field: np.zeros((self.max_codes, 2 * self.capacity), dtype=dtype)
+                       for field, dtype in FIELD_DTYPES.items()}
+        self.pos = np.zeros(self.max_codes, dtype=np.int64)
+        self.count = np.zeros(self.max_codes, dtype=np.int64)
+        self.index = {}
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays.values()) + \
+            self.pos.nbytes + self.count.nbytes
+
+    def row(self, code):
+        """종목코드의 행 번호를 반환합니다. 처음 보는 종목이면 새 행을 할당합니다. (가득 차면 배열을 늘림)"""
+        row = self.index.get(code)
+        if row is None:
+            with self._lock:
+                row = self.index.get(code)
+                if row is None:
+                    if len(self.index) >= self.max_codes:
+                        self._grow()
+                    row = len(self.index)
+                    self.index[code] = row
+        return row
+
+    def _grow(self):
+        # 새 배열을 다 만든 뒤 교체하므로 조회 API 스레드는 이전 배열이나 새 배열 중 하나를 읽음
+        n = self.max_codes * 2
+        self.arrays = {field: grow_rows(array, n) for field, array in self.arrays.items()}
+        self.pos = grow_rows(self.pos, n)
+        self.count = grow_rows(self.count, n)
+        logger.info(f"TickStore 를 {n}종목으로 늘렸습니다. ({self.nbytes / 1e6:.1f}MB)")
+        self.max_codes = n
+
+    def append(self, code, result, timestamp=None):
+        """
+        시세 하나를 추가합니다. O(1)
+
+        Args:
+            code (str): 종목코드
+            result (dict): get_current_price 결과
+            timestamp (float): 시세 시각 (epoch 초, 기본값 현재 시각)
+        """
+        row = self.row(code)
+        p = self.pos[row]
+        q = p + self.capacity
+        ts = int((time.time() if timestamp is None else timestamp) * 1000)
+
+        for field, array in self.arrays.items():
+            value = ts if field == 'timestamp' else result.get(field, 0)
+            array[row, p] = value
+            array[row, q] = value
+
+        self.pos[row] = (p + 1) % self.capacity
+        if self.count[row] < self.capacity:
+            self.count[row] += 1
+
+    def window(self, code, field, n=None):
+        """
+        최근 n 개 값을 오래된 순서로 반환합니다. 복사 없는 읽기 전용 view 입니다.
+
+        Args:
+            code (str): 종목코드
+            field (str): 필드 이름 (FIELD_DTYPES 참고)
+            n (int): 개수 (기본값 보관 중인 전체)
+
+        Returns:
+            numpy.ndarray: 1차원 view (종목이 없으면 빈 배열)
+        """
+        row = self.index.get(code)
+        if row is None:
+            return np.empty(0, dtype=FIELD_DTYPES[field])
+        available = int(self.count[row])
+        n = available if n is None else min(n, available)
+        end = int(self.pos[row]) + self.capacity
+        view = self.arrays[field][row, end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def version(self, code):
+        """종목 기록이 바뀔 때마다 달라지는 값 (마지막 시세 시각 ms, 보관 개수). 없으면 None."""
+        row = self.index.get(code)
+        if row is None:
+            return None
+        i = int(self.pos[row]) + self.capacity - 1
+        return f"{int(self.arrays['timestamp'][row, i])}.{int(self.count[row])}"
+
+    def latest(self, code):
+        """종목의 가장 최근 시세를 딕셔너리로 반환합니다. (없으면 None)"""
+        row = self.index.get(code)
+        if row is None or self.count[row] == 0:
+            return None
+        i = int(self.pos[row]) + self.capacity - 1
+        return {field: array[row, i].item() for field, array in self.arrays.items()}
+
+    def column(self, field):
+        """
+        등록된 전체 종목의 최근 값을 행 번호 순서로 반환합니다. (지표/알림 벡터 연산용)
+
+        Returns:
+            numpy.ndarray: (등록 종목 수,) 배열
+        """
+        n = len(self.index)
+        rows = np.arange(n)
+        return self.arrays[field][rows, self.pos[:n] + self.capacity - 1]
@@ -0,0 +1,94 @@
+import time
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+class TokenManager:
+    """
+    접근 토큰을 메모리에 보관하고 만료 전에 미리 갱신하는 관리자.
+    토큰 저장소(파일)는 재시작 시 복원용으로만 사용하며,
+    토큰이 유효한 동안 get() 은 메모리 값만 확인합니다.
+    갱신은 락으로 단일 실행(single-flight)되므로 동시에 여러 호출자가
+    토큰을 요청해도 발급(issue)은 한 번만 일어납니다.
+
+    Args:
+        issue (callable): 새 토큰을 발급받아 반환하는 함수
+        load (callable): 저장된 (access_token, issued_time) 을 반환하는 함수 (없으면 None)
+        save (callable): 발급받은 토큰을 저장하는 함수
+        ttl (timedelta): 토큰 유효 기간
+        refresh_margin (timedelta): 만료 전 미리 갱신할 여유 시간
+    """
+
+    def __init__(self, issue, load=None, save=None,
+                 ttl=timedelta(hours=23), refresh_margin=timedelta(hours=1)):
+        self._issue = issue
+        self._load = load
+        self._save = save
+        self._lifetime = (ttl - refresh_margin).total_seconds()
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._token = None
+        self._refresh_at = 0.0
+
+    def get(self):
+        """유효한 접근 토큰을 반환합니다. 필요하면 저장소 복원 또는 재발급을 수행합니다."""
+        token = self._token
+        if token is not None and time.time() < self._refresh_at:
+            return token
+
+        with self._lock:
+            # 락을 기다리는 동안 다른 호출자가 갱신했을 수 있으므로 다시 확인
+            if self._token is not None and time.time() < self._refresh_at:
+                return self._token
+
+            if not self._loaded:
+                self._loaded = True
+                self._restore()
+                if self._token is not None and time.time() < self._refresh_at:
+                    return self._token
+
+            token = self._issue()
+            if self._save:
+                self._save(token)
+            self._set(token, time.time())
+            return token
+
+    async def get_async(self):
+        """
+        이벤트 루프 안에서 쓰는 get(). 토큰이 유효하면 바로 반환하고,
+        복원이나 재발급이 필요할 때만 스레드에서 실행하여 발급 요청이 이벤트 루프를 막지 않습니다.
+        """
+        token = self._token
+        if token is not None and time.time() < self._refresh_at:
+            return token
+        return await asyncio.to_thread(self.get)
+
+    def invalidate(self):
+        """만료된 토큰을 버립니다. 다음 get() 에서 재발급됩니다."""
+        with self._lock:
+            self._token = None
+            self._refresh_at = 0.0
+            self._loaded = True
+
+    def _restore(self):
+        if not self._load:
+            return
+        try:
+            record = self._load()
+        except Exception as e:
+            logger.error(f"토큰 복원 실패: {e}")
+            return
+        if record:
+            access_token, issued_time = record
+            self._set(access_token, issued_time.timestamp())
+
+    def _set(self, token, issued_at):
+        self._token = token
+        self._refresh_at = issued_at + self._lifetime
@@ -3,48 +3,14 @@ import pytz
 import json
 import datetime
 import logging
-from dotenv import load_dotenv
-from tinydb import TinyDB
 
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.theme import Theme
-
-
-# 커스터마이징 
-custom_theme = Theme({
-    "info": "cyan",
-    "warning": "yellow",
-    "error": "red",
-    "critical": "red reverse"
-})
-
-console = Console(theme=custom_theme)
-rich_handler = RichHandler(
-    console=console,
-    rich_tracebacks=True,
-    tracebacks_show_locals=True,
-    show_time=True,
-    show_path=False
-)
-
-# 기본 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",  
-    datefmt="[%X]",
-    handlers=[rich_handler]
-)
+from market_calendar import default_calendar
+from state_store import default_store
+from bootstrap import bootstrap
 
 # 로거 가져오기
 logger = logging.getLogger(__name__)
 
-# .env 파일 로드
-load_dotenv(os.path.join(os.getenv('CONFIG_DIR', 'config'), '.env'))
-
-# TinyDB
-db = TinyDB(os.path.join(os.getenv('CONFIG_DIR', 'config'), 'db.json'))
-
 
 # -------------------------------------------------
 def check_krx_market_time():
@@ -52,28 +18,15 @@ def check_krx_market_time():
     korea_tz = pytz.timezone('Asia/Seoul')
     current_time = datetime.datetime.now(korea_tz)
 
-    # 주중인지 확인 (0 = 월요일, 6 = 일요일)
-    if current_time.weekday() >= 5:  # 주말이면 실행하지 않음
-        return False
-
-    # 시간이 9:00 ~ 15:30 사이인지 확인
-    market_start = current_time.replace(hour=9,
-                                        minute=0,
-                                        second=0,
-                                        microsecond=0)
-    market_end = current_time.replace(hour=15,
-                                      minute=30,
-                                      second=0,
-                                      microsecond=0)
-
-    return market_start <= current_time <= market_end
+    # 휴장일, 지연 개장일을 반영한 거래 세션 테이블로 확인
+    return default_calendar().is_open(current_time)
 
 
 # -------------------------------------------------
 def load_stocks():
     """
     주식 데이터를 로드하는 함수.
-    먼저 JSON 파일에서 로드하고, 없으면 TinyDB에서 로드합니다.
+    먼저 JSON 파일에서 로드하고, 없으면 상태 저장소(state.db)에서 로드합니다.
     
     Returns:
         list: 주식 데이터 리스트
@@ -89,20 +42,11 @@ def load_stocks():
         except Exception as e:
             logger.error(f"JSON 파일 로드 실패: {e}")
     
-    # TinyDB에서 로드 시도
+    # 상태 저장소에서 로드 시도
     try:
-        # 테스트 환경에서는 직접 TinyDB 인스턴스를 생성
-        if config_dir == 'test_config':
-            test_db = TinyDB(os.path.join(config_dir, 'db.json'))
-            stocks_table = test_db.table('stocks')
-            result = stocks_table.all()
-            test_db.close()
-            return result
-        else:
-            stocks_table = db.table('stocks')
-            return stocks_table.all()
+        return default_store().load_stocks()
     except Exception as e:
-        logger.error(f"TinyDB 로드 실패: {e}")
+        logger.error(f"상태 저장소 로드 실패: {e}")
     
     return []
 
@@ -110,7 +54,7 @@ def load_stocks():
 def save_stocks(stocks):
     """
     주식 데이터를 저장하는 함수.
-    JSON 파일과 TinyDB 모두에 저장합니다.
+    JSON 파일과 상태 저장소(state.db) 모두에 저장합니다.
     
     Args:
         stocks (list): 저장할 주식 데이터 리스트
@@ -125,21 +69,11 @@ def save_stocks(stocks):
     except Exception as e:
         logger.error(f"JSON 파일 저장 실패: {e}")
     
-    # TinyDB에 저장
+    # 상태 저장소에 저장 (종목코드 기준 upsert)
     try:
-        # 테스트 환경에서는 직접 TinyDB 인스턴스를 생성
-        if config_dir == 'test_config':
-            test_db = TinyDB(os.path.join(config_dir, 'db.json'))
-            stocks_table = test_db.table('stocks')
-            stocks_table.truncate()  # 기존 데이터 삭제
-            stocks_table.insert_multiple(stocks)
-            test_db.close()
-        else:
-            stocks_table = db.table('stocks')
-            stocks_table.truncate()  # 기존 데이터 삭제
-            stocks_table.insert_multiple(stocks)
+        default_store().save_stocks(stocks)
     except Exception as e:
-        logger.error(f"TinyDB 저장 실패: {e}")
+        logger.error(f"상태 저장소 저장 실패: {e}")
 
 # -------------------------------------------------
 def get_stock_by_code(code):
@@ -152,14 +86,14 @@ def get_stock_by_code(code):
     Returns:
         dict: 주식 정보 딕셔너리 또는 None
     """
-    stocks = load_stocks()
-    for stock in stocks:
-        if stock.get('code') == code:
-            return stock
-    return None
+    # 파일이 바뀌었을 때만 다시 읽는 관심종목 레지스트리의 색인으로 조회
+    from watchlist import default_watchlist
+    return default_watchlist().get(code)
 
 
 # -------------------------------------------------
 if __name__ == '__main__':
+    bootstrap()
+
     get_stock_by_code_res = get_stock_by_code("012450")
     print(f"get_stock_by_code: {get_stock_by_code}")
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import logging
+import threading
+from collections import namedtuple
+
+
+# 로거 가져오기
+logger = logging.getLogger(__name__)
+
+# 한 틱 동안 사용하는 관심종목 스냅샷 (통째로 교체되므로 읽는 쪽은 락이 필요 없음)
+WatchlistSnapshot = namedtuple("WatchlistSnapshot", ["version", "stocks", "by_code", "by_name"])
+
+
+# -------------------------------------------------
+class Watchlist:
+    """
+    관심종목 레지스트리.
+    stocks.json 을 한 번 읽어 종목코드/종목명 색인과 함께 보관하고,
+    파일의 inode, mtime, 크기가 바뀐 경우에만 다시 읽습니다.
+    틱마다 stat 한 번으로 변경을 확인하므로 재시작 없이 다음 틱부터 수정 내용이 반영됩니다.
+    파일이 없으면 상태 저장소의 관심종목을 읽으므로 저장소의 관심종목 버전으로 변경을 확인합니다.
+
+    Args:
+        path (str): 관심종목 파일 경로 (기본값 CONFIG_DIR/stocks.json)
+        load (callable): 관심종목 리스트를 읽는 함수 (기본값 utils.load_stocks)
+        version (callable): 파일이 없을 때 쓰는 관심종목 버전 함수 (기본값 상태 저장소의 stocks_version)
+    """
+
+    def __init__(self, path=None, load=None, version=None):
+        if load is None:
+            from utils import load_stocks
+            load = load_stocks
+        if version is None:
+            version = _store_version
+        self._path = path
+        self._load = load
+        self._version = version
+        self._signature = object()
+        self._lock = threading.Lock()
+        self.current = WatchlistSnapshot(0, [], {}, {})
+
+    @property
+    def path(self):
+        return self._path or os.path.join(os.getenv('CONFIG_DIR', 'config'), 'stocks.json')
+
+    def _stat(self):
+        path = self.path
+        try:
+            st = os.stat(path)
+        except OSError:
+            # 파일이 없으면 상태 저장소의 목록을 사용하므로 저장소의 관심종목 버전으로 확인
+            try:
+                return (path, None, self._version())
+            except Exception as e:
+                logger.debug(f"관심종목 버전 확인 실패: {e}")
+                return (path, None, None)
+        return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def snapshot(self):
+        """
+        현재 관심종목 스냅샷을 반환합니다. 파일이 바뀌었으면 다시 읽습니다.
+
+        Returns:
+            WatchlistSnapshot: (version, stocks, by_code, by_name)
+        """
+        signature = self._stat()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._reload(signature)
+        return self.current
+
+    def _reload(self, signature):
+        stocks = self._load()
+        by_code = {}
+        by_name = {}
+        for stock in stocks:
+            by_code.setdefault(stock.get('code'), stock)
+            by_name.setdefault(stock.get('name'), stock)
+
+        self.current = WatchlistSnapshot(self.current.version + 1, stocks, by_code, by_name)
+        self._signature = signature
+        logger.info(f"관심종목 {len(by_code)}개 로드")
+
+    def get(self, code):
+        """종목코드로 종목 정보를 찾습니다. O(1) (없으면 None)"""
+        return self.snapshot().by_code.get(code)
+
+    def get_by_name(self, name):
+        """종목명으로 종목 정보를 찾습니다. O(1) (없으면 None)"""
+        return self.snapshot().by_name.get(name)
+
+
+# -------------------------------------------------
+def _store_version():
+    from state_store import default_store
+
+    return default_store().stocks_version()
+
+
+# 프로세스 기본 레지스트리
+_default = None
+
+
+# -------------------------------------------------
+def default_watchlist():
+    """CONFIG_DIR/stocks.json 을 사용하는 기본 관심종목 레지스트리를 반환합니다."""
+    global _default
+    if _default is None:
+        _default = Watchlist()
+    return _default